@@ -7,6 +7,9 @@ from app.shared.logger.logger import console_log
 from app.shared.database.redis_db import connect_to_redis_with_retry, close_redis_client
 from app.shared.database.mongodb_db import connect_to_mongo_with_retry, close_mongo_db
 from app.health.health import router as health_router
+from app.rag.rag_controller import get_ingestion_job_queue
+from app.rag.extraction_pool import shutdown_extraction_pool
+from app.rag.upsert_writer import close_upsert_writers
 from app.api import router as api_router
 
 # from app.shared.context.context_store import ContextStoreMiddleware
@@ -22,11 +25,19 @@ async def lifespan(app: FastAPI):
     await connect_to_redis_with_retry()
     # - Connect to MongoDB
     await connect_to_mongo_with_retry()
+    # - Start background ingestion workers
+    await get_ingestion_job_queue().start()
 
     yield
 
     # Actions to perform on application shutdown:
     console_log("Shutting down application!")
+    # - Stop background ingestion workers
+    await get_ingestion_job_queue().stop()
+    # - Kill running extraction worker processes
+    shutdown_extraction_pool()
+    # - Write out vectors still queued for upsert
+    close_upsert_writers()
     # - Close Redis connection
     await close_redis_client()
     # - Close MongoDB connection
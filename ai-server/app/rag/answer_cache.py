@@ -0,0 +1,231 @@
+"""
+Semantic cache of /rag/query answers, invalidated by source content versions.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.rag.mmr import normalize_rows
+from app.rag.rag_types import QueryRequestArgs, QueryResponseType
+from app.rag.stats import Counters, ratio
+from app.rag.tenancy import tenant_namespace
+from app.shared.config.config import env
+from app.shared.dependencies.instance import instance
+from app.shared.logger.logger import console_log
+
+VERSION_KEY_PREFIX = "rag:ver:"
+
+
+def source_version_key(source_name: str) -> str:
+    return f"source:{source_name}"
+
+
+def namespace_version_key(namespace: str) -> str:
+    return f"namespace:{namespace}"
+
+
+class ContentVersions:
+    """Content version counters of sources and namespaces, in Redis when it is connected"""
+
+    def __init__(self):
+        self._local: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, keys: List[str]) -> Tuple[int, ...]:
+        """Current versions of keys, 0 for keys that never changed"""
+        client = instance.redis_client
+        if client is None:
+            with self._lock:
+                return tuple(self._local.get(key, 0) for key in keys)
+
+        values = client.mget([f"{VERSION_KEY_PREFIX}{key}" for key in keys])
+        return tuple(int(value) if value is not None else 0 for value in values)
+
+    def bump(self, keys: Iterable[str]) -> None:
+        """Move the versions of keys, invalidating every answer that depends on one of them"""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return
+
+        client = instance.redis_client
+        if client is None:
+            with self._lock:
+                for key in keys:
+                    self._local[key] = self._local.get(key, 0) + 1
+            return
+
+        pipeline = client.pipeline(transaction=False)
+        for key in keys:
+            pipeline.incr(f"{VERSION_KEY_PREFIX}{key}")
+        pipeline.execute()
+
+
+ANSWER_CACHE_COUNTERS = (
+    "hits",
+    "misses",
+    "invalidated",  # Entries dropped because a source or namespace they depend on changed
+    "writes",
+    "errors",
+)
+
+
+class _CachedAnswer:
+    def __init__(self, vector: np.ndarray, response: QueryResponseType, versions: Tuple[int, ...], expires_at: float):
+        self.vector = vector  # Normalised embedding of the question
+        self.response = response
+        self.versions = versions
+        self.expires_at = expires_at
+
+
+class AnswerScope:
+    """What an answer depends on besides the question: the request's scope and its content versions"""
+
+    def __init__(self, key: str, version_keys: List[str]):
+        self.key = key
+        self.version_keys = version_keys
+        self.versions: Tuple[int, ...] = ()
+
+
+class AnswerCache:
+    """Per-worker LRU of answers, looked up by question embedding similarity within a scope"""
+
+    def __init__(self, max_entries: int, ttl_seconds: int, versions: ContentVersions):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.versions = versions
+        self.stats = Counters(ANSWER_CACHE_COUNTERS)
+        # scope key -> {entry id -> answer}, in least recently used order across all scopes
+        self._scopes: Dict[str, Dict[int, _CachedAnswer]] = {}
+        self._lru: "OrderedDict[Tuple[str, int], None]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def scope(request: QueryRequestArgs, tenant_id: Optional[str] = None) -> AnswerScope:
+        """Scope of a query against the default index"""
+        namespace = tenant_namespace(tenant_id)
+        source_names = sorted(set(request.source_name or []))
+        key = "|".join(
+            [
+                request.mode,
+                request.vector_db_name or env.PINECONE_INDEX_NAME,
+                namespace,
+                str(request.max_results),
+                str(request.include_sources),
+                ",".join(source_names),
+            ]
+        )
+        if source_names:
+            version_keys = [source_version_key(source_name) for source_name in source_names]
+        else:
+            version_keys = [namespace_version_key(namespace)]
+        return AnswerScope(key, version_keys)
+
+    def _drop(self, scope_key: str, entry_id: int) -> None:
+        entries = self._scopes.get(scope_key)
+        if entries is not None:
+            entries.pop(entry_id, None)
+            if not entries:
+                del self._scopes[scope_key]
+        self._lru.pop((scope_key, entry_id), None)
+
+    def lookup(
+        self, scope: AnswerScope, query_vector: np.ndarray, min_similarity: float
+    ) -> Optional[QueryResponseType]:
+        """The cached answer of the most similar question in the scope, if it is similar enough and current.
+
+        Reads the scope's current content versions into scope.versions, for storing the answer on a miss.
+        """
+        try:
+            scope.versions = self.versions.get(scope.version_keys)
+        except Exception as error:
+            self.stats.record(errors=1)
+            console_log(f"Answer cache version lookup failed: {str(error)}")
+            # Without versions, an answer could neither be validated nor stored safely
+            scope.versions = ()
+            return None
+
+        with self._lock:
+            now = time.time()
+            entries = self._scopes.get(scope.key, {})
+            invalidated = [
+                entry_id
+                for entry_id, entry in entries.items()
+                if entry.versions != scope.versions or entry.expires_at <= now
+            ]
+            for entry_id in invalidated:
+                self._drop(scope.key, entry_id)
+            if invalidated:
+                self.stats.record(invalidated=len(invalidated))
+
+            entries = self._scopes.get(scope.key, {})
+            if not entries:
+                self.stats.record(misses=1)
+                return None
+
+            entry_ids = list(entries.keys())
+            similarities = np.stack([entries[entry_id].vector for entry_id in entry_ids]) @ normalize_rows(query_vector)
+            best = int(np.argmax(similarities))
+            if similarities[best] < min_similarity:
+                self.stats.record(misses=1)
+                return None
+
+            self._lru.move_to_end((scope.key, entry_ids[best]))
+            self.stats.record(hits=1)
+            console_log(f"Answer served from cache (similarity {float(similarities[best]):.3f})")
+            return entries[entry_ids[best]].response.model_copy(deep=True)
+
+    def store(self, scope: AnswerScope, query_vector: np.ndarray, response: QueryResponseType) -> None:
+        """Cache the answer of a question under the versions read by lookup"""
+        if len(scope.versions) != len(scope.version_keys):
+            return
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._scopes.setdefault(scope.key, {})[entry_id] = _CachedAnswer(
+                normalize_rows(query_vector), response, scope.versions, time.time() + self.ttl_seconds
+            )
+            self._lru[(scope.key, entry_id)] = None
+            while len(self._lru) > self.max_entries:
+                self._drop(*next(iter(self._lru)))
+            self.stats.record(writes=1)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            entries = len(self._lru)
+        counters = self.stats.counters()
+        hit_rate = ratio(counters["hits"], counters["hits"] + counters["misses"])
+        return {**counters, "hit_rate": hit_rate, "entries": entries}
+
+
+_content_versions: Optional[ContentVersions] = None
+_answer_cache: Optional[AnswerCache] = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_content_versions() -> ContentVersions:
+    """Get or create the process-wide content versions"""
+    global _content_versions
+    with _answer_cache_lock:
+        if _content_versions is None:
+            _content_versions = ContentVersions()
+        return _content_versions
+
+
+def get_answer_cache() -> AnswerCache:
+    """Get or create the process-wide answer cache"""
+    global _answer_cache
+    versions = get_content_versions()
+    with _answer_cache_lock:
+        if _answer_cache is None:
+            _answer_cache = AnswerCache(
+                max_entries=env.RAG_ANSWER_CACHE_MAX_ENTRIES,
+                ttl_seconds=env.RAG_ANSWER_CACHE_TTL_SECONDS,
+                versions=versions,
+            )
+        return _answer_cache
@@ -0,0 +1,205 @@
+"""
+Unpacking and resolution of bulk ingestion uploads.
+
+A bulk ingestion receives a zip or tar archive and/or several uploaded files, plus an optional
+manifest naming the documents to ingest. Archive members are streamed into the working directory
+under generated names (member names are never used as paths), within RAG_BULK_MAX_FILES files and
+RAG_BULK_MAX_UNPACKED_MB of unpacked data.
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import tarfile
+import zipfile
+from typing import IO, Any, Dict, List, NamedTuple, Optional, Tuple
+
+from app.rag.document_processor import DocumentProcessor
+from app.rag.rag_types import BulkDocumentResultType, BulkDocumentType, BulkIngestRequestArgs, BulkManifestEntryType
+from app.rag.upload_spool import UPLOAD_CHUNK_BYTES
+from app.shared.config.config import env
+
+MANIFEST_FILE_NAME = "manifest.json"
+# Extensions ingested as plain text; other extensions are passed to type detection as declared types
+TEXT_EXTENSIONS = ("txt", "md", "markdown", "csv", "log")
+
+
+class BulkFileType(NamedTuple):
+    """A file of a bulk upload written to disk"""
+
+    name: str  # Path in the archive or uploaded file name
+    path: str
+    size: int
+    sha256: str
+
+
+def normalize_member_name(name: str) -> str:
+    """Archive-relative POSIX path of a member or uploaded file name"""
+    return posixpath.normpath(name.replace("\\", "/")).lstrip("/")
+
+
+class _UnpackBudget:
+    """Running file count and byte budget of one bulk upload"""
+
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+        self.max_files = env.RAG_BULK_MAX_FILES
+        self.max_bytes = env.RAG_BULK_MAX_UNPACKED_MB * 1024 * 1024
+
+    def add_file(self) -> None:
+        self.files += 1
+        if self.files > self.max_files:
+            raise ValueError(f"Bulk upload contains more than {self.max_files} files")
+
+    def add_bytes(self, size: int) -> None:
+        self.bytes += size
+        if self.bytes > self.max_bytes:
+            raise ValueError(f"Bulk upload unpacks to more than {env.RAG_BULK_MAX_UNPACKED_MB} MB")
+
+
+def _copy_member(source: IO[bytes], directory: str, index: int, name: str, budget: _UnpackBudget) -> BulkFileType:
+    """Stream an archive member to disk, hashing it and charging it to the budget"""
+    extension = posixpath.splitext(name)[1]
+    path = os.path.join(directory, f"member-{index}{extension}")
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "wb") as target:
+        while True:
+            # Declared member sizes can lie, so the budget is enforced on the bytes actually written
+            chunk = source.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            budget.add_bytes(len(chunk))
+            digest.update(chunk)
+            size += len(chunk)
+            target.write(chunk)
+    return BulkFileType(name=name, path=path, size=size, sha256=digest.hexdigest())
+
+
+def _is_ignored_member(name: str) -> bool:
+    parts = name.split("/")
+    return not name or name.startswith("..") or parts[0] == "__MACOSX" or parts[-1].startswith(".")
+
+
+def unpack_archive(archive_path: str, directory: str) -> List[BulkFileType]:
+    """Unpack the regular files of a zip or tar (optionally gzip/bz2/xz compressed) archive.
+
+    Raises:
+        ValueError: the file is not a supported archive or exceeds the bulk limits
+    """
+    budget = _UnpackBudget()
+    files: List[BulkFileType] = []
+
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            for member in archive.infolist():
+                name = normalize_member_name(member.filename)
+                if member.is_dir() or _is_ignored_member(name):
+                    continue
+                budget.add_file()
+                with archive.open(member) as source:
+                    files.append(_copy_member(source, directory, len(files), name, budget))
+        return files
+
+    if tarfile.is_tarfile(archive_path):
+        with tarfile.open(archive_path) as archive:
+            for member in archive:
+                name = normalize_member_name(member.name)
+                # Links and devices are skipped, only regular files are unpacked
+                if not member.isfile() or _is_ignored_member(name):
+                    continue
+                budget.add_file()
+                source = archive.extractfile(member)
+                if source is None:
+                    continue
+                with source:
+                    files.append(_copy_member(source, directory, len(files), name, budget))
+        return files
+
+    raise ValueError("Archive must be a zip or tar file")
+
+
+def parse_manifest(manifest: Any) -> List[BulkManifestEntryType]:
+    """Parse a manifest given as JSON text or already parsed: a list of entries or {"documents": [...]}
+
+    Raises:
+        ValueError: the manifest is not valid
+    """
+    if isinstance(manifest, (str, bytes)):
+        try:
+            manifest = json.loads(manifest)
+        except json.JSONDecodeError as error:
+            raise ValueError(f"Invalid manifest JSON: {error}")
+
+    if isinstance(manifest, dict):
+        manifest = manifest.get("documents")
+    if not isinstance(manifest, list):
+        raise ValueError('Manifest must be a list of documents or an object with a "documents" list')
+    return [
+        BulkManifestEntryType(path=entry) if isinstance(entry, str) else BulkManifestEntryType.model_validate(entry)
+        for entry in manifest
+    ]
+
+
+def _file_type(file: BulkFileType) -> Optional[str]:
+    extension = posixpath.splitext(file.name)[1].lstrip(".").lower()
+    declared_type = "text" if extension in TEXT_EXTENSIONS else extension or None
+    if not file.size:
+        return None
+    return DocumentProcessor.detect_file_type(file.path, declared_type)
+
+
+def resolve_bulk_documents(
+    files: List[BulkFileType],
+    manifest: Optional[List[BulkManifestEntryType]],
+    request: BulkIngestRequestArgs,
+    source_scope: str = "",
+) -> Tuple[List[BulkDocumentType], List[BulkDocumentResultType]]:
+    """Match files to manifest entries (or take every file) and detect their types.
+
+    source_scope is prepended to every source name, e.g. "{user_id}::".
+
+    Returns:
+        Documents to ingest, and results of documents rejected up front
+    """
+    files_by_name = {file.name: file for file in files}
+    if manifest is None:
+        entries = [BulkManifestEntryType(path=file.name) for file in files if file.name != MANIFEST_FILE_NAME]
+    else:
+        entries = manifest
+
+    documents: List[BulkDocumentType] = []
+    rejected: List[BulkDocumentResultType] = []
+    for entry in entries:
+        name = normalize_member_name(entry.path)
+        source_name = source_scope + (entry.source_name or f"{request.source_prefix}{name}")
+        file = files_by_name.get(name)
+        if file is None:
+            rejected.append(
+                BulkDocumentResultType(path=entry.path, source_name=source_name, success=False, error="File not found")
+            )
+            continue
+
+        file_type = _file_type(file)
+        if file_type is None:
+            rejected.append(
+                BulkDocumentResultType(
+                    path=name, source_name=source_name, success=False, error="Unsupported or empty file"
+                )
+            )
+            continue
+
+        metadata: Dict[str, Any] = {**(request.metadata or {}), **entry.metadata, "file_name": name}
+        documents.append(
+            BulkDocumentType(
+                path=name,
+                file_path=file.path,
+                file_type=file_type,
+                source_name=source_name,
+                metadata=metadata,
+                content_sha256=file.sha256,
+            )
+        )
+    return documents, rejected
@@ -0,0 +1,103 @@
+"""
+Token-window chunking with a single tokenisation pass per document.
+
+The document is encoded once, split into overlapping windows of token offsets and each window
+is decoded back to text, so every chunk comes with its exact token count and nothing is
+re-encoded afterwards. Chunkers are cached per (chunk_size, chunk_overlap, encoding), so
+per-request chunking parameters cost nothing after the first use.
+
+split_stream does the same for text that arrives in pieces (pages, slides): only the tokens of
+the windows that are not complete yet are kept, so memory does not grow with the document.
+"""
+
+from functools import lru_cache
+from typing import Iterable, Iterator, List, NamedTuple
+
+import tiktoken
+
+# Tokenizer of gpt-4o-mini / gpt-4 and of the text-embedding-3 models
+DEFAULT_ENCODING = "cl100k_base"
+
+
+class TextChunk(NamedTuple):
+    """One chunk of a document and its position in the document's token stream"""
+
+    text: str
+    token_count: int
+    start_token: int
+
+
+class TokenChunker:
+    """Splits text into overlapping windows of at most chunk_size tokens"""
+
+    def __init__(self, chunk_size: int, chunk_overlap: int, encoding_name: str = DEFAULT_ENCODING):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        if not 0 <= chunk_overlap < chunk_size:
+            raise ValueError("chunk_overlap must be at least 0 and smaller than chunk_size")
+
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.encoding_name = encoding_name
+        self.encoding = tiktoken.get_encoding(encoding_name)
+
+    def split(self, text: str) -> List[TextChunk]:
+        """Split text into token windows, tokenising it exactly once"""
+        if not text:
+            return []
+
+        tokens = self.encoding.encode(text, allowed_special="all")
+        step = self.chunk_size - self.chunk_overlap
+
+        starts = []
+        start = 0
+        while start < len(tokens):
+            starts.append(start)
+            if start + self.chunk_size >= len(tokens):
+                break
+            start += step
+
+        windows = [tokens[start : start + self.chunk_size] for start in starts]
+        return self._decode_windows(windows, starts)
+
+    def split_stream(self, pieces: Iterable[str]) -> Iterator[TextChunk]:
+        """Split text arriving in pieces, yielding each chunk as soon as its window is complete.
+
+        Gives the same windows as split() on the joined text, except that pieces are tokenised
+        separately, so a token never spans two pieces.
+        """
+        step = self.chunk_size - self.chunk_overlap
+        buffer: List[int] = []
+        buffer_start = 0  # Token offset of buffer[0] in the whole stream
+        next_start = 0
+        total_tokens = 0
+
+        for piece in pieces:
+            if not piece:
+                continue
+            buffer.extend(self.encoding.encode(piece, allowed_special="all"))
+            total_tokens = buffer_start + len(buffer)
+
+            # A window is emitted once tokens exist past its end, as split() only stops at the last window
+            starts = []
+            while next_start + self.chunk_size < total_tokens:
+                starts.append(next_start)
+                next_start += step
+            if starts:
+                windows = [buffer[start - buffer_start : start - buffer_start + self.chunk_size] for start in starts]
+                yield from self._decode_windows(windows, starts)
+                del buffer[: next_start - buffer_start]
+                buffer_start = next_start
+
+        if next_start < total_tokens:
+            yield from self._decode_windows([buffer[next_start - buffer_start :]], [next_start])
+
+    def _decode_windows(self, windows: List[List[int]], starts: List[int]) -> List[TextChunk]:
+        texts = self.encoding.decode_batch(windows)
+        return [TextChunk(text, len(window), start) for text, window, start in zip(texts, windows, starts)]
+
+
+@lru_cache(maxsize=32)
+def get_chunker(chunk_size: int, chunk_overlap: int, encoding_name: str = DEFAULT_ENCODING) -> TokenChunker:
+    """Get a cached chunker for the given parameters"""
+    return TokenChunker(chunk_size, chunk_overlap, encoding_name)
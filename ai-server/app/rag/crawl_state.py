@@ -0,0 +1,149 @@
+"""
+Per-URL crawl state used to skip unchanged pages on re-crawls.
+
+For every crawled URL of a source the store keeps the last-seen ETag and Last-Modified headers,
+the sha256 of the normalised markdown, the ids of the chunks written for the page and a
+fingerprint of the settings the page was chunked with. A re-crawl compares against it:
+
+- single page scrapes send a conditional HEAD request first and skip the scrape entirely on
+  304 Not Modified or unchanged validators
+- pages delivered by a full website crawl (Firecrawl does not expose response headers) are
+  compared by content hash, and unchanged ones are neither cleaned, chunked nor embedded
+
+State lives in one Redis hash per source (`rag:crawl:{source_name}`, field = URL). Store failures
+are logged and treated as "changed", so the state can never break a crawl.
+"""
+
+import hashlib
+import json
+import time
+from typing import Dict, Iterable, List, Optional
+
+import requests
+from pydantic import BaseModel, Field
+
+from app.rag.embedding_cache import text_digest
+from app.shared.config.config import env
+from app.shared.dependencies.instance import instance
+from app.shared.logger.logger import console_log
+
+REDIS_KEY_PREFIX = "rag:crawl:"
+CONDITIONAL_REQUEST_TIMEOUT_SECONDS = 10
+
+
+class CrawlPageStateType(BaseModel):
+    """What was seen and stored the last time a URL was crawled"""
+
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: str
+    fingerprint: str
+    chunk_ids: List[str] = Field(default_factory=list)
+    token_count: int = 0
+    crawled_at: int = 0
+
+
+def content_hash(markdown: str) -> str:
+    """sha256 of the whitespace-normalised page markdown"""
+    return text_digest(markdown)
+
+
+def settings_fingerprint(**settings) -> str:
+    """Hash of the settings a page was chunked with; a page is re-processed when they change"""
+    return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def fetch_validators(url: str, state: Optional[CrawlPageStateType] = None) -> Optional[Dict[str, Optional[str]]]:
+    """Send a (conditional) HEAD request for a URL.
+
+    Returns:
+        {"not_modified", "etag", "last_modified"} or None when the server could not be asked
+    """
+    headers = {}
+    if state is not None and state.etag:
+        headers["If-None-Match"] = state.etag
+    if state is not None and state.last_modified:
+        headers["If-Modified-Since"] = state.last_modified
+
+    try:
+        response = requests.head(
+            url, headers=headers, allow_redirects=True, timeout=CONDITIONAL_REQUEST_TIMEOUT_SECONDS
+        )
+    except requests.RequestException as error:
+        console_log(f"Conditional request for {url} failed: {str(error)}")
+        return None
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    not_modified = response.status_code == 304
+    # Servers that ignore conditional headers still tell us through identical validators
+    if not not_modified and state is not None and response.status_code == 200 and (etag or last_modified):
+        same_etag = not etag or etag == state.etag
+        not_modified = same_etag and (not last_modified or last_modified == state.last_modified)
+    return {
+        "not_modified": not_modified,
+        "etag": etag or (state.etag if state is not None and not_modified else None),
+        "last_modified": last_modified or (state.last_modified if state is not None and not_modified else None),
+    }
+
+
+class CrawlStateStore:
+    """Redis hash per source, mapping URL to its CrawlPageStateType as JSON"""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+
+    def _client(self):
+        return instance.redis_client
+
+    def get_many(self, source_name: str, urls: Iterable[str]) -> Dict[str, CrawlPageStateType]:
+        client = self._client()
+        urls = [url for url in urls if url]
+        if client is None or not urls:
+            return {}
+
+        try:
+            values = client.hmget(f"{REDIS_KEY_PREFIX}{source_name}", urls)
+            return {
+                url: CrawlPageStateType.model_validate_json(value)
+                for url, value in zip(urls, values)
+                if value is not None
+            }
+        except Exception as error:
+            console_log(f"Crawl state lookup for {source_name} failed: {str(error)}")
+            return {}
+
+    def get(self, source_name: str, url: str) -> Optional[CrawlPageStateType]:
+        return self.get_many(source_name, [url]).get(url)
+
+    def put_many(self, source_name: str, states: Dict[str, CrawlPageStateType]) -> None:
+        client = self._client()
+        if client is None or not states:
+            return
+
+        now = int(time.time())
+        for state in states.values():
+            state.crawled_at = now
+        key = f"{REDIS_KEY_PREFIX}{source_name}"
+        try:
+            pipeline = client.pipeline(transaction=False)
+            pipeline.hset(key, mapping={url: state.model_dump_json() for url, state in states.items()})
+            pipeline.expire(key, self.ttl_seconds)
+            pipeline.execute()
+        except Exception as error:
+            console_log(f"Crawl state update for {source_name} failed: {str(error)}")
+
+    def delete_source(self, source_name: str) -> None:
+        client = self._client()
+        if client is None:
+            return
+
+        try:
+            client.delete(f"{REDIS_KEY_PREFIX}{source_name}")
+        except Exception as error:
+            console_log(f"Crawl state deletion for {source_name} failed: {str(error)}")
+
+
+def get_crawl_state_store() -> CrawlStateStore:
+    """Crawl state store with the configured TTL"""
+    return CrawlStateStore(ttl_seconds=env.RAG_CRAWL_STATE_TTL_SECONDS)
@@ -0,0 +1,150 @@
+"""
+Cross-page boilerplate stripping and near-duplicate chunk elimination for website crawls.
+"""
+
+import hashlib
+import re
+import threading
+from collections import Counter
+from typing import Dict, List
+
+import numpy as np
+
+from app.rag.rag_types import DocumentChunkType
+from app.rag.stats import Counters
+
+_WORD = re.compile(r"\w+")
+SHINGLE_WORDS = 3
+SIGNATURE_BITS = 64
+BAND_BITS = 16
+# Shorter lines ("|", "---", "1.") carry no boilerplate worth stripping and occur in real content
+MIN_BOILERPLATE_LINE_CHARS = 4
+
+
+def _shingle_hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash of the distinct word 3-shingles of a text"""
+    words = _WORD.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i : i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+    hashes = np.fromiter((_shingle_hash(shingle) for shingle in shingles), dtype=np.uint64, count=len(shingles))
+    # Each bit of the signature is the majority vote of that bit over the shingle hashes
+    bits = np.unpackbits(hashes.view(np.uint8)).reshape(-1, SIGNATURE_BITS)
+    majority = bits.sum(axis=0) * 2 > len(shingles)
+    return int(np.packbits(majority).view(np.uint64)[0])
+
+
+class SimHashIndex:
+    """Signatures seen so far, searchable for near-duplicates by 16-bit bands"""
+
+    def __init__(self, max_distance: int = 3):
+        bands = SIGNATURE_BITS // BAND_BITS
+        # With more differing bits than bands, two near-duplicates may share no band
+        self.max_distance = min(max_distance, bands - 1)
+        self._bands: List[Dict[int, List[int]]] = [{} for _ in range(bands)]
+
+    def _keys(self, signature: int) -> List[int]:
+        mask = (1 << BAND_BITS) - 1
+        return [(signature >> (band * BAND_BITS)) & mask for band in range(len(self._bands))]
+
+    def add_if_new(self, signature: int) -> bool:
+        """Add a signature unless a near-duplicate of it was added before. Returns whether it was added"""
+        keys = self._keys(signature)
+        for band, key in zip(self._bands, keys):
+            for candidate in band.get(key, ()):
+                if (signature ^ candidate).bit_count() <= self.max_distance:
+                    return False
+        for band, key in zip(self._bands, keys):
+            band.setdefault(key, []).append(signature)
+        return True
+
+
+DEDUP_COUNTERS = (
+    "pages_observed",
+    "boilerplate_lines_removed",  # Line occurrences stripped from pages
+    "chunks_checked",
+    "near_duplicate_chunks_dropped",
+)
+
+
+class CrawlDeduplicator:
+    """Boilerplate and near-duplicate state of one crawl"""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        boilerplate_min_pages: int = 5,
+        boilerplate_page_share: float = 0.5,
+        near_duplicate_max_distance: int = 3,
+    ):
+        self.enabled = enabled
+        self.boilerplate_min_pages = max(2, boilerplate_min_pages)
+        self.boilerplate_page_share = boilerplate_page_share
+        self.stats = Counters(DEDUP_COUNTERS)
+        self._line_pages: Counter = Counter()
+        self._signatures = SimHashIndex(near_duplicate_max_distance)
+        # Pages are stripped on worker threads
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        """Whether enough pages were observed to recognise boilerplate"""
+        return not self.enabled or self.stats["pages_observed"] >= self.boilerplate_min_pages
+
+    def observe(self, markdown: str) -> None:
+        """Count the distinct lines of a crawled page"""
+        if not self.enabled:
+            return
+        lines = {line.strip() for line in markdown.splitlines()}
+        with self._lock:
+            self._line_pages.update(line for line in lines if len(line) >= MIN_BOILERPLATE_LINE_CHARS)
+            self.stats.record(pages_observed=1)
+
+    def _min_line_pages(self) -> float:
+        return max(2, self.boilerplate_page_share * self.stats["pages_observed"])
+
+    def strip_boilerplate(self, markdown: str) -> str:
+        """Remove the lines of a page that occur on a large share of the crawl's pages"""
+        if not self.enabled or self.stats["pages_observed"] < self.boilerplate_min_pages:
+            return markdown
+
+        with self._lock:
+            min_count = self._min_line_pages()
+            kept_lines = []
+            removed = 0
+            for line in markdown.splitlines():
+                if self._line_pages.get(line.strip(), 0) >= min_count:
+                    removed += 1
+                else:
+                    kept_lines.append(line)
+            self.stats.record(boilerplate_lines_removed=removed)
+        return "\n".join(kept_lines) if removed else markdown
+
+    def drop_near_duplicates(self, chunks: List[DocumentChunkType]) -> List[DocumentChunkType]:
+        """Chunks that are not near-duplicates of a chunk seen earlier in the crawl"""
+        if not self.enabled:
+            return chunks
+
+        kept = []
+        for chunk in chunks:
+            signature = simhash(chunk.content)
+            with self._lock:
+                self.stats.record(chunks_checked=1)
+                if self._signatures.add_if_new(signature):
+                    kept.append(chunk)
+                else:
+                    self.stats.record(near_duplicate_chunks_dropped=1)
+        return kept
+
+    def summary(self) -> Dict[str, int]:
+        """Counters of the crawl, with the number of distinct lines recognised as boilerplate"""
+        with self._lock:
+            min_count = self._min_line_pages()
+            boilerplate_lines = sum(1 for count in self._line_pages.values() if count >= min_count)
+            return {**self.stats.counters(), "boilerplate_lines": boilerplate_lines if self.ready else 0}
@@ -3,10 +3,13 @@ Lightweight document processor for extracting text from various file formats.
 Replaces docling with lighter alternatives to reduce Docker image size.
 """
 
+import codecs
 import io
 import json
 import tempfile
 import os
+import zipfile
+from typing import Iterable, Iterator, Optional, Union
 
 # PDF processing
 try:
@@ -32,6 +35,15 @@ except ImportError:
 
 from app.shared.logger.logger import console_log
 
+# File contents, or the path of a file on disk that extractors open in place instead of loading it
+FileDataType = Union[bytes, str]
+
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+# Compound File Binary container of legacy .doc and .ppt files
+OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+SNIFF_BYTES = 4096
+
 
 class DocumentProcessor:
     """Lightweight document processor for text extraction from various formats."""
@@ -39,139 +51,186 @@ class DocumentProcessor:
     def __init__(self):
         console_log("Initializing lightweight DocumentProcessor")
 
-    def extract_text_from_pdf(self, file_data: bytes, source_name: str) -> str:
-        """Extract text from PDF using PyMuPDF (fitz)."""
+    @staticmethod
+    def _as_file(file_data: FileDataType):
+        """Path or file-like object accepted by python-docx and python-pptx"""
+        return file_data if isinstance(file_data, str) else io.BytesIO(file_data)
+
+    @staticmethod
+    def read_bytes(file_data: FileDataType) -> bytes:
+        """File contents, reading the file if a path was given"""
+        if isinstance(file_data, str):
+            with open(file_data, "rb") as file:
+                return file.read()
+        return file_data
+
+    def _open_pdf(self, file_data: FileDataType, source_name: str):
+        """Open a PDF with PyMuPDF, trying several loading strategies. Raises ValueError if none works."""
         if not fitz:
-            return "PyMuPDF not available for PDF processing"
+            raise RuntimeError("PyMuPDF not available for PDF processing")
 
-        try:
-            # Validate that we have valid PDF data
-            if not file_data or len(file_data) < 100:
-                return "Invalid PDF data: file too small or empty"
+        if isinstance(file_data, str):
+            return self._open_pdf_path(file_data, source_name)
 
-            # Check if it starts with PDF header
-            if not file_data.startswith(b"%PDF-"):
-                return "Invalid PDF data: does not start with PDF header"
+        # Validate that we have valid PDF data
+        if not file_data or len(file_data) < 100:
+            raise ValueError("Invalid PDF data: file too small or empty")
 
-            console_log(f"Processing PDF with {len(file_data)} bytes for: {source_name}")
+        # Check if it starts with PDF header
+        if not file_data.startswith(b"%PDF-"):
+            raise ValueError("Invalid PDF data: does not start with PDF header")
 
-            # Try multiple approaches to open the PDF
-            pdf_document = None
+        console_log(f"Processing PDF with {len(file_data)} bytes for: {source_name}")
 
-            # Approach 1: Try with stream parameter and explicit filetype
-            try:
-                pdf_document = fitz.open(stream=file_data, filetype="pdf")
-                console_log("Successfully opened PDF using stream method")
-            except Exception as stream_error:
-                console_log(f"Stream method failed: {stream_error}, trying BytesIO method")
+        # Try multiple approaches to open the PDF, keeping each failure for the final error
+        errors = []
 
-                # Approach 2: Try with BytesIO
-                try:
-                    import io
-
-                    pdf_document = fitz.open(stream=io.BytesIO(file_data), filetype="pdf")
-                    console_log("Successfully opened PDF using BytesIO method")
-                except Exception as bytesio_error:
-                    console_log(f"BytesIO method failed: {bytesio_error}, trying memory method")
-
-                    # Approach 3: Try opening from memory without filetype
-                    try:
-                        pdf_document = fitz.open(stream=file_data)
-                        console_log("Successfully opened PDF using memory method")
-                    except Exception as memory_error:
-                        console_log(f"Memory method failed: {memory_error}, trying temporary file method")
-
-                        # Approach 4: Try with temporary file
-                        try:
-                            import tempfile
-
-                            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as temp_file:
-                                temp_file.write(file_data)
-                                temp_file.flush()
-                                pdf_document = fitz.open(temp_file.name)
-                                console_log("Successfully opened PDF using temporary file method")
-                                # Clean up the temp file
-                                import os
-
-                                os.unlink(temp_file.name)
-                        except Exception as temp_error:
-                            console_log(f"Temporary file method failed: {temp_error}")
-                            return f"Error opening PDF: All methods failed. Stream: {stream_error}, BytesIO: {bytesio_error}, Memory: {memory_error}, Temp: {temp_error}"
-
-            if not pdf_document:
-                return "Failed to open PDF document"
-
-            text_content = ""
+        # Approach 1: Try with stream parameter and explicit filetype
+        try:
+            pdf_document = fitz.open(stream=file_data, filetype="pdf")
+            console_log("Successfully opened PDF using stream method")
+            return pdf_document
+        except Exception as stream_error:
+            errors.append(f"Stream: {stream_error}")
+            console_log(f"Stream method failed: {stream_error}, trying BytesIO method")
+
+        # Approach 2: Try with BytesIO
+        try:
+            pdf_document = fitz.open(stream=io.BytesIO(file_data), filetype="pdf")
+            console_log("Successfully opened PDF using BytesIO method")
+            return pdf_document
+        except Exception as bytesio_error:
+            errors.append(f"BytesIO: {bytesio_error}")
+            console_log(f"BytesIO method failed: {bytesio_error}, trying memory method")
+
+        # Approach 3: Try opening from memory without filetype
+        try:
+            pdf_document = fitz.open(stream=file_data)
+            console_log("Successfully opened PDF using memory method")
+            return pdf_document
+        except Exception as memory_error:
+            errors.append(f"Memory: {memory_error}")
+            console_log(f"Memory method failed: {memory_error}, trying temporary file method")
+
+        # Approach 4: Try with temporary file
+        try:
+            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as temp_file:
+                temp_file.write(file_data)
+                temp_file.flush()
+                pdf_document = fitz.open(temp_file.name)
+                console_log("Successfully opened PDF using temporary file method")
+                # Clean up the temp file
+                os.unlink(temp_file.name)
+            return pdf_document
+        except Exception as temp_error:
+            errors.append(f"Temp: {temp_error}")
+            console_log(f"Temporary file method failed: {temp_error}")
+            raise ValueError(f"Error opening PDF: All methods failed. {', '.join(errors)}")
+
+    def _open_pdf_path(self, file_path: str, source_name: str):
+        """Open a PDF file in place. PyMuPDF reads pages from disk as they are needed."""
+        file_size = os.path.getsize(file_path)
+        if file_size < 100:
+            raise ValueError("Invalid PDF data: file too small or empty")
+
+        with open(file_path, "rb") as pdf_file:
+            if pdf_file.read(5) != b"%PDF-":
+                raise ValueError("Invalid PDF data: does not start with PDF header")
+
+        console_log(f"Processing PDF file with {file_size} bytes for: {source_name}")
+        try:
+            return fitz.open(file_path, filetype="pdf")
+        except Exception as error:
+            raise ValueError(f"Error opening PDF: {error}")
+
+    def iter_pdf_pages(self, file_data: FileDataType, source_name: str, pages: Optional[range] = None) -> Iterator[str]:
+        """Yield the text of each PDF page, or of the pages in the given range.
+
+        Only one page is held in memory at a time.
+        """
+        pdf_document = self._open_pdf(file_data, source_name)
+        try:
             page_count = pdf_document.page_count
             console_log(f"PDF has {page_count} pages")
 
-            for page_num in range(page_count):
+            for page_num in pages if pages is not None else range(page_count):
+                if page_num >= page_count:
+                    break
                 try:
                     page = pdf_document[page_num]
                     # Use getattr to safely access the get_text method
                     page_text = getattr(page, "get_text", lambda: "")()
-                    text_content += page_text
-                    # Add page break for better text separation
-                    if page_num < page_count - 1:
-                        text_content += "\n\n"
                 except Exception as page_error:
                     console_log(f"Error processing page {page_num}: {page_error}")
                     continue
-
+                yield page_text
+        finally:
             pdf_document.close()
+
+    def extract_text_from_pdf(self, file_data: FileDataType, source_name: str) -> str:
+        """Extract text from PDF using PyMuPDF (fitz)."""
+        try:
+            text_content = self.join_text("pdf", self.iter_pdf_pages(file_data, source_name))
             console_log(f"Successfully extracted {len(text_content)} characters from PDF: {source_name}")
             return text_content
 
+        except (RuntimeError, ValueError) as e:
+            # Missing library or invalid PDF data
+            return str(e)
         except Exception as e:
             console_log(f"Error extracting text from PDF {source_name}: {str(e)}")
             return f"Error extracting text from PDF: {str(e)}"
 
-    def extract_text_from_docx(self, file_data: bytes, source_name: str) -> str:
-        """Extract text from DOCX using python-docx."""
+    def iter_docx_sections(self, file_data: FileDataType, source_name: str) -> Iterator[str]:
+        """Yield the text of each DOCX paragraph and table row."""
         if not DocxDocument:
-            return "python-docx not available for DOCX processing"
+            raise RuntimeError("python-docx not available for DOCX processing")
 
-        try:
-            # Create a file-like object from bytes
-            doc = DocxDocument(io.BytesIO(file_data))
-            text_content = ""
+        # Create a file-like object from bytes
+        doc = DocxDocument(self._as_file(file_data))
 
-            # Extract text from paragraphs
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text_content += paragraph.text + "\n"
+        # Extract text from paragraphs
+        for paragraph in doc.paragraphs:
+            if paragraph.text.strip():
+                yield paragraph.text + "\n"
 
-            # Extract text from tables
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        if cell.text.strip():
-                            text_content += cell.text + " "
-                    text_content += "\n"
+        # Extract text from tables
+        for table in doc.tables:
+            for row in table.rows:
+                yield "".join(cell.text + " " for cell in row.cells if cell.text.strip()) + "\n"
 
+    def extract_text_from_docx(self, file_data: FileDataType, source_name: str) -> str:
+        """Extract text from DOCX using python-docx."""
+        try:
+            text_content = self.join_text("docx", self.iter_docx_sections(file_data, source_name))
             console_log(f"Successfully extracted text from DOCX: {source_name}")
-            return text_content.strip()
+            return text_content
 
+        except RuntimeError as e:
+            return str(e)
         except Exception as e:
             console_log(f"Error extracting text from DOCX {source_name}: {str(e)}")
             return f"Error extracting text from DOCX: {str(e)}"
 
-    def extract_text_from_doc(self, file_data: bytes, source_name: str) -> str:
+    def extract_text_from_doc(self, file_data: FileDataType, source_name: str) -> str:
         """Extract text from DOC (legacy format) using docx2txt."""
         if not docx2txt:
             return "docx2txt not available for DOC processing"
 
         try:
-            # Create a temporary file for docx2txt
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".doc") as temp_file:
-                temp_file.write(file_data)
-                temp_file_path = temp_file.name
+            if isinstance(file_data, str):
+                text_content = docx2txt.process(file_data)
+            else:
+                # Create a temporary file for docx2txt
+                with tempfile.NamedTemporaryFile(delete=False, suffix=".doc") as temp_file:
+                    temp_file.write(file_data)
+                    temp_file_path = temp_file.name
 
-            # Extract text using docx2txt
-            text_content = docx2txt.process(temp_file_path)
+                # Extract text using docx2txt
+                text_content = docx2txt.process(temp_file_path)
 
-            # Clean up temporary file
-            os.unlink(temp_file_path)
+                # Clean up temporary file
+                os.unlink(temp_file_path)
 
             console_log(f"Successfully extracted text from DOC: {source_name}")
             return text_content.strip()
@@ -180,46 +239,51 @@ class DocumentProcessor:
             console_log(f"Error extracting text from DOC {source_name}: {str(e)}")
             return f"Error extracting text from DOC: {str(e)}"
 
-    def extract_text_from_pptx(self, file_data: bytes, source_name: str) -> str:
-        """Extract text from PPTX using python-pptx."""
+    def iter_pptx_slides(self, file_data: FileDataType, source_name: str) -> Iterator[str]:
+        """Yield the text of each PPTX slide that has any."""
         if not Presentation:
-            return "python-pptx not available for PPTX processing"
+            raise RuntimeError("python-pptx not available for PPTX processing")
 
-        try:
-            # Create a file-like object from bytes
-            prs = Presentation(io.BytesIO(file_data))
-            text_content = ""
-
-            for slide_num, slide in enumerate(prs.slides):
-                slide_text = ""
-
-                # Extract text from shapes
-                for shape in slide.shapes:
-                    if hasattr(shape, "text") and getattr(shape, "text", "").strip():
-                        slide_text += getattr(shape, "text", "") + " "
-
-                # Extract text from tables
-                for shape in slide.shapes:
-                    if hasattr(shape, "has_table") and getattr(shape, "has_table", False):
-                        table = getattr(shape, "table", None)
-                        if table and hasattr(table, "rows"):
-                            for row in table.rows:
-                                if hasattr(row, "cells"):
-                                    for cell in row.cells:
-                                        if hasattr(cell, "text") and getattr(cell, "text", "").strip():
-                                            slide_text += getattr(cell, "text", "") + " "
-
-                if slide_text.strip():
-                    text_content += f"Slide {slide_num + 1}:\n{slide_text.strip()}\n\n"
+        # Create a file-like object from bytes
+        prs = Presentation(self._as_file(file_data))
 
+        for slide_num, slide in enumerate(prs.slides):
+            slide_parts = []
+
+            # Extract text from shapes
+            for shape in slide.shapes:
+                if hasattr(shape, "text") and getattr(shape, "text", "").strip():
+                    slide_parts.append(getattr(shape, "text", "") + " ")
+
+            # Extract text from tables
+            for shape in slide.shapes:
+                if hasattr(shape, "has_table") and getattr(shape, "has_table", False):
+                    table = getattr(shape, "table", None)
+                    if table and hasattr(table, "rows"):
+                        for row in table.rows:
+                            if hasattr(row, "cells"):
+                                for cell in row.cells:
+                                    if hasattr(cell, "text") and getattr(cell, "text", "").strip():
+                                        slide_parts.append(getattr(cell, "text", "") + " ")
+
+            slide_text = "".join(slide_parts)
+            if slide_text.strip():
+                yield f"Slide {slide_num + 1}:\n{slide_text.strip()}\n\n"
+
+    def extract_text_from_pptx(self, file_data: FileDataType, source_name: str) -> str:
+        """Extract text from PPTX using python-pptx."""
+        try:
+            text_content = self.join_text("pptx", self.iter_pptx_slides(file_data, source_name))
             console_log(f"Successfully extracted text from PPTX: {source_name}")
-            return text_content.strip()
+            return text_content
 
+        except RuntimeError as e:
+            return str(e)
         except Exception as e:
             console_log(f"Error extracting text from PPTX {source_name}: {str(e)}")
             return f"Error extracting text from PPTX: {str(e)}"
 
-    def extract_text_from_ppt(self, file_data: bytes, source_name: str) -> str:
+    def extract_text_from_ppt(self, file_data: FileDataType, source_name: str) -> str:
         """Extract text from PPT (legacy format) using python-pptx.
         Note: This is a fallback as python-pptx primarily supports PPTX."""
         try:
@@ -229,11 +293,11 @@ class DocumentProcessor:
             console_log(f"Error extracting text from PPT {source_name}: {str(e)}")
             return f"Error extracting text from PPT: {str(e)}"
 
-    def extract_text_from_json(self, file_data: bytes, source_name: str) -> str:
+    def extract_text_from_json(self, file_data: FileDataType, source_name: str) -> str:
         """Extract text from JSON by formatting it as readable text."""
         try:
             # Decode bytes to string
-            json_str = file_data.decode("utf-8")
+            json_str = self.read_bytes(file_data).decode("utf-8")
 
             # Parse JSON
             json_data = json.loads(json_str)
@@ -248,7 +312,7 @@ class DocumentProcessor:
             console_log(f"Error extracting text from JSON {source_name}: {str(e)}")
             return f"Error extracting text from JSON: {str(e)}"
 
-    def extract_text_from_file(self, file_data: bytes, file_type: str, source_name: str) -> str:
+    def extract_text_from_file(self, file_data: FileDataType, file_type: str, source_name: str) -> str:
         """Extract text from file based on file type."""
         file_type = file_type.lower()
 
@@ -264,10 +328,85 @@ class DocumentProcessor:
             return self.extract_text_from_ppt(file_data, source_name)
         elif file_type == "json":
             return self.extract_text_from_json(file_data, source_name)
+        elif file_type == "text":
+            return self.read_bytes(file_data).decode("utf-8", errors="ignore")
         else:
             console_log(f"Unsupported file type: {file_type}")
             return f"Unsupported file type: {file_type}"
 
+    def iter_text_from_file(self, file_data: FileDataType, file_type: str, source_name: str) -> Iterator[str]:
+        """Yield the text of a file piece by piece (pages, slides, paragraphs).
+
+        Formats without a streaming extractor yield their whole text at once.
+        Raises if the document cannot be opened.
+        """
+        file_type = file_type.lower()
+
+        if file_type == "pdf":
+            return self.iter_pdf_pages(file_data, source_name)
+        elif file_type == "docx":
+            return self.iter_docx_sections(file_data, source_name)
+        elif file_type in ("pptx", "ppt"):
+            return self.iter_pptx_slides(file_data, source_name)
+        else:
+            return iter([self.extract_text_from_file(file_data, file_type, source_name)])
+
+    @staticmethod
+    def join_text(file_type: str, pieces: Iterable[str]) -> str:
+        """Join pieces yielded by iter_text_from_file into the text extract_text_from_file returns."""
+        file_type = file_type.lower()
+
+        if file_type == "pdf":
+            # Add page break between pages for better text separation
+            return "\n\n".join(pieces)
+        elif file_type in ("docx", "pptx", "ppt"):
+            return "".join(pieces).strip()
+        else:
+            return "".join(pieces)
+
+    @staticmethod
+    def detect_file_type(file_data: FileDataType, declared_type: Optional[str] = None) -> Optional[str]:
+        """Detect the format of a file from its magic bytes.
+
+        Returns one of the supported formats, "text" for UTF-8 text, or None if the format is unknown.
+        The declared type only settles what the bytes cannot tell apart (.doc and .ppt share a container).
+        """
+        declared_type = declared_type.lower() if declared_type else None
+
+        if isinstance(file_data, str):
+            with open(file_data, "rb") as file:
+                header = file.read(SNIFF_BYTES)
+        else:
+            header = file_data[:SNIFF_BYTES]
+
+        if header.startswith(PDF_MAGIC):
+            return "pdf"
+
+        if header.startswith(OLE_MAGIC):
+            return declared_type if declared_type in ("doc", "ppt") else "doc"
+
+        if header.startswith(ZIP_MAGIC):
+            # Office Open XML packages are told apart by their part names
+            try:
+                with zipfile.ZipFile(file_data if isinstance(file_data, str) else io.BytesIO(file_data)) as archive:
+                    names = archive.namelist()
+            except zipfile.BadZipFile:
+                return None
+            if any(name.startswith("word/") for name in names):
+                return "docx"
+            if any(name.startswith("ppt/") for name in names):
+                return "pptx"
+            return None
+
+        try:
+            # final=False tolerates a multi-byte character cut at the end of the sniffed header
+            text = codecs.getincrementaldecoder("utf-8")().decode(header, final=False)
+        except UnicodeDecodeError:
+            return None
+        if text.lstrip()[:1] in ("{", "[") and declared_type in (None, "json"):
+            return "json"
+        return "text"
+
     def get_supported_formats(self) -> list:
         """Get list of supported file formats."""
         return ["pdf", "docx", "doc", "pptx", "ppt", "json"]
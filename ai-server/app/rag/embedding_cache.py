@@ -0,0 +1,251 @@
+"""
+Content-addressed embedding cache shared across ingestions and workers.
+"""
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unicodedata
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.rag.stats import Counters, ratio
+from app.shared.config.config import env
+from app.shared.dependencies.instance import instance
+from app.shared.logger.logger import console_log
+
+REDIS_KEY_PREFIX = "rag:emb:"
+SQLITE_BATCH_SIZE = 500
+MAINTENANCE_EVERY_WRITES = 1000
+
+
+def normalize_text_for_cache(text: str) -> str:
+    """Normalise text so trivially different copies of a chunk share a cache entry"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def text_digest(text: str) -> str:
+    """sha256 of the normalised text"""
+    return hashlib.sha256(normalize_text_for_cache(text).encode("utf-8")).hexdigest()
+
+
+def _l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+class DiskEmbeddingTier:
+    """SQLite-backed local tier with TTL and least-recently-used eviction"""
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._writes_since_maintenance = 0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS embeddings_accessed_at ON embeddings (accessed_at)")
+        self._connection.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        now = time.time()
+        expired_before = now - self.ttl_seconds
+
+        with self._lock:
+            for start in range(0, len(keys), SQLITE_BATCH_SIZE):
+                batch = keys[start : start + SQLITE_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._connection.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders}) AND created_at >= ?",
+                    (*batch, expired_before),
+                ).fetchall()
+                for key, vector in rows:
+                    found[key] = np.frombuffer(vector, dtype="<f4")
+
+            if found:
+                self._connection.executemany(
+                    "UPDATE embeddings SET accessed_at = ? WHERE key = ?", [(now, key) for key in found]
+                )
+                self._connection.commit()
+
+        return found
+
+    def put_many(self, entries: Dict[str, np.ndarray]) -> None:
+        now = time.time()
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                [(key, vector.astype("<f4").tobytes(), now, now) for key, vector in entries.items()],
+            )
+            self._connection.commit()
+
+            self._writes_since_maintenance += len(entries)
+            if self._writes_since_maintenance >= MAINTENANCE_EVERY_WRITES:
+                self._writes_since_maintenance = 0
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then the least recently used ones above max_entries"""
+        self._connection.execute("DELETE FROM embeddings WHERE created_at < ?", (now - self.ttl_seconds,))
+        (count,) = self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        if count > self.max_entries:
+            self._connection.execute(
+                "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,),
+            )
+        self._connection.commit()
+
+
+class RedisEmbeddingTier:
+    """Shared Redis tier storing compact little-endian float16/float32 blobs with a TTL.
+
+    Eviction beyond the TTL is left to the Redis maxmemory policy (allkeys-lru recommended).
+    """
+
+    def __init__(self, ttl_seconds: int, dtype: str = "float16", key_prefix: str = REDIS_KEY_PREFIX):
+        self.ttl_seconds = ttl_seconds
+        self.dtype = np.dtype(dtype).newbyteorder("<")
+        self.key_prefix = key_prefix
+
+    def _client(self):
+        return instance.redis_binary_client
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        client = self._client()
+        if client is None or not keys:
+            return {}
+
+        values = client.mget([f"{self.key_prefix}{key}" for key in keys])
+        return {
+            key: np.frombuffer(value, dtype=self.dtype).astype(np.float32)
+            for key, value in zip(keys, values)
+            if value is not None
+        }
+
+    def put_many(self, entries: Dict[str, np.ndarray]) -> None:
+        client = self._client()
+        if client is None or not entries:
+            return
+
+        pipeline = client.pipeline(transaction=False)
+        for key, vector in entries.items():
+            pipeline.set(f"{self.key_prefix}{key}", vector.astype(self.dtype).tobytes(), ex=self.ttl_seconds)
+        pipeline.execute()
+
+
+class EmbeddingCache:
+    """Two-tier (local disk, then Redis) content-addressed embedding cache"""
+
+    def __init__(self, disk_tier: Optional[DiskEmbeddingTier], redis_tier: Optional[RedisEmbeddingTier]):
+        self.disk_tier = disk_tier
+        self.redis_tier = redis_tier
+        self.stats = Counters(("disk_hits", "redis_hits", "misses", "writes", "errors"))
+
+    @staticmethod
+    def make_keys(model_key: str, texts: List[str]) -> List[str]:
+        """Cache keys for texts embedded with model_key (model name and output dimension)"""
+        return [f"{model_key}:{text_digest(text)}" for text in texts]
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Look up keys in the disk tier, then the Redis tier. Redis hits are promoted to disk."""
+        unique_keys = list(dict.fromkeys(keys))
+        found: Dict[str, np.ndarray] = {}
+
+        if self.disk_tier is not None:
+            try:
+                found.update(self.disk_tier.get_many(unique_keys))
+            except Exception as error:
+                self.stats.record(errors=1)
+                console_log(f"Embedding cache disk lookup failed: {str(error)}")
+        disk_hits = len(found)
+
+        remaining = [key for key in unique_keys if key not in found]
+        redis_found: Dict[str, np.ndarray] = {}
+        if remaining and self.redis_tier is not None:
+            try:
+                redis_found = self.redis_tier.get_many(remaining)
+            except Exception as error:
+                self.stats.record(errors=1)
+                console_log(f"Embedding cache Redis lookup failed: {str(error)}")
+
+        if redis_found:
+            # float16 blobs lose a little precision, so restore unit length
+            stacked = _l2_normalize(np.stack(list(redis_found.values())))
+            redis_found = dict(zip(redis_found.keys(), stacked))
+            found.update(redis_found)
+            self._put_disk(redis_found)
+
+        self.stats.record(disk_hits=disk_hits, redis_hits=len(redis_found), misses=len(unique_keys) - len(found))
+        return found
+
+    def put_many(self, entries: Dict[str, np.ndarray]) -> None:
+        """Write freshly computed embeddings to both tiers"""
+        if not entries:
+            return
+
+        self._put_disk(entries)
+        if self.redis_tier is not None:
+            try:
+                self.redis_tier.put_many(entries)
+            except Exception as error:
+                self.stats.record(errors=1)
+                console_log(f"Embedding cache Redis write failed: {str(error)}")
+
+        self.stats.record(writes=len(entries))
+
+    def snapshot(self) -> Dict[str, float]:
+        counters = self.stats.counters()
+        hits = counters["disk_hits"] + counters["redis_hits"]
+        return {**counters, "hit_rate": ratio(hits, hits + counters["misses"])}
+
+    def _put_disk(self, entries: Dict[str, np.ndarray]) -> None:
+        if self.disk_tier is None or not entries:
+            return
+        try:
+            self.disk_tier.put_many(entries)
+        except Exception as error:
+            self.stats.record(errors=1)
+            console_log(f"Embedding cache disk write failed: {str(error)}")
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or create the process-wide embedding cache"""
+    global _embedding_cache
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            disk_tier = None
+            try:
+                cache_dir = env.RAG_EMBEDDING_CACHE_DIR or os.path.join(
+                    tempfile.gettempdir(), "agentstop-embedding-cache"
+                )
+                disk_tier = DiskEmbeddingTier(
+                    os.path.join(cache_dir, "embeddings.sqlite3"),
+                    max_entries=env.RAG_EMBEDDING_CACHE_MAX_ENTRIES,
+                    ttl_seconds=env.RAG_EMBEDDING_CACHE_TTL_SECONDS,
+                )
+            except Exception as error:
+                console_log(f"Embedding cache disk tier disabled: {str(error)}")
+
+            redis_tier = RedisEmbeddingTier(
+                ttl_seconds=env.RAG_EMBEDDING_CACHE_REDIS_TTL_SECONDS, dtype=env.RAG_EMBEDDING_CACHE_REDIS_DTYPE
+            )
+            _embedding_cache = EmbeddingCache(disk_tier, redis_tier)
+        return _embedding_cache
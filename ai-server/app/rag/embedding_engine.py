@@ -0,0 +1,162 @@
+"""
+Concurrent, token-aware batching for embedding requests.
+
+Texts are packed into batches by token count (and an item cap) instead of a fixed number of
+items, batches are sent concurrently under an in-flight limit, and only the batches that fail
+are retried, with jittered exponential backoff. Results are returned in input order as one
+contiguous float32 matrix.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+import numpy as np
+import tiktoken
+
+from app.shared.logger.logger import console_log
+
+# OpenAI embedding endpoint limits
+MAX_INPUT_TOKENS = 8191
+MAX_REQUEST_ITEMS = 2048
+MAX_REQUEST_TOKENS = 300_000
+
+EmbedBatchFunctionType = Callable[[List[str]], np.ndarray]
+
+
+class EmbeddingEngine:
+    """Packs texts into token-bounded batches and embeds them concurrently with per-batch retries"""
+
+    def __init__(
+        self,
+        embed_batch: EmbedBatchFunctionType,
+        embed_oversized: EmbedBatchFunctionType,
+        model: str,
+        max_batch_tokens: int = 50_000,
+        max_batch_items: int = 1024,
+        max_in_flight: int = 4,
+        max_retries: int = 5,
+        base_retry_delay: float = 0.5,
+        max_retry_delay: float = 20.0,
+    ):
+        """
+        Args:
+            embed_batch: Embeds one batch of texts that are each within MAX_INPUT_TOKENS into a float32 matrix
+            embed_oversized: Embeds texts longer than MAX_INPUT_TOKENS (e.g. by splitting and averaging)
+            model: Embedding model name, used to pick the tokenizer
+            max_batch_tokens: Token budget of a single request
+            max_batch_items: Maximum number of texts in a single request
+            max_in_flight: Maximum number of concurrent requests
+            max_retries: Retries per failed batch before giving up
+        """
+        self.embed_batch = embed_batch
+        self.embed_oversized = embed_oversized
+        self.max_batch_tokens = min(max_batch_tokens, MAX_REQUEST_TOKENS)
+        self.max_batch_items = min(max_batch_items, MAX_REQUEST_ITEMS)
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_retries = max_retries
+        self.base_retry_delay = base_retry_delay
+        self.max_retry_delay = max_retry_delay
+
+        try:
+            self.encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            self.encoding = tiktoken.get_encoding("cl100k_base")
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Created lazily so the engine can be built at import time without spawning threads
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="embedding")
+            return self._executor
+
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        """Count tokens of each text with the embedding model's tokenizer"""
+        return [len(tokens) for tokens in self.encoding.encode_ordinary_batch(texts)]
+
+    def pack_batches(self, token_counts: List[int]) -> List[List[int]]:
+        """Greedily pack text indices into batches bounded by max_batch_tokens and max_batch_items"""
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+
+        for index, token_count in enumerate(token_counts):
+            if current and (
+                current_tokens + token_count > self.max_batch_tokens or len(current) >= self.max_batch_items
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+
+            current.append(index)
+            current_tokens += token_count
+
+        if current:
+            batches.append(current)
+
+        return batches
+
+    def _embed_with_retry(self, embed: EmbedBatchFunctionType, texts: List[str]) -> np.ndarray:
+        attempt = 0
+        while True:
+            try:
+                embeddings = embed(texts)
+                if len(embeddings) != len(texts):
+                    raise ValueError(f"Expected {len(texts)} embeddings, got {len(embeddings)}")
+                return embeddings
+            except Exception as error:
+                if attempt >= self.max_retries:
+                    raise
+                # Full jitter keeps concurrent retries from hitting the rate limiter in lockstep
+                delay = random.uniform(0, min(self.max_retry_delay, self.base_retry_delay * 2**attempt))
+                attempt += 1
+                console_log(
+                    f"Embedding batch of {len(texts)} texts failed ({error}), retry {attempt}/{self.max_retries} "
+                    f"in {delay:.2f}s"
+                )
+                time.sleep(delay)
+
+    def embed(self, texts: List[str], token_counts: Optional[List[int]] = None) -> np.ndarray:
+        """Embed texts and return an (n, dimension) float32 matrix in input order"""
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        if token_counts is None:
+            token_counts = self.count_tokens(texts)
+
+        regular_indices = [i for i, count in enumerate(token_counts) if count <= MAX_INPUT_TOKENS]
+        oversized_indices = [i for i, count in enumerate(token_counts) if count > MAX_INPUT_TOKENS]
+
+        batches = [
+            [regular_indices[i] for i in batch]
+            for batch in self.pack_batches([token_counts[i] for i in regular_indices])
+        ]
+
+        started = time.perf_counter()
+        executor = self._get_executor()
+        futures = [
+            (batch, executor.submit(self._embed_with_retry, self.embed_batch, [texts[i] for i in batch]))
+            for batch in batches
+        ]
+        futures.extend(
+            ([i], executor.submit(self._embed_with_retry, self.embed_oversized, [texts[i]])) for i in oversized_indices
+        )
+
+        matrix: Optional[np.ndarray] = None
+        for batch, future in futures:
+            embeddings = future.result()
+            if matrix is None:
+                matrix = np.empty((len(texts), embeddings.shape[1]), dtype=np.float32)
+            matrix[batch] = embeddings
+
+        console_log(
+            f"Embedded {len(texts)} texts ({sum(token_counts)} tokens) in {len(futures)} batches "
+            f"with up to {self.max_in_flight} in flight in {time.perf_counter() - started:.2f}s"
+        )
+
+        assert matrix is not None
+        return matrix
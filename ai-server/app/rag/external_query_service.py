@@ -6,15 +6,18 @@ without ingesting data. It connects to existing vector databases using
 provided credentials and answers queries based on the stored data.
 """
 
+import asyncio
 from typing import List, Dict, Any, Optional
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from langchain_pinecone import PineconeVectorStore
 from langchain.prompts import PromptTemplate
 from pinecone import Pinecone
 from pydantic import SecretStr
 
 from app.shared.logger.logger import console_log
 from app.shared.config.config import env
+from app.rag.ingestion_service import TEXT_METADATA_KEY
+from app.rag.query_embedding import QueryEmbedder, QueryEmbedding
+from app.rag.search_executor import get_search_executor
 from app.rag.rag_types import (
     ExternalQueryRequestArgs,
     ExternalQueryResponseType,
@@ -32,6 +35,10 @@ class ExternalVectorDBQueryService:
     def __init__(self, config: Optional[RAGConfigType] = None):
         self.config = config or RAGConfigType()
         self.embeddings = OpenAIEmbeddings(model=self.config.embedding_model, api_key=SecretStr(env.OPENAI_KEY))
+        self.query_embedder = QueryEmbedder(
+            self.embeddings, self.config.embedding_model, use_cache=self.config.use_query_embedding_cache
+        )
+        self.search_executor = get_search_executor()
         self.llm = ChatOpenAI(
             model=self.config.llm_model, temperature=self.config.temperature, api_key=SecretStr(env.OPENAI_KEY)
         )
@@ -66,8 +73,8 @@ class ExternalVectorDBQueryService:
             input_variables=["context", "question"],
         )
 
-    def _connect_to_external_db(self, config: ExternalVectorDBConfigType) -> DefaultReturnType[PineconeVectorStore]:
-        """Connect to external vector database"""
+    def _connect_to_external_db(self, config: ExternalVectorDBConfigType) -> DefaultReturnType[Any]:
+        """Connect to external vector database and return its index"""
         try:
             # Initialize Pinecone client with external credentials
             pc = Pinecone(api_key=config.api_key)
@@ -75,11 +82,8 @@ class ExternalVectorDBQueryService:
             # Get the index
             index = pc.Index(config.index_name)
 
-            # Create vector store
-            vector_store = PineconeVectorStore(index=index, embedding=self.embeddings)
-
             console_log(f"Connected to external vector database: {config.index_name}")
-            return DefaultReturnType(data=vector_store)
+            return DefaultReturnType(data=index)
 
         except Exception as e:
             console_log(f"Error connecting to external vector database: {str(e)}")
@@ -94,32 +98,35 @@ class ExternalVectorDBQueryService:
             )
 
     async def _search_external_documents(
-        self, query: str, max_results: int, vector_db_config: ExternalVectorDBConfigType
+        self, query: QueryEmbedding, max_results: int, vector_db_config: ExternalVectorDBConfigType
     ) -> DefaultReturnType[List[SearchResultType]]:
-        """Search for relevant documents in external vector database"""
+        """Search for relevant documents in external vector database with the query's embedding"""
         try:
-            # Connect to external database
-            vector_store = self._connect_to_external_db(vector_db_config)
-            if is_error(vector_store.error):
+            # Connect to external database, which resolves the index host over the network
+            index = await self.search_executor.run(self._connect_to_external_db, vector_db_config)
+            if is_error(index.error):
                 return DefaultReturnType(
                     error=carry_error(
-                        vector_store.error,
-                        "external_query_service - _search_external_documents - if is_error(vector_store.error)",
+                        index.error,
+                        "external_query_service - _search_external_documents - if is_error(index.error)",
                     ),
                 )
 
-            assert vector_store.data is not None
+            assert index.data is not None
             # Perform similarity search
-            docs = vector_store.data.similarity_search_with_score(query=query, k=max_results)
+            response: Any = await self.search_executor.run(
+                index.data.query, vector=query.values, top_k=max_results, include_metadata=True
+            )
 
             results = []
-            for doc, score in docs:
+            for match in response.matches or []:
+                metadata = dict(match.metadata or {})
                 results.append(
                     SearchResultType(
-                        content=doc.page_content,
-                        score=float(score),
-                        metadata=doc.metadata,
-                        source=doc.metadata.get("source_name", "unknown"),
+                        content=str(metadata.pop(TEXT_METADATA_KEY, "")),
+                        score=float(match.score),
+                        metadata=metadata,
+                        source=metadata.get("source_name", "unknown"),
                     )
                 )
 
@@ -184,9 +191,12 @@ class ExternalVectorDBQueryService:
             console_log(f"Processing external query: {request.question[:100]}...")
             console_log(f"Target database: {request.vector_db_config.index_name}")
 
+            # The question is embedded once and the vector reused by every step below
+            query_embedding = await asyncio.to_thread(self.query_embedder.embed, request.question)
+
             # Search for relevant documents in external database
             search_results = await self._search_external_documents(
-                request.question, request.max_results, request.vector_db_config
+                query_embedding, request.max_results, request.vector_db_config
             )
             if is_error(search_results.error):
                 return DefaultReturnType(
@@ -300,7 +310,20 @@ class ExternalVectorDBQueryService:
         self, query: str, max_results: int, vector_db_config: ExternalVectorDBConfigType
     ) -> DefaultReturnType[List[SearchResultType]]:
         """Get similar documents from external database without generating a response"""
-        results = await self._search_external_documents(query, max_results, vector_db_config)
+        try:
+            query_embedding = await asyncio.to_thread(self.query_embedder.embed, query)
+        except Exception as e:
+            return DefaultReturnType(
+                error=ErrorResponseType(
+                    userMessage="Error embedding the question",
+                    error=str(e),
+                    errorType="InternalServerErrorException",
+                    errorData={},
+                    trace=["external_query_service - search_external_documents - except Exception"],
+                )
+            )
+
+        results = await self._search_external_documents(query_embedding, max_results, vector_db_config)
         if is_error(results.error):
             return DefaultReturnType(
                 error=carry_error(
@@ -318,18 +341,20 @@ class ExternalVectorDBQueryService:
         """Test connection to external vector database"""
         try:
             # Try to connect and perform a simple search
-            vector_store = self._connect_to_external_db(vector_db_config)
-            if is_error(vector_store.error):
+            index = await self.search_executor.run(self._connect_to_external_db, vector_db_config)
+            if is_error(index.error):
                 return DefaultReturnType(
                     error=carry_error(
-                        vector_store.error,
-                        "external_query_service - test_external_connection - if is_error(vector_store.error)",
+                        index.error,
+                        "external_query_service - test_external_connection - if is_error(index.error)",
                     )
                 )
 
-            assert vector_store.data is not None
+            assert index.data is not None
             # Perform a test search
-            test_results = vector_store.data.similarity_search("test", k=1)
+            test_embedding = await asyncio.to_thread(self.query_embedder.embed, "test")
+            test_response: Any = await self.search_executor.run(index.data.query, vector=test_embedding.values, top_k=1)
+            test_results = test_response.matches or []
 
             return DefaultReturnType(
                 data={
@@ -0,0 +1,244 @@
+"""
+Document text extraction in separate worker processes.
+
+PyMuPDF, python-docx and python-pptx run outside the API process, one short-lived process per
+task forked from a forkserver that has the extractors preloaded. Large PDFs are split into page
+ranges that are extracted on all cores and yielded back in page order.
+
+Every worker runs with an address-space limit (RAG_EXTRACTION_MEMORY_LIMIT_MB) and every document
+with a deadline (RAG_EXTRACTION_TIMEOUT_SECONDS). A worker that runs past the deadline is killed,
+and a worker that runs out of memory or crashes only fails its own document, so a malformed file
+can no longer pin or take down the uvicorn process.
+"""
+
+import itertools
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Iterator, List, Optional, Set, Tuple
+
+from app.rag.document_processor import DocumentProcessor, FileDataType
+from app.shared.config.config import env
+from app.shared.logger.logger import console_log
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# File types extracted in worker processes; the others are cheap and stay in process
+POOLED_FILE_TYPES = ("pdf", "docx", "doc", "pptx", "ppt")
+POLL_INTERVAL_SECONDS = 0.5
+
+
+class ExtractionError(Exception):
+    """Raised when a worker reports that the document could not be extracted"""
+
+
+class ExtractionLimitError(ExtractionError):
+    """Raised when a worker was killed for exceeding the time or memory limit, or crashed"""
+
+
+def _limit_resources(memory_limit_bytes: int, cpu_seconds: int) -> None:
+    if resource is None:
+        return
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+        # Backstop for the parent's deadline in case the parent itself is stuck
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 5))
+    except (ValueError, OSError) as error:
+        console_log(f"Could not limit extraction worker resources: {str(error)}")
+
+
+def _worker_main(connection: Any, task: Callable, args: Tuple, memory_limit_bytes: int, cpu_seconds: int) -> None:
+    """Entry point of a worker process. Sends ("ok", result) or ("error", error type, message) back."""
+    try:
+        _limit_resources(memory_limit_bytes, cpu_seconds)
+        connection.send(("ok", task(*args)))
+    except BaseException as error:
+        try:
+            connection.send(("error", type(error).__name__, str(error)))
+        except Exception:
+            pass
+    finally:
+        connection.close()
+
+
+# Workers open the file by path, so PyMuPDF only reads the pages of their shard
+def _count_pdf_pages(path: str, source_name: str) -> int:
+    pdf_document = DocumentProcessor()._open_pdf(path, source_name)
+    try:
+        return pdf_document.page_count
+    finally:
+        pdf_document.close()
+
+
+def _extract_pdf_pages(path: str, source_name: str, start: int, stop: int) -> List[str]:
+    return list(DocumentProcessor().iter_pdf_pages(path, source_name, range(start, stop)))
+
+
+def _extract_file(path: str, file_type: str, source_name: str) -> List[str]:
+    return list(DocumentProcessor().iter_text_from_file(path, file_type, source_name))
+
+
+class ExtractionPool:
+    """Runs extraction tasks in resource-limited worker processes, at most `workers` at a time"""
+
+    def __init__(self, workers: int, timeout_seconds: int, memory_limit_mb: int, pages_per_shard: int):
+        self.workers = workers
+        self.timeout_seconds = timeout_seconds
+        self.memory_limit_bytes = memory_limit_mb * 1024 * 1024
+        self.pages_per_shard = pages_per_shard
+
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            self._context = multiprocessing.get_context("forkserver")
+            self._context.set_forkserver_preload(["app.rag.document_processor"])
+        else:
+            self._context = multiprocessing.get_context("spawn")
+
+        # Each thread drives one worker process, which bounds the number of live workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rag-extract")
+        self._processes: Set[Any] = set()
+        self._processes_lock = threading.Lock()
+
+    def shutdown(self) -> None:
+        """Kill running workers and stop accepting tasks"""
+        with self._processes_lock:
+            for process in self._processes:
+                process.kill()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def iter_text(self, file_data: FileDataType, file_type: str, source_name: str) -> Iterator[str]:
+        """Yield the text of a file piece by piece, like DocumentProcessor.iter_text_from_file.
+
+        PDFs with more than pages_per_shard pages are extracted in page ranges on several workers.
+
+        Raises:
+            ExtractionError: the extractor failed on the document
+            ExtractionLimitError: a worker hit the time or memory limit, or crashed
+        """
+        deadline = time.monotonic() + self.timeout_seconds
+        cancelled = threading.Event()
+
+        # Workers get a path; bytes are written to disk once instead of being pickled per task
+        if isinstance(file_data, str):
+            path, temp_path = file_data, None
+        else:
+            with tempfile.NamedTemporaryFile(suffix=f".{file_type}", delete=False) as temp_file:
+                temp_file.write(file_data)
+            path = temp_path = temp_file.name
+        try:
+            if file_type.lower() != "pdf":
+                task_args = (path, file_type, source_name)
+                yield from self._submit(_extract_file, task_args, deadline, cancelled).result()
+                return
+
+            page_count = self._submit(_count_pdf_pages, (path, source_name), deadline, cancelled).result()
+            shards = iter(range(0, page_count, self.pages_per_shard))
+            if page_count > self.pages_per_shard:
+                console_log(f"Extracting {page_count} pages of {source_name} in shards of {self.pages_per_shard}")
+
+            def submit_shard(start: int) -> "Future[List[str]]":
+                stop = min(start + self.pages_per_shard, page_count)
+                return self._submit(_extract_pdf_pages, (path, source_name, start, stop), deadline, cancelled)
+
+            # Keep at most `workers` shards of this document in flight and yield them in page order
+            pending: Deque["Future[List[str]]"] = deque(
+                submit_shard(start) for start in itertools.islice(shards, self.workers)
+            )
+            while pending:
+                pages = pending.popleft().result()
+                next_start = next(shards, None)
+                if next_start is not None:
+                    pending.append(submit_shard(next_start))
+                yield from pages
+        finally:
+            # Stops the workers of shards that are still running if the consumer gave up early
+            cancelled.set()
+            if temp_path:
+                os.unlink(temp_path)
+
+    def extract_text(self, file_data: FileDataType, file_type: str, source_name: str) -> str:
+        """Extract the whole text of a file, like DocumentProcessor.extract_text_from_file"""
+        return DocumentProcessor.join_text(file_type, self.iter_text(file_data, file_type, source_name))
+
+    def _submit(self, task: Callable, args: Tuple, deadline: float, cancelled: threading.Event) -> Future:
+        return self._executor.submit(self._run, task, args, deadline, cancelled)
+
+    def _run(self, task: Callable, args: Tuple, deadline: float, cancelled: threading.Event) -> Any:
+        """Run task(*args) in a new worker process and wait for its result until the deadline"""
+        if cancelled.is_set():
+            raise ExtractionError("Extraction was cancelled")
+
+        receiver, sender = self._context.Pipe(duplex=False)
+        cpu_seconds = max(1, int(deadline - time.monotonic()) + 1)
+        process = self._context.Process(
+            target=_worker_main, args=(sender, task, args, self.memory_limit_bytes, cpu_seconds), daemon=True
+        )
+        process.start()
+        sender.close()
+        with self._processes_lock:
+            self._processes.add(process)
+
+        try:
+            while True:
+                if cancelled.is_set():
+                    raise ExtractionError("Extraction was cancelled")
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise ExtractionLimitError(f"Extraction took longer than {self.timeout_seconds} seconds")
+                if not receiver.poll(min(remaining, POLL_INTERVAL_SECONDS)):
+                    continue
+
+                try:
+                    message = receiver.recv()
+                except EOFError:
+                    process.join(timeout=5)
+                    raise ExtractionLimitError(f"Extraction worker exited unexpectedly with code {process.exitcode}")
+
+                if message[0] == "ok":
+                    return message[1]
+                _, error_type, error_message = message
+                if error_type == "MemoryError":
+                    raise ExtractionLimitError(
+                        f"Extraction exceeded the memory limit of {self.memory_limit_bytes // (1024 * 1024)} MB"
+                    )
+                raise ExtractionError(f"{error_type}: {error_message}")
+        finally:
+            receiver.close()
+            if process.is_alive():
+                process.kill()
+            process.join(timeout=5)
+            with self._processes_lock:
+                self._processes.discard(process)
+
+
+_extraction_pool: Optional[ExtractionPool] = None
+_extraction_pool_lock = threading.Lock()
+
+
+def get_extraction_pool() -> Optional[ExtractionPool]:
+    """Get or create the process-wide extraction pool. None when pooled extraction is disabled."""
+    global _extraction_pool
+    if not env.RAG_EXTRACTION_POOL_ENABLED:
+        return None
+    with _extraction_pool_lock:
+        if _extraction_pool is None:
+            _extraction_pool = ExtractionPool(
+                workers=env.RAG_EXTRACTION_WORKERS or os.cpu_count() or 1,
+                timeout_seconds=env.RAG_EXTRACTION_TIMEOUT_SECONDS,
+                memory_limit_mb=env.RAG_EXTRACTION_MEMORY_LIMIT_MB,
+                pages_per_shard=env.RAG_EXTRACTION_PAGES_PER_SHARD,
+            )
+        return _extraction_pool
+
+
+def shutdown_extraction_pool() -> None:
+    """Kill running extraction workers on application shutdown"""
+    with _extraction_pool_lock:
+        if _extraction_pool is not None:
+            _extraction_pool.shutdown()
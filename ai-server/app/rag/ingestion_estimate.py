@@ -0,0 +1,90 @@
+"""
+Dry-run estimates of what an ingestion would embed and store.
+"""
+
+import json
+from typing import Any, Dict, List
+
+from app.rag.embedding_engine import MAX_REQUEST_ITEMS, MAX_REQUEST_TOKENS
+from app.rag.rag_types import DocumentChunkType, IngestionEstimateType, RAGConfigType
+from app.rag.upsert_writer import BYTES_PER_VALUE
+from app.shared.config.config import env
+
+# Pinecone rejects vectors with more metadata than this
+MAX_METADATA_BYTES = 40 * 1024
+BYTES_PER_DIMENSION = 4  # float32
+
+
+class IngestionEstimator:
+    """Accumulates chunk batches into an IngestionEstimateType"""
+
+    def __init__(self, config: RAGConfigType, text_metadata_key: str = "text"):
+        self.config = config
+        self.text_metadata_key = text_metadata_key
+        self.max_batch_tokens = min(config.embedding_batch_tokens, MAX_REQUEST_TOKENS)
+        self.max_batch_items = min(config.embedding_batch_items, MAX_REQUEST_ITEMS)
+        self.chunks = 0
+        self.tokens = 0
+        self.embedding_batches = 0
+        self.metadata_bytes = 0
+        self.max_metadata_bytes = 0
+        self.chunks_over_metadata_limit = 0
+        self.upsert_requests = 0
+        self._upsert_vectors = 0
+        self._upsert_bytes = 0
+
+    def add(self, chunks: List[DocumentChunkType]) -> None:
+        """Account for one batch of chunks, embedded with one embedding engine call like _store_chunks does"""
+        batch_tokens = batch_items = 0
+        for chunk in chunks:
+            token_count = chunk.metadata.get("token_count", 0)
+            # Same greedy packing as EmbeddingEngine.pack_batches
+            if batch_items and (
+                batch_tokens + token_count > self.max_batch_tokens or batch_items >= self.max_batch_items
+            ):
+                self.embedding_batches += 1
+                batch_tokens = batch_items = 0
+            batch_tokens += token_count
+            batch_items += 1
+
+            metadata_size = self._metadata_size({**chunk.metadata, self.text_metadata_key: chunk.content})
+            self.metadata_bytes += metadata_size
+            self.max_metadata_bytes = max(self.max_metadata_bytes, metadata_size)
+            if metadata_size > MAX_METADATA_BYTES:
+                self.chunks_over_metadata_limit += 1
+            self._add_upsert(BYTES_PER_VALUE * self.config.embedding_dimension + metadata_size + len(chunk.id))
+
+            self.chunks += 1
+            self.tokens += token_count
+        if batch_items:
+            self.embedding_batches += 1
+
+    @staticmethod
+    def _metadata_size(metadata: Dict[str, Any]) -> int:
+        return len(json.dumps(metadata, default=str).encode("utf-8"))
+
+    def _add_upsert(self, size: int) -> None:
+        """Pack vectors into upsert requests like the upsert writer does under sustained load"""
+        if self._upsert_vectors and (
+            self._upsert_vectors >= env.RAG_UPSERT_BATCH_SIZE
+            or self._upsert_bytes + size > env.RAG_UPSERT_MAX_BATCH_BYTES
+        ):
+            self._upsert_vectors = self._upsert_bytes = 0
+        if not self._upsert_vectors:
+            self.upsert_requests += 1
+        self._upsert_vectors += 1
+        self._upsert_bytes += size
+
+    def estimate(self) -> IngestionEstimateType:
+        return IngestionEstimateType(
+            chunks=self.chunks,
+            tokens=self.tokens,
+            embedding_model=self.config.embedding_model,
+            embedding_batches=self.embedding_batches,
+            vectors=self.chunks,
+            vector_bytes=self.chunks * self.config.embedding_dimension * BYTES_PER_DIMENSION,
+            metadata_bytes=self.metadata_bytes,
+            max_metadata_bytes=self.max_metadata_bytes,
+            chunks_over_metadata_limit=self.chunks_over_metadata_limit,
+            upsert_requests=self.upsert_requests,
+        )
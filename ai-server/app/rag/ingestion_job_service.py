@@ -0,0 +1,505 @@
+"""
+Background ingestion jobs backed by Redis Streams.
+
+Ingestion requests are appended to a Redis stream and consumed by a bounded pool of workers.
+Each job runs the synchronous RAGIngestionService on a dedicated thread pool, so extraction,
+embedding and upserts never block the event loop. Job state (status, stage, progress, result)
+is kept in a Redis hash per job, which is what the status endpoint reads.
+
+Stream entries are acknowledged only after a job finishes. Entries left pending by a crashed
+process are reclaimed with XAUTOCLAIM once they have been idle for STALE_JOB_IDLE_MS, while
+live workers keep their entries fresh with a periodic XCLAIM heartbeat.
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import socket
+import tempfile
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+import redis
+from redis.exceptions import ResponseError
+
+from app.shared.config.config import env
+from app.shared.dependencies.instance import instance
+from app.shared.logger.logger import console_log
+from app.rag.ingestion_progress import IngestionJobCancelledError, IngestionProgress, IngestionStageType
+from app.rag.ingestion_service import RAGIngestionService
+from app.rag.rag_types import (
+    CrawlOptionsType,
+    FileIngestRequestArgs,
+    IngestionJobKindType,
+    IngestionJobStatusType,
+    IngestionJobType,
+    IngestRequestArgs,
+    IngestResponseType,
+)
+from app.shared.types.return_type import DefaultReturnType, ErrorResponseType
+from app.shared.utils.error_util import is_error
+
+JOB_STREAM_KEY = "rag:ingest:jobs"
+JOB_GROUP_NAME = "rag-ingest-workers"
+JOB_KEY_PREFIX = "rag:ingest:job:"
+
+STALE_JOB_IDLE_MS = 5 * 60 * 1000  # Pending entries idle for longer than this are reclaimed
+HEARTBEAT_INTERVAL_SECONDS = 60
+RECOVERY_INTERVAL_SECONDS = 60
+READ_BLOCK_MS = 2000
+
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+StreamEntryType = Tuple[str, Dict[str, str]]
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _job_key(job_id: str) -> str:
+    return f"{JOB_KEY_PREFIX}{job_id}"
+
+
+class RedisIngestionProgress(IngestionProgress):
+    """Progress reporter that persists the current stage in the job hash and honours cancellation"""
+
+    def __init__(self, redis_client: redis.Redis, job_id: str):
+        self.redis_client = redis_client
+        self.job_id = job_id
+        self.job_key = _job_key(job_id)
+
+    def report_stage(self, stage: IngestionStageType, **progress: Any) -> None:
+        self.redis_client.hset(self.job_key, mapping={"stage": stage, "progress": json.dumps(progress)})
+
+    def raise_if_cancelled(self) -> None:
+        if self.redis_client.hget(self.job_key, "cancel_requested") == "1":
+            raise IngestionJobCancelledError(f"Ingestion job {self.job_id} was cancelled")
+
+
+class IngestionJobQueue:
+    """Redis Streams job queue with a bounded worker pool for document ingestion"""
+
+    def __init__(self, service_factory: Callable[[], RAGIngestionService], workers: Optional[int] = None):
+        self.service_factory = service_factory
+        self.workers = max(1, workers or env.RAG_INGEST_WORKERS)
+        self.spool_dir = env.RAG_JOB_SPOOL_DIR or os.path.join(tempfile.gettempdir(), "agentstop-rag-jobs")
+        self.consumer_name = f"{socket.gethostname()}-{os.getpid()}"
+
+        self._job_executor: Optional[ThreadPoolExecutor] = None
+        self._reader_executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._running_tasks: set[asyncio.Task] = set()
+        self._claimed_entries: Deque[StreamEntryType] = deque()
+        self._last_recovery = 0.0
+        self._stopping = False
+
+    def _redis(self) -> redis.Redis:
+        if instance.redis_client is None:
+            raise RuntimeError("Redis client is not initialized!")
+        return instance.redis_client
+
+    # Lifecycle
+    async def start(self) -> None:
+        """Create the consumer group and start dispatching jobs to the worker pool"""
+        if self._dispatcher is not None:
+            return
+
+        await asyncio.to_thread(self._ensure_consumer_group)
+        os.makedirs(self.spool_dir, exist_ok=True)
+
+        self._stopping = False
+        self._job_executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="rag-ingest-job")
+        self._reader_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rag-ingest-reader")
+        self._slots = asyncio.Semaphore(self.workers)
+        self._dispatcher = asyncio.create_task(self._dispatch_loop())
+        console_log(f"Ingestion job queue started with {self.workers} workers as {self.consumer_name}")
+
+    async def stop(self) -> None:
+        """Stop accepting new stream entries. Unfinished entries are reclaimed after a restart."""
+        self._stopping = True
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+
+        if self._reader_executor is not None:
+            self._reader_executor.shutdown(wait=False, cancel_futures=True)
+        if self._job_executor is not None:
+            self._job_executor.shutdown(wait=False, cancel_futures=True)
+        console_log("Ingestion job queue stopped")
+
+    def _ensure_consumer_group(self) -> None:
+        try:
+            self._redis().xgroup_create(JOB_STREAM_KEY, JOB_GROUP_NAME, id="0", mkstream=True)
+        except ResponseError as error:
+            if "BUSYGROUP" not in str(error):
+                raise
+
+    # Producer side
+    def _enqueue(
+        self, kind: IngestionJobKindType, source_name: str, payload: Dict[str, Any], job_id: Optional[str] = None
+    ) -> DefaultReturnType[IngestionJobType]:
+        try:
+            job_id = job_id or uuid.uuid4().hex
+            redis_client = self._redis()
+            redis_client.hset(
+                _job_key(job_id),
+                mapping={
+                    "job_id": job_id,
+                    "kind": kind,
+                    "status": "queued",
+                    "stage": "queued",
+                    "progress": "{}",
+                    "source_name": source_name,
+                    "cancel_requested": "0",
+                    "created_at": _now_ms(),
+                    "payload": json.dumps(payload),
+                },
+            )
+            redis_client.xadd(JOB_STREAM_KEY, {"job_id": job_id})
+            console_log(f"Queued ingestion job {job_id} ({kind}) for source: {source_name}")
+
+            return self.get_job(job_id)
+
+        except Exception as error:
+            return DefaultReturnType(
+                error=ErrorResponseType(
+                    userMessage="Failed to queue ingestion job!",
+                    error=str(error),
+                    errorType="InternalServerErrorException",
+                    errorData={"kind": kind, "source_name": source_name},
+                    trace=["ingestion_job_service - _enqueue - except Exception"],
+                )
+            )
+
+    def enqueue_ingest(self, request: IngestRequestArgs) -> DefaultReturnType[IngestionJobType]:
+        """Queue a /rag/ingest request"""
+        return self._enqueue("ingest", request.source_name, {"request": request.model_dump()})
+
+    def enqueue_ingest_file(
+        self, spooled_path: str, file_type: str, request: FileIngestRequestArgs
+    ) -> DefaultReturnType[IngestionJobType]:
+        """Queue a file ingestion. The spooled upload is moved into the spool directory so the job survives restarts.
+
+        The upload should be spooled inside spool_dir, which makes the move a rename instead of a copy.
+        """
+        job_id = uuid.uuid4().hex
+        file_path = os.path.join(self.spool_dir, f"{job_id}.{file_type}")
+        try:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            shutil.move(spooled_path, file_path)
+        except Exception as error:
+            return DefaultReturnType(
+                error=ErrorResponseType(
+                    userMessage="Failed to store uploaded file for ingestion!",
+                    error=str(error),
+                    errorType="InternalServerErrorException",
+                    errorData={"source_name": request.source_name},
+                    trace=["ingestion_job_service - enqueue_ingest_file - except Exception"],
+                )
+            )
+
+        return self._enqueue(
+            "ingest_file",
+            request.source_name,
+            {"file_path": file_path, "file_type": file_type, "request": request.model_dump()},
+            job_id=job_id,
+        )
+
+    def enqueue_crawl_url(
+        self,
+        url: str,
+        source_name: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        include_links: bool = False,
+        incremental: bool = False,
+        crawl_options: Optional[CrawlOptionsType] = None,
+        dry_run: bool = False,
+    ) -> DefaultReturnType[IngestionJobType]:
+        """Queue a /rag/crawl-url request"""
+        return self._enqueue(
+            "crawl_url",
+            source_name or url,
+            {
+                "url": url,
+                "source_name": source_name,
+                "metadata": metadata,
+                "include_links": include_links,
+                "incremental": incremental,
+                "crawl_options": crawl_options.model_dump() if crawl_options else None,
+                "dry_run": dry_run,
+            },
+        )
+
+    # Job state
+    def get_job(self, job_id: str) -> DefaultReturnType[IngestionJobType]:
+        """Get the current state of a job"""
+        try:
+            fields = self._redis().hgetall(_job_key(job_id))
+            if not fields:
+                return DefaultReturnType(
+                    error=ErrorResponseType(
+                        userMessage="Ingestion job not found!",
+                        error=f"Ingestion job not found: {job_id}",
+                        errorType="NotFoundException",
+                        errorData={"job_id": job_id},
+                        trace=["ingestion_job_service - get_job - if not fields"],
+                    )
+                )
+
+            return DefaultReturnType(data=self._to_job_type(fields))
+
+        except Exception as error:
+            return DefaultReturnType(
+                error=ErrorResponseType(
+                    userMessage="Failed to get ingestion job!",
+                    error=str(error),
+                    errorType="InternalServerErrorException",
+                    errorData={"job_id": job_id},
+                    trace=["ingestion_job_service - get_job - except Exception"],
+                )
+            )
+
+    def cancel_job(self, job_id: str) -> DefaultReturnType[IngestionJobType]:
+        """Cancel a queued job immediately, or ask a running job to stop at its next stage boundary"""
+        job = self.get_job(job_id)
+        if is_error(job.error) or job.data is None:
+            return job
+
+        if job.data.status in FINISHED_STATUSES:
+            return job
+
+        try:
+            redis_client = self._redis()
+            redis_client.hset(_job_key(job_id), "cancel_requested", "1")
+            if job.data.status == "queued":
+                self._finish_job(redis_client, job_id, "cancelled")
+            console_log(f"Cancellation requested for ingestion job {job_id}")
+
+            return self.get_job(job_id)
+
+        except Exception as error:
+            return DefaultReturnType(
+                error=ErrorResponseType(
+                    userMessage="Failed to cancel ingestion job!",
+                    error=str(error),
+                    errorType="InternalServerErrorException",
+                    errorData={"job_id": job_id},
+                    trace=["ingestion_job_service - cancel_job - except Exception"],
+                )
+            )
+
+    def _to_job_type(self, fields: Dict[str, str]) -> IngestionJobType:
+        return IngestionJobType(
+            job_id=fields["job_id"],
+            kind=fields["kind"],  # type: ignore[arg-type]
+            status=fields["status"],  # type: ignore[arg-type]
+            stage=fields.get("stage", "queued"),
+            progress=json.loads(fields.get("progress") or "{}"),
+            source_name=fields.get("source_name", ""),
+            cancel_requested=fields.get("cancel_requested") == "1",
+            created_at=int(fields["created_at"]),
+            started_at=int(fields["started_at"]) if fields.get("started_at") else None,
+            finished_at=int(fields["finished_at"]) if fields.get("finished_at") else None,
+            result=IngestResponseType.model_validate_json(fields["result"]) if fields.get("result") else None,
+            error=fields.get("error") or None,
+        )
+
+    def _finish_job(
+        self,
+        redis_client: redis.Redis,
+        job_id: str,
+        status: IngestionJobStatusType,
+        result: Optional[IngestResponseType] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        mapping: Dict[str, Any] = {"status": status, "finished_at": _now_ms()}
+        if status == "completed":
+            mapping["stage"] = "completed"
+        if result is not None:
+            mapping["result"] = result.model_dump_json()
+        if error is not None:
+            mapping["error"] = error
+
+        job_key = _job_key(job_id)
+        redis_client.hset(job_key, mapping=mapping)
+        redis_client.expire(job_key, env.RAG_JOB_TTL_SECONDS)
+
+    # Consumer side
+    async def _dispatch_loop(self) -> None:
+        assert self._slots is not None
+        loop = asyncio.get_running_loop()
+
+        while not self._stopping:
+            await self._slots.acquire()
+            try:
+                entry = await loop.run_in_executor(self._reader_executor, self._next_entry)
+            except asyncio.CancelledError:
+                self._slots.release()
+                raise
+            except Exception as error:
+                self._slots.release()
+                console_log(f"Error reading ingestion job stream: {str(error)}")
+                await asyncio.sleep(3)
+                continue
+
+            if entry is None:
+                self._slots.release()
+                continue
+
+            task = asyncio.create_task(self._process_entry(*entry))
+            self._running_tasks.add(task)
+            task.add_done_callback(self._running_tasks.discard)
+
+    def _next_entry(self) -> Optional[StreamEntryType]:
+        """Runs on the reader thread: prefer reclaimed stale entries, then block for new ones"""
+        redis_client = self._redis()
+
+        if time.monotonic() - self._last_recovery > RECOVERY_INTERVAL_SECONDS:
+            self._last_recovery = time.monotonic()
+            claimed = redis_client.xautoclaim(
+                JOB_STREAM_KEY,
+                JOB_GROUP_NAME,
+                self.consumer_name,
+                min_idle_time=STALE_JOB_IDLE_MS,
+                start_id="0-0",
+                count=self.workers,
+            )
+            for entry_id, fields in claimed[1]:
+                if fields:
+                    console_log(f"Reclaimed stale ingestion job entry {entry_id}")
+                    self._claimed_entries.append((entry_id, fields))
+
+        if self._claimed_entries:
+            return self._claimed_entries.popleft()
+
+        response = redis_client.xreadgroup(
+            JOB_GROUP_NAME, self.consumer_name, {JOB_STREAM_KEY: ">"}, count=1, block=READ_BLOCK_MS
+        )
+        if not response:
+            return None
+
+        _, entries = response[0]
+        if not entries:
+            return None
+
+        entry_id, fields = entries[0]
+        return entry_id, fields
+
+    async def _process_entry(self, entry_id: str, fields: Dict[str, str]) -> None:
+        assert self._slots is not None
+        loop = asyncio.get_running_loop()
+        heartbeat = asyncio.create_task(self._heartbeat(entry_id))
+
+        try:
+            await loop.run_in_executor(self._job_executor, self._run_job, fields.get("job_id", ""))
+        except Exception as error:
+            console_log(f"Ingestion job entry {entry_id} crashed: {str(error)}")
+        finally:
+            heartbeat.cancel()
+            try:
+                await asyncio.to_thread(self._acknowledge, entry_id)
+            except Exception as error:
+                console_log(f"Failed to acknowledge ingestion job entry {entry_id}: {str(error)}")
+            self._slots.release()
+
+    async def _heartbeat(self, entry_id: str) -> None:
+        """Reset the idle time of an in-flight entry so other workers do not reclaim it"""
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL_SECONDS)
+            try:
+                await asyncio.to_thread(
+                    self._redis().xclaim,
+                    JOB_STREAM_KEY,
+                    JOB_GROUP_NAME,
+                    self.consumer_name,
+                    0,
+                    [entry_id],
+                    justid=True,
+                )
+            except Exception as error:
+                console_log(f"Ingestion job heartbeat failed for {entry_id}: {str(error)}")
+
+    def _acknowledge(self, entry_id: str) -> None:
+        redis_client = self._redis()
+        redis_client.xack(JOB_STREAM_KEY, JOB_GROUP_NAME, entry_id)
+        redis_client.xdel(JOB_STREAM_KEY, entry_id)
+
+    def _run_job(self, job_id: str) -> None:
+        """Runs on a worker thread: execute one job and record its outcome"""
+        redis_client = self._redis()
+        fields = redis_client.hgetall(_job_key(job_id))
+        if not fields:
+            return
+
+        payload = json.loads(fields.get("payload") or "{}")
+        try:
+            if fields.get("status") in FINISHED_STATUSES:
+                return
+
+            if fields.get("cancel_requested") == "1":
+                self._finish_job(redis_client, job_id, "cancelled")
+                return
+
+            redis_client.hset(_job_key(job_id), mapping={"status": "running", "started_at": _now_ms()})
+            console_log(f"Running ingestion job {job_id} ({fields['kind']})")
+
+            progress = RedisIngestionProgress(redis_client, job_id)
+            result = self._execute(fields["kind"], payload, progress)
+
+            if is_error(result.error):
+                if redis_client.hget(_job_key(job_id), "cancel_requested") == "1":
+                    self._finish_job(redis_client, job_id, "cancelled")
+                else:
+                    self._finish_job(redis_client, job_id, "failed", error=result.error.error)
+                return
+
+            self._finish_job(redis_client, job_id, "completed", result=result.data)
+            console_log(f"Ingestion job {job_id} completed")
+
+        except IngestionJobCancelledError:
+            self._finish_job(redis_client, job_id, "cancelled")
+            console_log(f"Ingestion job {job_id} cancelled")
+        except Exception as error:
+            self._finish_job(redis_client, job_id, "failed", error=str(error))
+            console_log(f"Ingestion job {job_id} failed: {str(error)}")
+        finally:
+            file_path = payload.get("file_path")
+            if file_path and os.path.exists(file_path):
+                os.unlink(file_path)
+
+    def _execute(
+        self, kind: str, payload: Dict[str, Any], progress: IngestionProgress
+    ) -> DefaultReturnType[IngestResponseType]:
+        service = self.service_factory()
+
+        match kind:
+            case "ingest":
+                request = IngestRequestArgs.model_validate(payload["request"])
+                return service.ingest_document(request, progress=progress)
+            case "ingest_file":
+                # The spooled file is extracted in place, never loaded as a whole
+                file_request = FileIngestRequestArgs.model_validate(payload["request"])
+                return service.ingest_file(payload["file_path"], payload["file_type"], file_request, progress=progress)
+            case "crawl_url":
+                return service.crawl_url(
+                    payload["url"],
+                    payload.get("source_name"),
+                    payload.get("metadata"),
+                    payload.get("include_links", False),
+                    incremental=payload.get("incremental", False),
+                    crawl_options=CrawlOptionsType.model_validate(payload.get("crawl_options") or {}),
+                    progress=progress,
+                    dry_run=payload.get("dry_run", False),
+                )
+            case _:
+                raise ValueError(f"Unknown ingestion job kind: {kind}")
@@ -0,0 +1,31 @@
+"""
+Progress reporting hooks for the ingestion pipeline.
+
+The ingestion service reports the stage it is in through an IngestionProgress instance.
+Synchronous requests use the no-op default, while background jobs plug in a reporter that
+persists the stage and honours cancellation requests.
+"""
+
+from typing import Any, Literal
+
+
+IngestionStageType = Literal["queued", "extracting", "chunking", "embedding", "upserting", "completed"]
+
+
+class IngestionJobCancelledError(Exception):
+    """Raised inside the ingestion pipeline when the running job has been cancelled"""
+
+
+class IngestionProgress:
+    """No-op progress reporter used when ingestion runs inline in a request"""
+
+    def report_stage(self, stage: IngestionStageType, **progress: Any) -> None:
+        """Record that the pipeline entered a new stage"""
+        return None
+
+    def raise_if_cancelled(self) -> None:
+        """Abort the pipeline with IngestionJobCancelledError if cancellation was requested"""
+        return None
+
+
+NO_PROGRESS = IngestionProgress()
@@ -1,19 +1,45 @@
-import uuid
-import tiktoken
-import json
+import hashlib
 import re
+import base64
+import binascii
+import numpy as np
+import json
 import os
 import tempfile
-from typing import List, Dict, Any, Optional
-from langchain.text_splitter import RecursiveCharacterTextSplitter, TokenTextSplitter
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Set, Tuple
 from langchain_openai import OpenAIEmbeddings
 from langchain_pinecone import PineconeVectorStore
 from pinecone import Pinecone, ServerlessSpec
 from pydantic import SecretStr
 from firecrawl import FirecrawlApp
+from firecrawl.v2.types import PaginationConfig
 
 # Import the new lightweight document processor
-from app.rag.document_processor import DocumentProcessor
+from app.rag.document_processor import DocumentProcessor, FileDataType
+from app.rag.extraction_pool import POOLED_FILE_TYPES, ExtractionLimitError, get_extraction_pool
+from app.rag.chunking import TextChunk, TokenChunker, get_chunker
+from app.rag.crawl_state import (
+    CrawlPageStateType,
+    content_hash,
+    fetch_validators,
+    get_crawl_state_store,
+    settings_fingerprint,
+)
+from app.rag.text_cleaner import clean_ingested_text, remove_markdown_links
+from app.rag.embedding_cache import EmbeddingCache, get_embedding_cache
+from app.rag.embedding_engine import EmbeddingEngine
+from app.rag.upsert_writer import get_upsert_writer
+from app.rag.source_catalog import get_source_catalog
+from app.rag.dedup import CrawlDeduplicator
+from app.rag.ingestion_estimate import IngestionEstimator
+from app.rag.tenancy import group_by_namespace, source_namespace
+from app.rag.answer_cache import get_content_versions, namespace_version_key, source_version_key
+from app.rag.ingestion_progress import NO_PROGRESS, IngestionJobCancelledError, IngestionProgress
 
 from app.shared.config.config import env
 from app.shared.logger.logger import console_log
@@ -24,49 +50,227 @@ from app.rag.rag_types import (
     DocumentChunkType,
     DataSourceType,
     RAGConfigType,
+    CrawlOptionsType,
+    BulkIngestRequestArgs,
+    BulkDocumentType,
+    BulkDocumentResultType,
+    BulkIngestResponseType,
+    RAGSourceType,
 )
 from app.shared.types.return_type import DefaultReturnType, ErrorResponseType
 from app.shared.utils.error_util import carry_error, is_error
 
+# Metadata key holding the chunk text, matching langchain's PineconeVectorStore default
+TEXT_METADATA_KEY = "text"
+FETCH_BATCH_SIZE = 100
+LIST_PAGE_SIZE = 100
+DELETE_BATCH_SIZE = 1000
+# Metadata that changes on every crawl without the chunk itself changing
+# (file_sha256 was stamped on the chunks of earlier file ingestions and is ignored on them)
+VOLATILE_METADATA_KEYS = {"crawl_timestamp", "crawl_metadata", "file_sha256"}
+# Metadata only known once a document is fully chunked. Streamed documents are stored without it
+# (the source catalog's chunk_count holds their count), so their diffs ignore it on stored chunks
+CHUNK_COUNT_METADATA_KEYS = {"total_chunks"}
+# Texts the document processor returns instead of raising when a file cannot be extracted
+EXTRACTION_FAILURE_PREFIXES = ("Error extracting text", "docx2txt not available", "Unsupported file type")
+# Chunk batches prepared ahead of the embed/upsert stage while a file is streamed
+STREAM_PREFETCH_BATCHES = 2
+
+
+def chunk_id_prefix(root_source_name: str) -> str:
+    """Id prefix shared by every chunk of a source: "{source}#".
+
+    "%" and "#" in the source name are escaped, so the prefix of one source never matches the
+    chunks of another.
+    """
+    return root_source_name.replace("%", "%25").replace("#", "%23") + "#"
+
+
+def chunk_id_source(chunk_id: str) -> Optional[str]:
+    """Root source name of a "{source}#{digest}" chunk id, None for ids of the old schemes"""
+    escaped, separator, _ = chunk_id.partition("#")
+    return escaped.replace("%23", "#").replace("%25", "%") if separator else None
+
+
+def _legacy_chunk_id_pattern(root_source_name: str) -> "re.Pattern[str]":
+    """Ids written before chunk ids were prefixed with "{source}#": random "{source}_{hex8}_{i}" ids
+    (crawled pages as "{source}_page_{n}_{hex8}_{i}") and content-derived "{source}_{hex32}[_{n}]" ids
+    """
+    return re.compile(re.escape(root_source_name) + r"_(?:page_\d+_)?(?:[0-9a-f]{8}_\d+|[0-9a-f]{32}(?:_\d+)?)")
+
+
+class KeptChunks:
+    """Stored chunks that the producer of chunk batches skipped as unchanged, filled in while it runs"""
+
+    def __init__(self):
+        self.ids: Set[str] = set()
+        self.tokens = 0
+
+
+def _prefetch(items: Iterator[Any], depth: int) -> Iterator[Any]:
+    """Produce items on a background thread, at most depth ahead of the consumer.
+
+    Lets extraction and chunking of the next pages overlap with embedding of the current batch.
+    Exceptions of the producer are re-raised in the consumer.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=depth)
+    stopped = threading.Event()
+    done = object()
+
+    def put(item: Any) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+            put((done, None))
+        except BaseException as error:
+            put((done, error))
+        finally:
+            # Lets generators release what they hold (remote crawls, worker processes) when stopped early
+            close = getattr(items, "close", None)
+            if close is not None:
+                close()
+
+    producer = threading.Thread(target=produce, name="rag-stream-prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        # Unblocks the producer if the consumer stops early
+        stopped.set()
+
 
 class DimensionReducedEmbeddings(OpenAIEmbeddings):
-    """Custom embeddings class that reduces dimensions from 1536 to 1024"""
+    """Custom embeddings class that produces 1024-dimensional float32 embeddings for the Pinecone index.
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self._source_dimension = 1536  # text-embedding-3-small dimension
-        self._target_dimension = 1024  # Pinecone index dimension
-
-    def _reduce_dimensions(self, embeddings: List[List[float]]) -> List[List[float]]:
-        """Reduce embedding dimensions from 1536 to 1024 by taking the first 1024 dimensions"""
-        reduced_embeddings = []
-        for embedding in embeddings:
-            if len(embedding) == self._source_dimension:
-                # Take the first 1024 dimensions
-                reduced_embedding = embedding[: self._target_dimension]
-                reduced_embeddings.append(reduced_embedding)
-            else:
-                # If already 1024 dimensions, use as is
-                reduced_embeddings.append(embedding)
+    text-embedding-3 models are asked for the target dimension natively. For other models the
+    vectors are truncated and L2-renormalised so cosine scores stay calibrated. Texts that were
+    embedded before are served from the shared embedding cache instead of the API.
+    """
 
-        if embeddings and len(embeddings[0]) == self._source_dimension:
-            console_log(
-                f"Reduced {len(embeddings)} embeddings from {self._source_dimension} to {self._target_dimension} dimensions"
+    def __init__(
+        self,
+        target_dimension: int = 1024,
+        native_dimensions: bool = True,
+        max_batch_tokens: int = 50_000,
+        max_batch_items: int = 1024,
+        max_in_flight: int = 4,
+        max_retries: int = 5,
+        use_cache: bool = True,
+        **kwargs,
+    ):
+        model = kwargs.get("model", "")
+        if native_dimensions and model.startswith("text-embedding-3") and kwargs.get("dimensions") is None:
+            kwargs["dimensions"] = target_dimension
+
+        super().__init__(**kwargs)
+        self._target_dimension = target_dimension  # Pinecone index dimension
+        self._engine = EmbeddingEngine(
+            embed_batch=self._embed_batch,
+            embed_oversized=self._embed_oversized,
+            model=self.model,
+            max_batch_tokens=max_batch_tokens,
+            max_batch_items=max_batch_items,
+            max_in_flight=max_in_flight,
+            max_retries=max_retries,
+        )
+        self._cache: Optional[EmbeddingCache] = get_embedding_cache() if use_cache else None
+        # Cached vectors are only interchangeable for the same model and output dimension
+        self._cache_model_key = f"{self.model}:{self._target_dimension}"
+
+    @property
+    def encoding_name(self) -> str:
+        """Name of the tokenizer used to count tokens for batching"""
+        return self._engine.encoding.name
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Embed one token-bounded batch with a single API request.
+
+        Embeddings are requested base64-encoded and decoded straight into float32,
+        so no per-element Python floats are created.
+        """
+        response = self.client.create(input=texts, encoding_format="base64", **self._invocation_params)
+        data = sorted(response.data, key=lambda item: item.index)
+        return np.stack([np.frombuffer(base64.b64decode(item.embedding), dtype="<f4") for item in data])
+
+    def _embed_oversized(self, texts: List[str]) -> np.ndarray:
+        """Embed texts above the model context length with langchain's length-safe path"""
+        return np.asarray(super().embed_documents(texts), dtype=np.float32)
+
+    def _reduce_dimensions(self, embeddings: np.ndarray) -> np.ndarray:
+        """Truncate embeddings to the target dimension and L2-renormalise them"""
+        if embeddings.shape[1] <= self._target_dimension:
+            return np.ascontiguousarray(embeddings, dtype=np.float32)
+
+        source_dimension = embeddings.shape[1]
+        reduced = np.ascontiguousarray(embeddings[:, : self._target_dimension], dtype=np.float32)
+        norms = np.linalg.norm(reduced, axis=1, keepdims=True)
+        np.divide(reduced, norms, out=reduced, where=norms > 0)
+
+        console_log(
+            f"Reduced {len(embeddings)} embeddings from {source_dimension} to {self._target_dimension} dimensions"
+        )
+        return reduced
+
+    def embed_documents_matrix(self, texts: List[str], token_counts: Optional[List[int]] = None) -> np.ndarray:
+        """Embed documents into an (n, target_dimension) float32 matrix"""
+        if not texts:
+            return np.empty((0, self._target_dimension), dtype=np.float32)
+        if self._cache is None:
+            return self._reduce_dimensions(self._engine.embed(texts, token_counts))
+
+        keys = self._cache.make_keys(self._cache_model_key, texts)
+        cached = self._cache.get_many(keys)
+
+        # Embed each uncached text once, even if it repeats within the batch
+        missing: Dict[str, int] = {}
+        for index, key in enumerate(keys):
+            if key not in cached and key not in missing:
+                missing[key] = index
+
+        if missing:
+            missing_indices = list(missing.values())
+            computed = self._reduce_dimensions(
+                self._engine.embed(
+                    [texts[i] for i in missing_indices],
+                    [token_counts[i] for i in missing_indices] if token_counts is not None else None,
+                )
             )
+            fresh = dict(zip(missing.keys(), computed))
+            self._cache.put_many(fresh)
+            cached.update(fresh)
 
-        return reduced_embeddings
+        matrix = np.empty((len(texts), self._target_dimension), dtype=np.float32)
+        for index, key in enumerate(keys):
+            matrix[index] = cached[key]
+        return matrix
+
+    def embed_query_vector(self, text: str) -> np.ndarray:
+        """Embed a query into a float32 vector"""
+        return self.embed_documents_matrix([text])[0]
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        """Embed documents and reduce dimensions"""
-        embeddings = super().embed_documents(texts)
-        return self._reduce_dimensions(embeddings)
+        """Embed documents in concurrent token-bounded batches and reduce dimensions"""
+        return self.embed_documents_matrix(texts).tolist()
 
     def embed_query(self, text: str) -> List[float]:
         """Embed query and reduce dimensions"""
-        embedding = super().embed_query(text)
-        if len(embedding) == self._source_dimension:
-            return embedding[: self._target_dimension]
-        return embedding
+        return self.embed_query_vector(text).tolist()
 
 
 class RAGIngestionService:
@@ -78,7 +282,15 @@ class RAGIngestionService:
         console_log(f"Initializing RAGIngestionService with embedding model: {self.config.embedding_model}")
         # Use custom dimension-reduced embeddings to convert 1536 -> 1024 dimensions
         self.embeddings = DimensionReducedEmbeddings(
-            model=self.config.embedding_model, api_key=SecretStr(env.OPENAI_KEY)
+            model=self.config.embedding_model,
+            api_key=SecretStr(env.OPENAI_KEY),
+            target_dimension=self.config.embedding_dimension,
+            native_dimensions=self.config.native_embedding_dimensions,
+            max_batch_tokens=self.config.embedding_batch_tokens,
+            max_batch_items=self.config.embedding_batch_items,
+            max_in_flight=self.config.embedding_max_in_flight,
+            max_retries=self.config.embedding_max_retries,
+            use_cache=self.config.use_embedding_cache,
         )
 
         # Initialize Firecrawl
@@ -86,8 +298,15 @@ class RAGIngestionService:
 
         # Initialize lightweight document processor
         self.doc_processor = DocumentProcessor()
+        self.extraction_pool = get_extraction_pool()
         console_log("Initialized lightweight document processor")
 
+        # Last-seen validators and content hashes of crawled pages
+        self.crawl_state = get_crawl_state_store()
+        # Registry of ingested sources with their chunk and token counts
+        self.source_catalog = get_source_catalog()
+        self.content_versions = get_content_versions()
+
         is_pinecone_initialized = self._initialize_pinecone()
         if is_error(is_pinecone_initialized.error):
             return DefaultReturnType(
@@ -97,24 +316,8 @@ class RAGIngestionService:
                 )
             )
 
-        # Use token-based text splitter with tiktoken for accurate token counting
-        # TokenTextSplitter may not recognize gpt-4o-mini, so we'll use gpt-4 as fallback
-        try:
-            self.text_splitter = TokenTextSplitter(
-                chunk_size=self.config.chunk_size,
-                chunk_overlap=self.config.chunk_overlap,
-                model_name="gpt-4",  # Using gpt-4 tokenizer which is compatible with gpt-4o-mini
-                allowed_special="all",
-            )
-        except Exception as e:
-            console_log(f"Warning: TokenTextSplitter initialization issue: {e}")
-            # Fallback to character-based splitter if token splitter fails
-            self.text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=self.config.chunk_size * 4,  # Approximate 4 chars per token
-                chunk_overlap=self.config.chunk_overlap * 4,
-                length_function=len,
-                separators=["\n\n", "\n", " ", ""],
-            )
+        # Default token chunker; requests with their own chunk_size/chunk_overlap get a cached one
+        self.chunker = get_chunker(self.config.chunk_size, self.config.chunk_overlap)
 
     def _initialize_pinecone(self) -> DefaultReturnType[None]:
         """Initialize Pinecone client and index"""
@@ -126,7 +329,7 @@ class RAGIngestionService:
                 console_log(f"Creating Pinecone index: {env.PINECONE_INDEX_NAME}")
                 self.pc.create_index(
                     name=env.PINECONE_INDEX_NAME,
-                    dimension=1024,  # Reduced from 1536 (text-embedding-3-small) to 1024
+                    dimension=self.config.embedding_dimension,  # Reduced from 1536 (text-embedding-3-small)
                     metric="cosine",
                     spec=ServerlessSpec(cloud="aws", region=env.PINECONE_REGION),
                 )
@@ -137,6 +340,8 @@ class RAGIngestionService:
                 console_log(f"Existing index dimension: {index_stats.dimension}")
 
             self.index = self.pc.Index(env.PINECONE_INDEX_NAME)
+            # Upserts of concurrent ingestions are coalesced into shared batches
+            self.upsert_writer = get_upsert_writer(env.PINECONE_INDEX_NAME, self.index)
             self.vector_store = PineconeVectorStore(index=self.index, embedding=self.embeddings)
             console_log("Pinecone initialized successfully")
 
@@ -153,292 +358,442 @@ class RAGIngestionService:
                 )
             )
 
-    def _count_tokens(self, text: str) -> int:
-        """Count tokens in text using tiktoken"""
-        # gpt-4o-mini uses the same tokenizer as gpt-4
+    def _store_chunks(self, chunks: List[DocumentChunkType], progress: IngestionProgress = NO_PROGRESS) -> None:
+        """Embed chunks into a float32 matrix and upsert them into Pinecone"""
+        if not chunks:
+            return
+
+        progress.report_stage("embedding", chunks=len(chunks))
+        token_counts = None
+        if self.embeddings.encoding_name == self.chunker.encoding_name:
+            # Chunk token counts are exact for the embedding tokenizer, so they are not counted again
+            token_counts = [chunk.metadata.get("token_count") for chunk in chunks]
+            if not all(isinstance(count, int) for count in token_counts):
+                token_counts = None
+        embeddings = self.embeddings.embed_documents_matrix([chunk.content for chunk in chunks], token_counts)
+
+        progress.raise_if_cancelled()
+        progress.report_stage("upserting", chunks=len(chunks))
+        vectors = [
+            {"id": chunk.id, "values": values, "metadata": {**chunk.metadata, TEXT_METADATA_KEY: chunk.content}}
+            for chunk, values in zip(chunks, embeddings.tolist())
+        ]
+        self._upsert_vectors(vectors)
+
+    def _upsert_vectors(self, vectors: List[Dict[str, Any]]) -> None:
+        """Upsert vectors through the upsert writer, each into the namespace its chunk id routes to"""
+        vectors_by_namespace: Dict[str, List[Dict[str, Any]]] = {}
+        for vector in vectors:
+            vectors_by_namespace.setdefault(source_namespace(vector["id"]), []).append(vector)
         try:
-            encoding = tiktoken.encoding_for_model("gpt-4o-mini")
-        except KeyError:
-            # Fallback to gpt-4 tokenizer if gpt-4o-mini is not recognized
-            encoding = tiktoken.encoding_for_model("gpt-4")
-        return len(encoding.encode(text))
-
-    def _clean_text_content(self, content: str) -> str:
-        """Comprehensively clean text content by removing unwanted elements"""
-        if not content:
-            return content
-
-        # Remove HTML tags (including self-closing tags like <br>, <hr>, etc.)
-        content = re.sub(r"<[^>]+>", "", content)
-
-        # Remove underscore symbols used for italic text
-        content = content.replace("_", "")
-
-        # Remove markdown links [text](url) -> text (do this first to avoid conflicts)
-        content = re.sub(r"\[([^\]]+)\]\([^)]+\)", r"\1", content)
-
-        # Remove markdown reference links [text][ref] -> text
-        content = re.sub(r"\[([^\]]+)\]\[[^\]]*\]", r"\1", content)
+            for namespace, namespace_vectors in vectors_by_namespace.items():
+                self.upsert_writer.upsert(namespace_vectors, namespace)
+        finally:
+            # Also after a failed write, which may have stored part of the vectors
+            self._content_changed(chunk_id_source(vector["id"]) for vector in vectors)
+
+    def _fetch_vectors(self, chunk_ids: List[str]) -> Dict[str, Any]:
+        """Fetch stored vectors by id from the namespaces their ids route to"""
+        vectors: Dict[str, Any] = {}
+        for namespace, namespace_ids in group_by_namespace(chunk_ids).items():
+            stored: Any = self.index.fetch(ids=namespace_ids, namespace=namespace)
+            vectors.update(stored.vectors)
+        return vectors
+
+    def _iter_chunk_id_pages(self, root_source_name: str) -> Iterator[List[str]]:
+        """Yield the ids of every stored chunk of a source, a page at a time, by paginated id prefix listing.
+
+        Safe to delete the ids of a page before asking for the next one.
+        """
+        namespace = source_namespace(root_source_name)
+        for chunk_ids in self.index.list(
+            prefix=chunk_id_prefix(root_source_name), limit=LIST_PAGE_SIZE, namespace=namespace
+        ):
+            yield list(chunk_ids)
+
+        # Chunks stored under the old id schemes share the "{source}_" prefix with other sources
+        legacy_pattern = _legacy_chunk_id_pattern(root_source_name)
+        for chunk_ids in self.index.list(prefix=f"{root_source_name}_", limit=LIST_PAGE_SIZE, namespace=namespace):
+            legacy_ids = [chunk_id for chunk_id in chunk_ids if legacy_pattern.fullmatch(chunk_id)]
+            if legacy_ids:
+                yield legacy_ids
+
+    def _iter_stored_chunks(self, root_source_name: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (id, metadata) of every stored chunk of a source, fetched a listing page at a time"""
+        for chunk_ids in self._iter_chunk_id_pages(root_source_name):
+            for chunk_id, vector in self._fetch_vectors(chunk_ids).items():
+                yield chunk_id, dict(vector.metadata or {})
+
+    def _get_stored_chunk_metadata(self, root_source_name: str) -> Dict[str, Dict[str, Any]]:
+        """Get the metadata of every stored chunk of a source, keyed by chunk id"""
+        return dict(self._iter_stored_chunks(root_source_name))
+
+    def _is_chunk_unchanged(
+        self, stored_metadata: Dict[str, Any], chunk: DocumentChunkType, ignore_chunk_count: bool = False
+    ) -> bool:
+        new_metadata = {**chunk.metadata, TEXT_METADATA_KEY: chunk.content}
+        keys = (stored_metadata.keys() | new_metadata.keys()) - VOLATILE_METADATA_KEYS
+        if ignore_chunk_count:
+            keys -= CHUNK_COUNT_METADATA_KEYS
+        return all(stored_metadata.get(key) == new_metadata.get(key) for key in keys)
+
+    def _update_chunk_metadata(
+        self, chunks: List[DocumentChunkType], progress: IngestionProgress = NO_PROGRESS
+    ) -> None:
+        """Rewrite metadata of stored chunks whose content did not change, reusing their stored vectors.
+
+        Chunks the fetch does not return (deleted or not yet readable since they were listed) are embedded again.
+        """
+        for start in range(0, len(chunks), FETCH_BATCH_SIZE):
+            batch = chunks[start : start + FETCH_BATCH_SIZE]
+            stored = self._fetch_vectors([chunk.id for chunk in batch])
+            vectors = [
+                {
+                    "id": chunk.id,
+                    "values": stored[chunk.id].values,
+                    "metadata": {**chunk.metadata, TEXT_METADATA_KEY: chunk.content},
+                }
+                for chunk in batch
+                if chunk.id in stored
+            ]
+            self._upsert_vectors(vectors)
+            self._store_chunks([chunk for chunk in batch if chunk.id not in stored], progress)
 
-        # Remove standalone URLs (http/https) - do this after markdown link removal
-        content = re.sub(r"https?://[^\s]+", "", content)
+    def _write_chunks(
+        self,
+        chunks: List[DocumentChunkType],
+        root_source_name: str,
+        incremental: bool,
+        progress: IngestionProgress = NO_PROGRESS,
+    ) -> Tuple[int, int, int]:
+        """Store chunks, either in full or as a diff against what is stored for the source.
+
+        Returns:
+            Number of chunks written, left unchanged and deleted
+        """
+        if not incremental:
+            self._store_chunks(chunks, progress)
+            return len(chunks), 0, 0
+
+        _, written, unchanged, deleted, _ = self._write_chunk_batches([chunks], root_source_name, incremental, progress)
+        return written, unchanged, deleted
+
+    def _write_chunk_batches(
+        self,
+        batches: Iterable[List[DocumentChunkType]],
+        root_source_name: str,
+        incremental: bool,
+        progress: IngestionProgress = NO_PROGRESS,
+        streamed: bool = False,
+        kept: Optional[KeptChunks] = None,
+    ) -> Tuple[int, int, int, int, int]:
+        """Store chunk batches as they arrive, in full or as a diff against what is stored for the source.
+
+        Incremental writes embed and upsert only new chunks, update metadata of chunks that moved,
+        and delete chunks that are no longer part of the source. streamed batches are one document
+        chunked as it was extracted, whose chunks carry no total_chunks. kept holds stored chunks the producer of
+        the batches skipped as unchanged; it is read once the batches are exhausted, and those
+        chunks count as unchanged and are never deleted.
+
+        Returns:
+            Total number of chunks, the number written, left unchanged and deleted, and the total number of tokens
+        """
+        stored_metadata = self._get_stored_chunk_metadata(root_source_name) if incremental else {}
+        seen_ids = set()
+        total = written = unchanged = tokens = 0
+
+        for batch in batches:
+            progress.raise_if_cancelled()
+            new_chunks = []
+            moved_chunks = []
+            for chunk in batch:
+                seen_ids.add(chunk.id)
+                stored = stored_metadata.get(chunk.id)
+                if stored is None:
+                    new_chunks.append(chunk)
+                elif self._is_chunk_unchanged(stored, chunk, ignore_chunk_count=streamed):
+                    unchanged += 1
+                else:
+                    moved_chunks.append(chunk)
+
+            self._store_chunks(new_chunks, progress)
+            progress.raise_if_cancelled()
+            self._update_chunk_metadata(moved_chunks, progress)
+            total += len(batch)
+            written += len(new_chunks) + len(moved_chunks)
+            tokens += self._sum_tokens(batch)
+
+        kept_ids = kept.ids - seen_ids if kept is not None else set()
+        total += len(kept_ids)
+        unchanged += len(kept_ids)
+        tokens += kept.tokens if kept is not None else 0
+
+        removed_ids = [
+            chunk_id for chunk_id in stored_metadata if chunk_id not in seen_ids and chunk_id not in kept_ids
+        ]
+        self._delete_chunks(removed_ids)
+
+        if incremental:
+            console_log(
+                f"Incremental ingest of {root_source_name}: {written} new or moved, {unchanged} unchanged, "
+                f"{len(removed_ids)} removed"
+            )
+        return total, written, unchanged, len(removed_ids), tokens
 
-        # Remove various reference indicators patterns:
-        # Pattern 1: [[a]], [[b]], [[16]], [[254]], etc.
-        content = re.sub(r"\[\[[a-zA-Z0-9]+\]\]", "", content)
+    def _delete_chunks(self, chunk_ids: List[str]) -> None:
+        try:
+            for namespace, namespace_ids in group_by_namespace(chunk_ids).items():
+                for start in range(0, len(namespace_ids), DELETE_BATCH_SIZE):
+                    self.index.delete(ids=namespace_ids[start : start + DELETE_BATCH_SIZE], namespace=namespace)
+        finally:
+            self._content_changed(chunk_id_source(chunk_id) for chunk_id in chunk_ids)
+
+    def _content_changed(self, source_names: Iterable[Optional[str]]) -> None:
+        """Bump the content versions of sources and their namespaces, invalidating the answers cached for them"""
+        changed = {source_name for source_name in source_names if source_name}
+        if not changed:
+            return
+        try:
+            self.content_versions.bump(
+                [source_version_key(source_name) for source_name in changed]
+                + [namespace_version_key(source_namespace(source_name)) for source_name in changed]
+            )
+        except Exception as error:
+            console_log(f"Failed to bump content versions of {len(changed)} sources: {str(error)}")
 
-        # Pattern 2: [\[a\]], [\[b\]], [\[16\]], etc. (escaped brackets)
-        content = re.sub(r"\[\\?\[[a-zA-Z0-9]+\\?\]\]", "", content)
+    def _begin_catalog_ingest(
+        self,
+        source_name: str,
+        source_type: str,
+        content_hash: Optional[str] = None,
+        chunker: Optional[TokenChunker] = None,
+    ) -> Optional[str]:
+        """Mark a source as being written in the source catalog. Returns the id to commit or fail it with"""
+        chunker = chunker or self.chunker
+        return self.source_catalog.begin_ingest(
+            source_name,
+            source_type,
+            content_hash=content_hash,
+            id_prefix=chunk_id_prefix(source_name),
+            namespace=source_namespace(source_name),
+            embedding_model=self.config.embedding_model,
+            embedding_dimension=self.config.embedding_dimension,
+            chunk_size=chunker.chunk_size,
+            chunk_overlap=chunker.chunk_overlap,
+        )
 
-        # Pattern 3: [a], [b], [16], [254], etc. (single brackets)
-        content = re.sub(r"\[[a-zA-Z0-9]+\]", "", content)
+    @staticmethod
+    def _sum_tokens(chunks: List[DocumentChunkType]) -> int:
+        return sum(chunk.metadata.get("token_count", 0) for chunk in chunks)
 
-        # Pattern 4: Handle any remaining escaped bracket combinations
-        content = re.sub(r"\\\[([a-zA-Z0-9]+)\\\]", "", content)
-        content = re.sub(r"\\\[[a-zA-Z0-9]+\]", "", content)
-        content = re.sub(r"\[[a-zA-Z0-9]+\\\]", "", content)
+    def _estimator(self) -> IngestionEstimator:
+        return IngestionEstimator(self.config, TEXT_METADATA_KEY)
 
-        # Remove empty brackets []
-        content = re.sub(r"\[\]", "", content)
+    def _dry_run_response(
+        self, estimator: IngestionEstimator, source_name: str, **fields: Any
+    ) -> DefaultReturnType[IngestResponseType]:
+        """Response of a dry run, which extracted and chunked the source without embedding or storing it"""
+        estimate = estimator.estimate()
+        console_log(f"Dry run of {source_name}: {estimate.model_dump()}")
+        return DefaultReturnType(
+            data=IngestResponseType(
+                success=True,
+                message=(
+                    f"Dry run: {estimate.chunks} chunks and {estimate.tokens} tokens in "
+                    f"{estimate.embedding_batches} embedding requests, nothing was stored"
+                ),
+                chunks_created=estimate.chunks,
+                source_id=source_name,
+                estimate=estimate,
+                **fields,
+            )
+        )
 
-        # Clean up excessive whitespace but preserve paragraph breaks
-        # First, normalize multiple spaces to single spaces
-        content = re.sub(r"[ \t]+", " ", content)
-        # Then, normalize multiple newlines to double newlines (paragraph breaks)
-        content = re.sub(r"\n\s*\n\s*\n+", "\n\n", content)
-        content = content.strip()
+    def _count_tokens(self, text: str) -> int:
+        """Count tokens in text with the chunker's tokenizer"""
+        return len(self.chunker.encoding.encode(text, allowed_special="all"))
 
-        return content
+    def _clean_text_content(self, content: str) -> str:
+        """Comprehensively clean text content by removing unwanted elements"""
+        return clean_ingested_text(content, compat=self.config.text_cleaner_compat)
 
     def _remove_links_from_markdown(self, content: str) -> str:
         """Remove links from markdown content while preserving the link text"""
-        # Remove markdown links [text](url) -> text
-        content = re.sub(r"\[([^\]]+)\]\([^)]+\)", r"\1", content)
-
-        # Remove standalone URLs (http/https)
-        content = re.sub(r"https?://[^\s]+", "", content)
-
-        # Remove markdown reference links [text][ref] -> text
-        content = re.sub(r"\[([^\]]+)\]\[[^\]]*\]", r"\1", content)
-
-        # Clean up extra whitespace
-        content = re.sub(r"\n\s*\n", "\n\n", content)
-        content = content.strip()
-
-        return content
+        return remove_markdown_links(content, compat=self.config.text_cleaner_compat)
 
     # Create chunks
-    def _create_chunks(self, text: str, source_name: str, metadata: Dict[str, Any]) -> List[DocumentChunkType]:
-        """Split text into chunks and create DocumentChunk objects"""
-        chunks = self.text_splitter.split_text(text)
-        document_chunks = []
-
-        for i, chunk in enumerate(chunks):
-            chunk_id = f"{source_name}_{uuid.uuid4().hex[:8]}_{i}"
-            document_chunks.append(
-                DocumentChunkType(
-                    id=chunk_id,
-                    content=chunk,
-                    metadata={
-                        **metadata,
-                        "source_name": source_name,
-                        "chunk_index": i,
-                        "total_chunks": len(chunks),
-                        "token_count": self._count_tokens(chunk),
-                    },
-                    source=source_name,
-                    chunk_index=i,
-                    total_chunks=len(chunks),
-                )
-            )
-
-        return document_chunks
-
-    # Process data based on source type
-    def _process_text_data(self, data: str, source_name: str, metadata: Dict[str, Any]) -> List[DocumentChunkType]:
-        """Process plain text data"""
-        return self._create_chunks(data, source_name, metadata)
-
-    def _extract_text_from_file(self, file_data: bytes, file_type: str, source_name: str) -> str:
-        """Extract text from file using lightweight document processor"""
-        try:
-            return self.doc_processor.extract_text_from_file(file_data, file_type, source_name)
-        except Exception as e:
-            console_log(f"Error extracting text from {file_type} file: {str(e)}")
-            return f"Error extracting text from {file_type} file: {str(e)}"
-
-    def _process_pdf_data(self, data: str, source_name: str, metadata: Dict[str, Any]) -> List[DocumentChunkType]:
-        """Process PDF data using lightweight document processor for text extraction"""
-        try:
-            # Decode base64 data if it's encoded
-            import base64
-
-            try:
-                # Try to decode as base64 first
-                file_data = base64.b64decode(data)
-                console_log(f"Successfully decoded base64 PDF data for: {source_name} - {len(file_data)} bytes")
+    def _create_chunks(
+        self, text: str, source_name: str, metadata: Dict[str, Any], chunker: Optional[TokenChunker] = None
+    ) -> List[DocumentChunkType]:
+        """Split text into chunks and create DocumentChunk objects with content-derived ids"""
+        chunks = (chunker or self.chunker).split(text)
+        occurrences: Dict[str, int] = {}
+        return [
+            self._build_chunk(chunk, i, len(chunks), source_name, metadata, occurrences)
+            for i, chunk in enumerate(chunks)
+        ]
+
+    def _iter_chunk_batches(
+        self,
+        pieces: Iterable[str],
+        source_name: str,
+        metadata: Dict[str, Any],
+        chunker: Optional[TokenChunker] = None,
+    ) -> Iterator[List[DocumentChunkType]]:
+        """Chunk text arriving page by page, yielding batches of chunks as soon as they are complete.
 
-                # Validate the decoded data
-                if len(file_data) < 100:
-                    console_log(f"Decoded PDF data too small: {len(file_data)} bytes, treating as raw text")
-                    return self._create_chunks(data, source_name, {**metadata, "file_type": "pdf"})
+        The final chunk count is not known yet, so the chunks' metadata has no total_chunks.
+        """
+        occurrences: Dict[str, int] = {}
+        batch: List[DocumentChunkType] = []
 
-                # Check if it looks like a PDF
-                if not file_data.startswith(b"%PDF-"):
-                    console_log(f"Decoded data doesn't start with PDF header: {file_data[:20]}, treating as raw text")
-                    return self._create_chunks(data, source_name, {**metadata, "file_type": "pdf"})
+        for i, chunk in enumerate((chunker or self.chunker).split_stream(pieces)):
+            batch.append(self._build_chunk(chunk, i, None, source_name, metadata, occurrences))
+            if len(batch) >= self.config.stream_batch_chunks:
+                yield batch
+                batch = []
 
-                console_log(f"PDF data validation passed: starts with {file_data[:10]}")
+        if batch:
+            yield batch
 
-            except Exception as decode_error:
-                console_log(f"Failed to decode as base64: {decode_error}, treating as raw text")
-                # If not base64, treat as raw text
-                return self._create_chunks(data, source_name, {**metadata, "file_type": "pdf"})
+    def _build_chunk(
+        self,
+        chunk: TextChunk,
+        chunk_index: int,
+        total_chunks: Optional[int],
+        source_name: str,
+        metadata: Dict[str, Any],
+        occurrences: Dict[str, int],
+    ) -> DocumentChunkType:
+        root_source_name = metadata.get("root_source_name", source_name)
+        chunk_metadata = {
+            **metadata,
+            "source_name": source_name,
+            "root_source_name": root_source_name,
+            "chunk_index": chunk_index,
+            "token_count": chunk.token_count,
+        }
+        if total_chunks is not None:
+            chunk_metadata["total_chunks"] = total_chunks
+        return DocumentChunkType(
+            id=self._chunk_id(root_source_name, metadata.get("url", ""), chunk.text, occurrences),
+            content=chunk.text,
+            metadata=chunk_metadata,
+            source=source_name,
+            chunk_index=chunk_index,
+            total_chunks=total_chunks or 0,
+        )
 
-            # Extract text using lightweight processor
-            extracted_text = self._extract_text_from_file(file_data, "pdf", source_name)
+    def _chunk_id(self, root_source_name: str, url: str, content: str, occurrences: Dict[str, int]) -> str:
+        """Deterministic "{source}#{digest}" chunk id from the source, the page url and the chunk content.
 
-            if not extracted_text or extracted_text.startswith("Error extracting text"):
-                console_log(f"Failed to extract text from PDF, treating as raw text")
-                return self._create_chunks(data, source_name, {**metadata, "file_type": "pdf"})
+        The source prefix lets a source's chunks be listed and deleted by id prefix. Repeated identical
+        chunks within one text get an occurrence suffix so they keep distinct ids.
+        """
+        digest = hashlib.sha256(f"{url}\x00{content}".encode("utf-8")).hexdigest()[:32]
+        occurrence = occurrences.get(digest, 0)
+        occurrences[digest] = occurrence + 1
+        prefix = chunk_id_prefix(root_source_name)
+        return f"{prefix}{digest}" if occurrence == 0 else f"{prefix}{digest}#{occurrence}"
 
-            # Clean the extracted text
-            cleaned_text = self._clean_text_content(extracted_text)
+    # Process data based on source type
+    def _process_text_data(
+        self, data: str, source_name: str, metadata: Dict[str, Any], chunker: Optional[TokenChunker] = None
+    ) -> List[DocumentChunkType]:
+        """Process plain text data"""
+        return self._create_chunks(data, source_name, metadata, chunker=chunker)
 
-            return self._create_chunks(cleaned_text, source_name, {**metadata, "file_type": "pdf"})
+    def _iter_file_text(self, file_data: FileDataType, file_type: str, source_name: str) -> Iterator[str]:
+        """Yield the cleaned text of a file page by page, separated by paragraph breaks.
 
-        except Exception as e:
-            console_log(f"Error processing PDF data: {str(e)}")
-            # Fallback to treating as text
-            return self._create_chunks(data, source_name, {**metadata, "file_type": "pdf"})
+        Text and JSON files fall back to their raw text when nothing can be extracted.
 
-    def _process_docx_data(self, data: str, source_name: str, metadata: Dict[str, Any]) -> List[DocumentChunkType]:
-        """Process DOCX data using lightweight document processor for text extraction"""
+        Raises:
+            ValueError: If no text can be extracted from a document (PDF, DOC(X), PPT(X))
+        """
+        pages: Iterator[str] = iter(())
+        first_page = None
+        extraction_error: Optional[Exception] = None
         try:
-            # Decode base64 data if it's encoded
-            import base64
-
-            try:
-                # Try to decode as base64 first
-                file_data = base64.b64decode(data)
-                console_log(f"Successfully decoded base64 DOCX data for: {source_name}")
-            except Exception as decode_error:
-                console_log(f"Failed to decode as base64: {decode_error}, treating as raw text")
-                # If not base64, treat as raw text
-                return self._create_chunks(data, source_name, {**metadata, "file_type": "docx"})
-
-            # Extract text using lightweight processor
-            extracted_text = self._extract_text_from_file(file_data, "docx", source_name)
-
-            if not extracted_text or extracted_text.startswith("Error extracting text"):
-                console_log(f"Failed to extract text from DOCX, treating as raw text")
-                return self._create_chunks(data, source_name, {**metadata, "file_type": "docx"})
-
-            # Clean the extracted text
-            cleaned_text = self._clean_text_content(extracted_text)
-
-            return self._create_chunks(cleaned_text, source_name, {**metadata, "file_type": "docx"})
-
+            if self._use_extraction_pool(file_type):
+                pages = self.extraction_pool.iter_text(file_data, file_type, source_name)
+            else:
+                pages = self.doc_processor.iter_text_from_file(file_data, file_type, source_name)
+            first_page = next((page for page in pages if page.strip()), None)
+        except ExtractionLimitError:
+            # A file that exhausts the worker limits is rejected rather than ingested as raw bytes
+            raise
         except Exception as e:
-            console_log(f"Error processing DOCX data: {str(e)}")
-            # Fallback to treating as text
-            return self._create_chunks(data, source_name, {**metadata, "file_type": "docx"})
-
-    def _process_ppt_data(self, data: str, source_name: str, metadata: Dict[str, Any]) -> List[DocumentChunkType]:
-        """Process PPT data using lightweight document processor for text extraction"""
+            console_log(f"Error extracting text from {file_type} file: {str(e)}")
+            extraction_error = e
+
+        if first_page is None or first_page.startswith(EXTRACTION_FAILURE_PREFIXES):
+            if file_type.lower() in POOLED_FILE_TYPES:
+                # The bytes of a document are not text, so embedding them would only store garbage
+                reason = str(extraction_error) if extraction_error else (first_page or "no text found")
+                raise ValueError(f"Could not extract text from the {file_type} file: {reason}") from extraction_error
+            console_log(f"Failed to extract text from {file_type}, treating as raw text")
+            yield self._clean_text_content(DocumentProcessor.read_bytes(file_data).decode("utf-8", errors="ignore"))
+            return
+
+        emitted = False
+        for page in itertools.chain([first_page], pages):
+            cleaned = self._clean_text_content(page)
+            if cleaned:
+                yield f"\n\n{cleaned}" if emitted else cleaned
+                emitted = True
+
+    def _use_extraction_pool(self, file_type: str) -> bool:
+        return self.extraction_pool is not None and file_type.lower() in POOLED_FILE_TYPES
+
+    def _extract_text_from_file(self, file_data: FileDataType, file_type: str, source_name: str) -> str:
+        """Extract text from file using lightweight document processor"""
         try:
-            # Decode base64 data if it's encoded
-            import base64
-
-            try:
-                # Try to decode as base64 first
-                file_data = base64.b64decode(data)
-                console_log(f"Successfully decoded base64 PPT data for: {source_name}")
-            except Exception as decode_error:
-                console_log(f"Failed to decode as base64: {decode_error}, treating as raw text")
-                # If not base64, treat as raw text
-                return self._create_chunks(data, source_name, {**metadata, "file_type": "ppt"})
-
-            # Extract text using lightweight processor
-            extracted_text = self._extract_text_from_file(file_data, "ppt", source_name)
-
-            if not extracted_text or extracted_text.startswith("Error extracting text"):
-                console_log(f"Failed to extract text from PPT, treating as raw text")
-                return self._create_chunks(data, source_name, {**metadata, "file_type": "ppt"})
-
-            # Clean the extracted text
-            cleaned_text = self._clean_text_content(extracted_text)
-
-            return self._create_chunks(cleaned_text, source_name, {**metadata, "file_type": "ppt"})
-
+            if self._use_extraction_pool(file_type):
+                return self.extraction_pool.extract_text(file_data, file_type, source_name)
+            return self.doc_processor.extract_text_from_file(file_data, file_type, source_name)
         except Exception as e:
-            console_log(f"Error processing PPT data: {str(e)}")
-            # Fallback to treating as text
-            return self._create_chunks(data, source_name, {**metadata, "file_type": "ppt"})
-
-    def _process_doc_data(self, data: str, source_name: str, metadata: Dict[str, Any]) -> List[DocumentChunkType]:
-        """Process DOC data using lightweight document processor for text extraction"""
-        try:
-            # Decode base64 data if it's encoded
-            import base64
-
-            try:
-                # Try to decode as base64 first
-                file_data = base64.b64decode(data)
-                console_log(f"Successfully decoded base64 DOC data for: {source_name}")
-            except Exception as decode_error:
-                console_log(f"Failed to decode as base64: {decode_error}, treating as raw text")
-                # If not base64, treat as raw text
-                return self._create_chunks(data, source_name, {**metadata, "file_type": "doc"})
-
-            # Extract text using lightweight processor
-            extracted_text = self._extract_text_from_file(file_data, "doc", source_name)
-
-            if not extracted_text or extracted_text.startswith("Error extracting text"):
-                console_log(f"Failed to extract text from DOC, treating as raw text")
-                return self._create_chunks(data, source_name, {**metadata, "file_type": "doc"})
-
-            # Clean the extracted text
-            cleaned_text = self._clean_text_content(extracted_text)
-
-            return self._create_chunks(cleaned_text, source_name, {**metadata, "file_type": "doc"})
+            console_log(f"Error extracting text from {file_type} file: {str(e)}")
+            return f"Error extracting text from {file_type} file: {str(e)}"
 
-        except Exception as e:
-            console_log(f"Error processing DOC data: {str(e)}")
-            # Fallback to treating as text
-            return self._create_chunks(data, source_name, {**metadata, "file_type": "doc"})
+    def _process_file_data(
+        self,
+        data: str,
+        file_type: str,
+        source_name: str,
+        metadata: Dict[str, Any],
+        chunker: Optional[TokenChunker] = None,
+    ) -> List[DocumentChunkType]:
+        """Process base64-encoded file data (PDF, DOCX, DOC, PPTX, PPT) sent inside a JSON body.
 
-    def _process_pptx_data(self, data: str, source_name: str, metadata: Dict[str, Any]) -> List[DocumentChunkType]:
-        """Process PPTX data using lightweight document processor for text extraction"""
+        Data that is not valid base64 is ingested as plain text. Decoded data is sniffed for its real
+        format; if it is a document that cannot be extracted, the ingestion fails instead of embedding
+        the base64 text.
+        """
+        file_metadata = {**metadata, "file_type": file_type}
         try:
-            # Decode base64 data if it's encoded
-            import base64
+            file_data = base64.b64decode("".join(data.split()), validate=True)
+        except (binascii.Error, ValueError):
+            console_log(f"{file_type.upper()} data for {source_name} is not base64, treating as raw text")
+            return self._create_chunks(data, source_name, file_metadata, chunker=chunker)
 
-            try:
-                # Try to decode as base64 first
-                file_data = base64.b64decode(data)
-                console_log(f"Successfully decoded base64 PPTX data for: {source_name}")
-            except Exception as decode_error:
-                console_log(f"Failed to decode as base64: {decode_error}, treating as raw text")
-                # If not base64, treat as raw text
-                return self._create_chunks(data, source_name, {**metadata, "file_type": "pptx"})
+        detected_type = DocumentProcessor.detect_file_type(file_data, file_type)
+        console_log(f"Decoded {len(file_data)} bytes of {file_type.upper()} data for {source_name}: {detected_type}")
 
-            # Extract text using lightweight processor
-            extracted_text = self._extract_text_from_file(file_data, "pptx", source_name)
+        if detected_type == "text":
+            text = self._clean_text_content(file_data.decode("utf-8", errors="ignore"))
+            return self._create_chunks(text, source_name, file_metadata, chunker=chunker)
+        if detected_type is None:
+            raise ValueError(f"Decoded {file_type} data is not a supported document format")
 
-            if not extracted_text or extracted_text.startswith("Error extracting text"):
-                console_log(f"Failed to extract text from PPTX, treating as raw text")
-                return self._create_chunks(data, source_name, {**metadata, "file_type": "pptx"})
+        extracted_text = self._extract_text_from_file(file_data, detected_type, source_name)
+        if not extracted_text or extracted_text.startswith(EXTRACTION_FAILURE_PREFIXES):
+            raise ValueError(f"Failed to extract text from {detected_type} data: {extracted_text}")
 
-            # Clean the extracted text
-            cleaned_text = self._clean_text_content(extracted_text)
+        # Clean the extracted text
+        cleaned_text = self._clean_text_content(extracted_text)
 
-            return self._create_chunks(cleaned_text, source_name, {**metadata, "file_type": "pptx"})
-
-        except Exception as e:
-            console_log(f"Error processing PPTX data: {str(e)}")
-            # Fallback to treating as text
-            return self._create_chunks(data, source_name, {**metadata, "file_type": "pptx"})
+        return self._create_chunks(cleaned_text, source_name, file_metadata, chunker=chunker)
 
     def _process_url_data(
         self,
@@ -447,6 +802,8 @@ class RAGIngestionService:
         metadata: Dict[str, Any],
         include_links: bool = False,
         crawl_full_website: bool = True,
+        chunker: Optional[TokenChunker] = None,
+        deduplicator: Optional[CrawlDeduplicator] = None,
     ) -> List[DocumentChunkType]:
         """Process URL data by crawling the URL using Firecrawl"""
         try:
@@ -454,10 +811,10 @@ class RAGIngestionService:
 
             if crawl_full_website:
                 console_log(f"Starting full website crawl for: {data}")
-                return self._crawl_full_website(data, source_name, metadata, include_links)
+                return self._crawl_full_website(data, source_name, metadata, include_links, chunker, deduplicator)
             else:
                 console_log(f"Starting single page scrape for: {data}")
-                return self._scrape_single_page(data, source_name, metadata, include_links)
+                return self._scrape_single_page(data, source_name, metadata, include_links, chunker)
 
         except Exception as e:
             console_log(f"Error crawling URL {data}: {str(e)}")
@@ -467,10 +824,16 @@ class RAGIngestionService:
                 error_content,
                 source_name,
                 {**metadata, "source_type": "url", "crawl_error": True, "error_message": str(e)},
+                chunker=chunker,
             )
 
     def _scrape_single_page(
-        self, url: str, source_name: str, metadata: Dict[str, Any], include_links: bool = False
+        self,
+        url: str,
+        source_name: str,
+        metadata: Dict[str, Any],
+        include_links: bool = False,
+        chunker: Optional[TokenChunker] = None,
     ) -> List[DocumentChunkType]:
         """Scrape a single page using Firecrawl"""
         try:
@@ -482,6 +845,7 @@ class RAGIngestionService:
                     f"Failed to scrape URL: {url}",
                     source_name,
                     {**metadata, "source_type": "url", "crawl_error": True},
+                    chunker=chunker,
                 )
 
             # Extract content from the scrape result - prioritize markdown content
@@ -492,6 +856,7 @@ class RAGIngestionService:
                 content = scrape_result.html
             else:
                 content = str(scrape_result)
+            page_hash = content_hash(content)
 
             # Apply comprehensive text cleaning
             original_length = len(content)
@@ -523,10 +888,11 @@ class RAGIngestionService:
                 "crawl_metadata": crawl_metadata_str,
                 "include_links": include_links,
                 "full_website_crawl": False,
+                "content_sha256": page_hash,
             }
 
             console_log(f"Successfully crawled URL: {url}, content length: {len(content)}")
-            return self._create_chunks(content, source_name, url_metadata)
+            return self._create_chunks(content, source_name, url_metadata, chunker=chunker)
 
         except Exception as e:
             console_log(f"Error scraping single page {url}: {str(e)}")
@@ -534,24 +900,28 @@ class RAGIngestionService:
                 f"Error scraping URL {url}: {str(e)}",
                 source_name,
                 {**metadata, "source_type": "url", "crawl_error": True, "error_message": str(e)},
+                chunker=chunker,
             )
 
     def _crawl_full_website(
-        self, start_url: str, source_name: str, metadata: Dict[str, Any], include_links: bool = False
+        self,
+        start_url: str,
+        source_name: str,
+        metadata: Dict[str, Any],
+        include_links: bool = False,
+        chunker: Optional[TokenChunker] = None,
+        deduplicator: Optional[CrawlDeduplicator] = None,
     ) -> List[DocumentChunkType]:
-        """Crawl full website using Firecrawl's crawl API"""
+        """Crawl full website using Firecrawl's crawl API.
+
+        Boilerplate lines repeated across the crawled pages are stripped, and near-duplicate chunks dropped.
+        """
+        deduplicator = deduplicator or self._crawl_deduplicator()
         try:
             console_log(f"Starting full website crawl using Firecrawl for: {start_url}")
 
             # Configure crawl parameters
-            crawl_params = {
-                "limit": 50,  # Maximum number of pages to crawl
-                "crawl_entire_domain": True,  # Crawl the entire domain
-                "allow_subdomains": True,
-                "scrape_options": {
-                    "formats": ["markdown"],
-                },
-            }
+            crawl_params = self._crawl_params()
 
             # Perform the crawl using Firecrawl
             crawl_results = self.firecrawl.crawl(url=start_url, **crawl_params)
@@ -562,6 +932,7 @@ class RAGIngestionService:
                     f"No content found during full website crawl of: {start_url}",
                     source_name,
                     {**metadata, "source_type": "url", "crawl_error": True, "full_website_crawl": True},
+                    chunker=chunker,
                 )
 
             # Debug: Log the structure of crawl_results
@@ -580,6 +951,7 @@ class RAGIngestionService:
 
             all_chunks = []
             pages_crawled = 0
+            parsed_pages = []
 
             # Process each page from the crawl results
             # Convert crawl_results to list if it's not already
@@ -619,8 +991,13 @@ class RAGIngestionService:
                     console_log(f"No content found for page: {page_url}")
                     continue
 
-                # Apply text cleaning
-                cleaned_content = self._clean_text_content(page_content)
+                parsed_pages.append((pages_crawled, page_url, page_title, page_content))
+                deduplicator.observe(page_content)
+
+            # Every page is seen before any is stripped, so boilerplate is judged on the whole crawl
+            for page_number, page_url, page_title, page_content in parsed_pages:
+                # Strip boilerplate and apply text cleaning
+                cleaned_content = self._clean_text_content(deduplicator.strip_boilerplate(page_content))
 
                 # Remove links if include_links is False
                 if not include_links:
@@ -629,31 +1006,36 @@ class RAGIngestionService:
                 # Create page-specific metadata
                 page_metadata = {
                     **metadata,
+                    "root_source_name": source_name,
                     "source_type": "url",
                     "url": page_url,
                     "title": page_title,
                     "crawl_success": True,
                     "include_links": include_links,
                     "full_website_crawl": True,
-                    "page_number": pages_crawled,
+                    "page_number": page_number,
                     "total_pages_crawled": len(pages_list),
                 }
 
                 # Create chunks for this page
-                page_chunks = self._create_chunks(cleaned_content, f"{source_name}_page_{pages_crawled}", page_metadata)
-                all_chunks.extend(page_chunks)
+                page_chunks = self._create_chunks(
+                    cleaned_content, f"{source_name}_page_{page_number}", page_metadata, chunker=chunker
+                )
+                all_chunks.extend(deduplicator.drop_near_duplicates(page_chunks))
 
                 console_log(
-                    f"Successfully processed page {pages_crawled}: {page_url}, content length: {len(cleaned_content)}"
+                    f"Successfully processed page {page_number}: {page_url}, content length: {len(cleaned_content)}"
                 )
 
             console_log(f"Full website crawl completed. Processed {pages_crawled} pages from Firecrawl")
+            console_log(f"Deduplication of {start_url}: {deduplicator.summary()}")
 
             if not all_chunks:
                 return self._create_chunks(
                     f"No content found during full website crawl of: {start_url}",
                     source_name,
                     {**metadata, "source_type": "url", "crawl_error": True, "full_website_crawl": True},
+                    chunker=chunker,
                 )
 
             return all_chunks
@@ -670,9 +1052,309 @@ class RAGIngestionService:
                     "error_message": str(e),
                     "full_website_crawl": True,
                 },
+                chunker=chunker,
+            )
+
+    def _crawl_params(self, crawl_options: Optional[CrawlOptionsType] = None) -> Dict[str, Any]:
+        """Firecrawl crawl parameters from the config, overridden by the request's crawl options"""
+        options = crawl_options or CrawlOptionsType()
+        include_paths = options.include_paths if options.include_paths is not None else self.config.crawl_include_paths
+        exclude_paths = options.exclude_paths if options.exclude_paths is not None else self.config.crawl_exclude_paths
+
+        crawl_params: Dict[str, Any] = {
+            "limit": options.limit or self.config.crawl_page_limit,  # Maximum number of pages to crawl
+            "crawl_entire_domain": True,  # Crawl the entire domain
+            "allow_subdomains": True,
+            "max_concurrency": options.concurrency or self.config.crawl_concurrency,
+            "scrape_options": {
+                "formats": ["markdown"],
+            },
+        }
+        if include_paths:
+            crawl_params["include_paths"] = include_paths
+        if exclude_paths:
+            crawl_params["exclude_paths"] = exclude_paths
+        return crawl_params
+
+    def _iter_crawled_pages(
+        self, start_url: str, crawl_params: Dict[str, Any], progress: IngestionProgress = NO_PROGRESS
+    ) -> Iterator[List[Any]]:
+        """Start an asynchronous Firecrawl crawl and yield the pages that finished since the last poll.
+
+        Each poll reads one page of the crawl's results, starting at the `next` cursor of the previous
+        poll, so pages delivered earlier are not downloaded again. The remote crawl is cancelled if the
+        consumer stops early or fails.
+        """
+        crawl_job = self.firecrawl.start_crawl(url=start_url, **crawl_params)
+        job_id = getattr(crawl_job, "id", None) or crawl_job["id"]
+        console_log(f"Started Firecrawl crawl {job_id} for: {start_url}")
+        seen_pages = set()
+        # Results of the crawl from the first page not read yet. None until the first poll returned a cursor
+        next_url: Optional[str] = None
+
+        try:
+            while True:
+                progress.raise_if_cancelled()
+                if next_url is None:
+                    crawl_status = self.firecrawl.get_crawl_status(
+                        job_id, pagination_config=PaginationConfig(auto_paginate=False)
+                    )
+                else:
+                    crawl_status = self.firecrawl.get_crawl_status_page(next_url)
+
+                new_pages = []
+                for page in getattr(crawl_status, "data", None) or []:
+                    fields = self._crawled_page_fields(page)
+                    if fields is None:
+                        continue
+                    # A cursor re-polled before new pages finished returns pages again, so they are deduplicated
+                    page_key = fields[0] or hashlib.sha256(fields[2].encode("utf-8")).hexdigest()
+                    if page_key not in seen_pages:
+                        seen_pages.add(page_key)
+                        new_pages.append(fields)
+                if new_pages:
+                    yield new_pages
+
+                # Without a cursor in the response, the same one is polled again
+                next_url = getattr(crawl_status, "next", None) or next_url
+                status = getattr(crawl_status, "status", "")
+                if status == "completed":
+                    if not getattr(crawl_status, "next", None):
+                        console_log(f"Firecrawl crawl {job_id} completed with {len(seen_pages)} pages")
+                        return
+                    # The remaining results of a finished crawl are read without waiting
+                    continue
+                if status in ("failed", "cancelled"):
+                    raise RuntimeError(f"Firecrawl crawl {job_id} {status}")
+                time.sleep(self.config.crawl_poll_interval_seconds)
+        except BaseException:
+            try:
+                self.firecrawl.cancel_crawl(job_id)
+            except Exception as cancel_error:
+                console_log(f"Failed to cancel Firecrawl crawl {job_id}: {str(cancel_error)}")
+            raise
+
+    def _crawled_page_fields(self, page: Any) -> Optional[Tuple[str, str, str]]:
+        """(url, title, markdown) of a crawled page document, or None if it has no content"""
+        if isinstance(page, dict):
+            page_metadata = page.get("metadata") or {}
+            url = page_metadata.get("sourceURL") or page_metadata.get("url") or page.get("url", "")
+            title = page_metadata.get("title") or page.get("title", "")
+            content = page.get("markdown") or page.get("content") or ""
+        else:
+            page_metadata = getattr(page, "metadata", None)
+            url = (
+                getattr(page_metadata, "source_url", None)
+                or getattr(page_metadata, "url", None)
+                or getattr(page, "url", "")
+            )
+            title = getattr(page_metadata, "title", None) or getattr(page, "title", "")
+            content = getattr(page, "markdown", None) or getattr(page, "content", None) or ""
+
+        if not content:
+            return None
+        return str(url or ""), str(title or ""), str(content)
+
+    def _chunk_crawled_page(
+        self,
+        page_number: int,
+        page: Tuple[str, str, str],
+        source_name: str,
+        metadata: Dict[str, Any],
+        include_links: bool,
+        chunker: Optional[TokenChunker] = None,
+        deduplicator: Optional[CrawlDeduplicator] = None,
+    ) -> List[DocumentChunkType]:
+        """Strip boilerplate from, clean and chunk one crawled page"""
+        page_url, page_title, page_content = page
+
+        # Apply text cleaning, after removing the crawl's boilerplate lines
+        stripped_content = deduplicator.strip_boilerplate(page_content) if deduplicator is not None else page_content
+        cleaned_content = self._clean_text_content(stripped_content)
+
+        # Remove links if include_links is False
+        if not include_links:
+            cleaned_content = self._remove_links_from_markdown(cleaned_content)
+
+        page_metadata = {
+            **metadata,
+            "root_source_name": source_name,
+            "source_type": "url",
+            "url": page_url,
+            "title": page_title,
+            "crawl_success": True,
+            "include_links": include_links,
+            "full_website_crawl": True,
+            "page_number": page_number,
+            "content_sha256": content_hash(page_content),
+        }
+        return self._create_chunks(cleaned_content, f"{source_name}_page_{page_number}", page_metadata, chunker=chunker)
+
+    def _iter_crawl_chunk_batches(
+        self,
+        start_url: str,
+        source_name: str,
+        metadata: Dict[str, Any],
+        include_links: bool,
+        crawl_options: Optional[CrawlOptionsType],
+        kept: KeptChunks,
+        page_states: Dict[str, CrawlPageStateType],
+        deduplicator: CrawlDeduplicator,
+        progress: IngestionProgress = NO_PROGRESS,
+    ) -> Iterator[List[DocumentChunkType]]:
+        """Chunk crawled pages as Firecrawl delivers them, yielding the chunks of each poll in batches.
+
+        Pages whose content and settings match their crawl state are skipped: their stored chunks
+        are added to kept. The new state of every chunked page is collected in page_states. Changed
+        pages are held back until the deduplicator has seen enough pages to recognise boilerplate.
+        """
+        crawl_params = self._crawl_params(crawl_options)
+        concurrency = crawl_params["max_concurrency"]
+        fingerprint = self._crawl_fingerprint(metadata, include_links)
+        page_number = 0
+        skipped = 0
+        changed_pages: List[Tuple[int, Tuple[str, str, str]]] = []
+
+        def chunk_changed_pages(executor: ThreadPoolExecutor) -> Iterator[List[DocumentChunkType]]:
+            page_chunks = executor.map(
+                lambda numbered_page: self._chunk_crawled_page(
+                    numbered_page[0], numbered_page[1], source_name, metadata, include_links, deduplicator=deduplicator
+                ),
+                changed_pages,
+            )
+
+            # Chunks of a poll are flushed right away so the first pages become searchable early
+            chunks = []
+            for (_, page), chunks_of_page in zip(changed_pages, page_chunks):
+                # Pages whose chunks all duplicate earlier pages still get a state, so they are skipped next time
+                chunks_of_page = deduplicator.drop_near_duplicates(chunks_of_page)
+                chunks.extend(chunks_of_page)
+                if page[0]:
+                    page_states[page[0]] = CrawlPageStateType(
+                        content_hash=content_hash(page[2]),
+                        fingerprint=fingerprint,
+                        chunk_ids=[chunk.id for chunk in chunks_of_page],
+                        token_count=self._sum_tokens(chunks_of_page),
+                    )
+            changed_pages.clear()
+            for start in range(0, len(chunks), self.config.stream_batch_chunks):
+                yield chunks[start : start + self.config.stream_batch_chunks]
+
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="rag-crawl-page") as executor:
+            for pages in self._iter_crawled_pages(start_url, crawl_params, progress):
+                stored_states = self.crawl_state.get_many(source_name, (page[0] for page in pages))
+                for page in pages:
+                    page_number += 1
+                    # Unchanged pages count towards boilerplate too, without being cleaned or chunked
+                    deduplicator.observe(page[2])
+                    stored_state = stored_states.get(page[0])
+                    if (
+                        stored_state is not None
+                        and stored_state.fingerprint == fingerprint
+                        and stored_state.content_hash == content_hash(page[2])
+                    ):
+                        kept.ids.update(stored_state.chunk_ids)
+                        kept.tokens += stored_state.token_count
+                        skipped += 1
+                        continue
+                    changed_pages.append((page_number, page))
+
+                if deduplicator.ready:
+                    yield from chunk_changed_pages(executor)
+            # Crawls with fewer pages than the boilerplate warm-up are chunked once the crawl is done
+            yield from chunk_changed_pages(executor)
+
+        if skipped:
+            console_log(f"Skipped {skipped} pages of {source_name} that did not change since the last crawl")
+        console_log(f"Deduplication of {source_name}: {deduplicator.summary()}")
+
+    def _stream_crawl(
+        self,
+        start_url: str,
+        source_name: str,
+        metadata: Dict[str, Any],
+        include_links: bool,
+        incremental: bool,
+        crawl_options: Optional[CrawlOptionsType] = None,
+        deduplicator: Optional[CrawlDeduplicator] = None,
+        progress: IngestionProgress = NO_PROGRESS,
+    ) -> Tuple[int, int, int, int, int]:
+        """Crawl a website and embed and upsert its pages while the crawl is still running.
+
+        Pages that did not change since the last crawl of the source are skipped. The crawl state is
+        only updated once every chunk is written, so a failed crawl is fully re-processed next time.
+
+        Returns:
+            Total number of chunks, the number written, left unchanged and deleted, and the total number of tokens
+        """
+        kept = KeptChunks()
+        page_states: Dict[str, CrawlPageStateType] = {}
+        batches = self._iter_crawl_chunk_batches(
+            start_url,
+            source_name,
+            metadata,
+            include_links,
+            crawl_options,
+            kept,
+            page_states,
+            deduplicator or self._crawl_deduplicator(),
+            progress,
+        )
+        result = self._write_chunk_batches(
+            _prefetch(batches, STREAM_PREFETCH_BATCHES), source_name, incremental, progress, kept=kept
+        )
+        self.crawl_state.put_many(source_name, page_states)
+        return result
+
+    def _crawl_fingerprint(self, metadata: Dict[str, Any], include_links: bool) -> str:
+        """Fingerprint of everything besides the page content that shapes a crawled page's chunks"""
+        return settings_fingerprint(
+            chunk_size=self.chunker.chunk_size,
+            chunk_overlap=self.chunker.chunk_overlap,
+            encoding=self.chunker.encoding_name,
+            text_cleaner_compat=self.config.text_cleaner_compat,
+            include_links=include_links,
+            metadata=metadata,
+            crawl_dedup=self.config.crawl_dedup,
+            boilerplate_min_pages=self.config.boilerplate_min_pages,
+            boilerplate_page_share=self.config.boilerplate_page_share,
+            near_duplicate_max_distance=self.config.near_duplicate_max_distance,
+        )
+
+    @staticmethod
+    def _dedup_counters(deduplicator: CrawlDeduplicator) -> Dict[str, int]:
+        """Deduplication counters reported on crawl responses"""
+        return {
+            "boilerplate_lines_removed": deduplicator.stats["boilerplate_lines_removed"],
+            "near_duplicate_chunks_dropped": deduplicator.stats["near_duplicate_chunks_dropped"],
+        }
+
+    def _crawl_deduplicator(self) -> CrawlDeduplicator:
+        """Boilerplate and near-duplicate state for one full website crawl"""
+        return CrawlDeduplicator(
+            enabled=self.config.crawl_dedup,
+            boilerplate_min_pages=self.config.boilerplate_min_pages,
+            boilerplate_page_share=self.config.boilerplate_page_share,
+            near_duplicate_max_distance=self.config.near_duplicate_max_distance,
+        )
+
+    def _unchanged_page_response(
+        self, url: str, source_name: str, page_state: CrawlPageStateType
+    ) -> DefaultReturnType[IngestResponseType]:
+        console_log(f"Page did not change since the last crawl, skipped: {url}")
+        return DefaultReturnType(
+            data=IngestResponseType(
+                success=True,
+                message="Page did not change since the last crawl",
+                chunks_created=len(page_state.chunk_ids),
+                chunks_unchanged=len(page_state.chunk_ids),
+                source_id=source_name,
             )
+        )
 
-    def _process_json_data(self, data: str, source_name: str, metadata: Dict[str, Any]) -> List[DocumentChunkType]:
+    def _process_json_data(
+        self, data: str, source_name: str, metadata: Dict[str, Any], chunker: Optional[TokenChunker] = None
+    ) -> List[DocumentChunkType]:
         """Process JSON data"""
         import json
         import base64
@@ -694,10 +1376,10 @@ class RAGIngestionService:
 
             # Convert JSON to readable text format
             formatted_text = json.dumps(json_data, indent=2)
-            return self._create_chunks(formatted_text, source_name, {**metadata, "file_type": "json"})
+            return self._create_chunks(formatted_text, source_name, {**metadata, "file_type": "json"}, chunker=chunker)
         except json.JSONDecodeError:
             # If not valid JSON, treat as text
-            return self._create_chunks(data, source_name, {**metadata, "file_type": "text"})
+            return self._create_chunks(data, source_name, {**metadata, "file_type": "text"}, chunker=chunker)
 
     def crawl_url(
         self,
@@ -706,8 +1388,18 @@ class RAGIngestionService:
         metadata: Optional[Dict[str, Any]] = None,
         include_links: bool = False,
         crawl_full_website: bool = True,
+        incremental: bool = False,
+        crawl_options: Optional[CrawlOptionsType] = None,
+        progress: IngestionProgress = NO_PROGRESS,
+        dry_run: bool = False,
     ) -> DefaultReturnType[IngestResponseType]:
-        """Crawl a URL and ingest its content into the vector database"""
+        """Crawl a URL and ingest its content into the vector database.
+
+        Full website crawls are streamed by default: pages are embedded and upserted as Firecrawl
+        delivers them rather than after the whole crawl. A dry run crawls, cleans and chunks the
+        pages and returns an estimate instead of embedding and storing them.
+        """
+        ingestion_id = None
         try:
             if not source_name:
                 source_name = f"url_{url.split('/')[-1] or 'crawled'}"
@@ -716,9 +1408,64 @@ class RAGIngestionService:
                 metadata = {}
 
             console_log(f"Starting URL crawl for: {url}")
+            progress.report_stage("extracting", url=url)
+
+            deduplicator = self._crawl_deduplicator()
+            if crawl_full_website and self.config.streaming_crawl and dry_run:
+                estimator = self._estimator()
+                # Pages unchanged since the last crawl are skipped as they would be by a real crawl
+                for batch in self._iter_crawl_chunk_batches(
+                    url, source_name, metadata, include_links, crawl_options, KeptChunks(), {}, deduplicator, progress
+                ):
+                    estimator.add(batch)
+                return self._dry_run_response(estimator, source_name, **self._dedup_counters(deduplicator))
+
+            if crawl_full_website and self.config.streaming_crawl:
+                ingestion_id = self._begin_catalog_ingest(source_name, "url")
+                total, written, unchanged, deleted, tokens = self._stream_crawl(
+                    url, source_name, metadata, include_links, incremental, crawl_options, deduplicator, progress
+                )
+                if not total:
+                    self.source_catalog.fail_ingest(ingestion_id, source_name, "No content found to crawl from URL")
+                    return DefaultReturnType(
+                        error=ErrorResponseType(
+                            userMessage="No content found to crawl from URL",
+                            error="No content found to crawl from URL",
+                            errorType="BadRequestException",
+                            errorData={"url": url},
+                            trace=["ingestion_service - crawl_url - no chunks"],
+                        )
+                    )
+                self.source_catalog.commit_ingest(ingestion_id, source_name, total, tokens)
+
+                console_log(f"Successfully crawled and ingested {total} chunks from URL: {url}")
+                return DefaultReturnType(
+                    data=IngestResponseType(
+                        success=True,
+                        message=f"Successfully crawled and ingested {total} chunks from URL ({written} written)",
+                        chunks_created=total,
+                        chunks_unchanged=unchanged,
+                        chunks_deleted=deleted,
+                        **self._dedup_counters(deduplicator),
+                        source_id=source_name,
+                    )
+                )
+
+            # Single pages are first asked with a conditional request whether they changed at all
+            page_state = validators = None
+            if not crawl_full_website:
+                fingerprint = self._crawl_fingerprint(metadata, include_links)
+                page_state = self.crawl_state.get(source_name, url)
+                if page_state is not None and page_state.fingerprint != fingerprint:
+                    page_state = None
+                validators = fetch_validators(url, page_state)
+                if page_state is not None and validators is not None and validators["not_modified"]:
+                    return self._unchanged_page_response(url, source_name, page_state)
 
             # Process the URL data
-            chunks = self._process_url_data(url, source_name, metadata, include_links, crawl_full_website)
+            chunks = self._process_url_data(
+                url, source_name, metadata, include_links, crawl_full_website, deduplicator=deduplicator
+            )
 
             if not chunks:
                 return DefaultReturnType(
@@ -731,26 +1478,55 @@ class RAGIngestionService:
                     )
                 )
 
-            # Store chunks in Pinecone
-            texts = [chunk.content for chunk in chunks]
-            metadatas = [chunk.metadata for chunk in chunks]
-            ids = [chunk.id for chunk in chunks]
+            if dry_run:
+                estimator = self._estimator()
+                estimator.add(chunks)
+                return self._dry_run_response(estimator, source_name, **self._dedup_counters(deduplicator))
+
+            # Scrape errors are stored as chunks but never recorded as crawl state
+            new_page_state = None
+            if not crawl_full_website and "content_sha256" in chunks[0].metadata:
+                new_page_state = CrawlPageStateType(
+                    etag=(validators or {}).get("etag"),
+                    last_modified=(validators or {}).get("last_modified"),
+                    content_hash=chunks[0].metadata["content_sha256"],
+                    fingerprint=fingerprint,
+                    chunk_ids=[chunk.id for chunk in chunks],
+                    token_count=self._sum_tokens(chunks),
+                )
+                if page_state is not None and page_state.content_hash == new_page_state.content_hash:
+                    # Validators changed but the content did not; nothing to re-embed
+                    self.crawl_state.put_many(source_name, {url: new_page_state})
+                    return self._unchanged_page_response(url, source_name, new_page_state)
 
-            self.vector_store.add_texts(texts, metadatas, ids)
+            # Store chunks in Pinecone
+            progress.raise_if_cancelled()
+            ingestion_id = self._begin_catalog_ingest(source_name, "url")
+            written, unchanged, deleted = self._write_chunks(chunks, source_name, incremental, progress)
+            self.source_catalog.commit_ingest(ingestion_id, source_name, len(chunks), self._sum_tokens(chunks))
+            if new_page_state is not None:
+                self.crawl_state.put_many(source_name, {url: new_page_state})
 
             console_log(f"Successfully crawled and ingested {len(chunks)} chunks from URL: {url}")
 
             return DefaultReturnType(
                 data=IngestResponseType(
                     success=True,
-                    message=f"Successfully crawled and ingested {len(chunks)} chunks from URL",
+                    message=f"Successfully crawled and ingested {len(chunks)} chunks from URL ({written} written)",
                     chunks_created=len(chunks),
+                    chunks_unchanged=unchanged,
+                    chunks_deleted=deleted,
+                    **self._dedup_counters(deduplicator),
                     source_id=source_name,
                 )
             )
 
+        except IngestionJobCancelledError:
+            self.source_catalog.fail_ingest(ingestion_id, source_name or "", "Cancelled")
+            raise
         except Exception as e:
             console_log(f"Error crawling URL {url}: {str(e)}")
+            self.source_catalog.fail_ingest(ingestion_id, source_name or "", str(e))
             return DefaultReturnType(
                 error=ErrorResponseType(
                     userMessage="Error crawling URL!",
@@ -763,48 +1539,64 @@ class RAGIngestionService:
 
     # Ingest a file and store it in Pinecone
     def ingest_file(
-        self, file_data: bytes, file_type: str, request: FileIngestRequestArgs
+        self,
+        file_data: FileDataType,
+        file_type: str,
+        request: FileIngestRequestArgs,
+        progress: IngestionProgress = NO_PROGRESS,
     ) -> DefaultReturnType[IngestResponseType]:
-        """Ingest a file directly from bytes data"""
+        """Ingest a file from bytes data or from the path of a spooled upload"""
+        ingestion_id = None
         try:
             console_log(f"Starting file ingestion for source: {request.source_name}, type: {file_type}")
-
-            # Extract text from file using lightweight processor
-            extracted_text = self.doc_processor.extract_text_from_file(file_data, file_type, request.source_name)
-
-            if not extracted_text or extracted_text.startswith("Error extracting text"):
-                console_log(f"Failed to extract text from {file_type}, treating as raw text")
-                # Fallback to treating as raw text
-                extracted_text = file_data.decode("utf-8", errors="ignore")
-
-            # Clean the extracted text
-            cleaned_text = self._clean_text_content(extracted_text)
-
-            # Create chunks
-            chunks = self._create_chunks(
-                cleaned_text, request.source_name, {**(request.metadata or {}), "file_type": file_type}
+            file_size = os.path.getsize(file_data) if isinstance(file_data, str) else len(file_data)
+            progress.report_stage("extracting", file_type=file_type, bytes=file_size)
+
+            # The file hash is recorded in the source catalog only: on the chunks it would change all of
+            # them on any edit of the file and defeat incremental re-ingestion
+            metadata = {**(request.metadata or {}), "file_type": file_type}
+
+            # Extract, chunk, embed and upsert page by page: batches are stored while later pages are
+            # still being extracted. The chunk count is only known at the end and goes to the catalog
+            chunker = get_chunker(request.chunk_size, request.chunk_overlap)
+            pages = self._iter_file_text(file_data, file_type, request.source_name)
+            batches = self._iter_chunk_batches(pages, request.source_name, metadata, chunker=chunker)
+            if request.dry_run:
+                estimator = self._estimator()
+                for batch in batches:
+                    progress.raise_if_cancelled()
+                    estimator.add(batch)
+                return self._dry_run_response(estimator, request.source_name)
+
+            ingestion_id = self._begin_catalog_ingest(request.source_name, file_type, request.content_sha256, chunker)
+            total, written, unchanged, deleted, tokens = self._write_chunk_batches(
+                _prefetch(batches, STREAM_PREFETCH_BATCHES),
+                request.source_name,
+                request.incremental,
+                progress,
+                streamed=True,
             )
+            self.source_catalog.commit_ingest(ingestion_id, request.source_name, total, tokens)
 
-            # Store chunks in Pinecone
-            texts = [chunk.content for chunk in chunks]
-            metadatas = [chunk.metadata for chunk in chunks]
-            ids = [chunk.id for chunk in chunks]
-
-            self.vector_store.add_texts(texts, metadatas, ids)
-
-            console_log(f"Successfully ingested {len(chunks)} chunks for file: {request.source_name}")
+            console_log(f"Successfully ingested {total} chunks for file: {request.source_name}")
 
             return DefaultReturnType(
                 data=IngestResponseType(
                     success=True,
-                    message=f"Successfully ingested {len(chunks)} chunks from file",
-                    chunks_created=len(chunks),
+                    message=f"Successfully ingested {total} chunks from file ({written} written)",
+                    chunks_created=total,
+                    chunks_unchanged=unchanged,
+                    chunks_deleted=deleted,
                     source_id=request.source_name,
                 )
             )
 
+        except IngestionJobCancelledError:
+            self.source_catalog.fail_ingest(ingestion_id, request.source_name, "Cancelled")
+            raise
         except Exception as e:
             console_log(f"Error ingesting file: {str(e)}")
+            self.source_catalog.fail_ingest(ingestion_id, request.source_name, str(e))
             return DefaultReturnType(
                 error=ErrorResponseType(
                     userMessage="Error ingesting file!",
@@ -815,10 +1607,203 @@ class RAGIngestionService:
                 )
             )
 
+    def _prepare_bulk_document(
+        self, document: BulkDocumentType, incremental: bool, chunker: TokenChunker
+    ) -> Tuple[List[DocumentChunkType], List[DocumentChunkType], int, List[str]]:
+        """Extract and chunk one bulk document and, when incremental, diff it against its stored chunks.
+
+        Chunks that only moved get their metadata rewritten right away; chunks to embed are returned
+        so they can share embedding requests and upserts with other documents.
+
+        Returns:
+            All chunks, the chunks to embed and upsert, the number left unchanged and the ids of removed chunks
+        """
+        metadata = {**document.metadata, "file_type": document.file_type}
+
+        pages = self._iter_file_text(document.file_path, document.file_type, document.source_name)
+        chunks = [
+            chunk
+            for batch in self._iter_chunk_batches(pages, document.source_name, metadata, chunker=chunker)
+            for chunk in batch
+        ]
+        # A bulk document is chunked completely before it is written, so total_chunks is known
+        for chunk in chunks:
+            chunk.total_chunks = len(chunks)
+            chunk.metadata["total_chunks"] = len(chunks)
+
+        if not incremental:
+            return chunks, chunks, 0, []
+
+        stored_metadata = self._get_stored_chunk_metadata(document.source_name)
+        new_chunks = []
+        moved_chunks = []
+        unchanged = 0
+        for chunk in chunks:
+            stored = stored_metadata.get(chunk.id)
+            if stored is None:
+                new_chunks.append(chunk)
+            elif self._is_chunk_unchanged(stored, chunk):
+                unchanged += 1
+            else:
+                moved_chunks.append(chunk)
+        self._update_chunk_metadata(moved_chunks)
+
+        chunk_ids = {chunk.id for chunk in chunks}
+        removed_ids = [chunk_id for chunk_id in stored_metadata if chunk_id not in chunk_ids]
+        return chunks, new_chunks, unchanged, removed_ids
+
+    def ingest_bulk(
+        self,
+        documents: List[BulkDocumentType],
+        request: BulkIngestRequestArgs,
+        rejected: Optional[List[BulkDocumentResultType]] = None,
+        progress: IngestionProgress = NO_PROGRESS,
+    ) -> DefaultReturnType[BulkIngestResponseType]:
+        """Ingest many spooled files in one pipeline.
+
+        Documents are extracted and chunked on bulk_ingest_concurrency threads while the chunks of
+        finished documents are embedded and upserted together, bulk_upsert_batch_chunks at a time.
+        A document that fails does not stop the others. rejected documents (e.g. unsupported file
+        types) are only reported in the results.
+        """
+        try:
+            console_log(f"Starting bulk ingestion of {len(documents)} documents")
+            chunker = get_chunker(request.chunk_size, request.chunk_overlap)
+            results: Dict[int, BulkDocumentResultType] = {}
+            # New chunks of finished documents waiting for the next shared write, and those documents
+            # with their removed chunk ids, catalog ingestion id and token count
+            pending_chunks: List[DocumentChunkType] = []
+            pending_documents: List[Tuple[int, List[str], Optional[str], int]] = []
+            # Dry runs account for the shared writes instead of making them
+            estimator = self._estimator() if request.dry_run else None
+
+            def flush() -> None:
+                if estimator is not None:
+                    estimator.add(pending_chunks)
+                    pending_chunks.clear()
+                    pending_documents.clear()
+                    return
+                try:
+                    self._store_chunks(pending_chunks, progress)
+                    for _, removed_ids, _, _ in pending_documents:
+                        self._delete_chunks(removed_ids)
+                except IngestionJobCancelledError:
+                    for index, _, ingestion_id, _ in pending_documents:
+                        self.source_catalog.fail_ingest(ingestion_id, documents[index].source_name, "Cancelled")
+                    raise
+                except Exception as error:
+                    console_log(f"Bulk write of {len(pending_chunks)} chunks failed: {str(error)}")
+                    for index, _, ingestion_id, _ in pending_documents:
+                        results[index] = results[index].model_copy(update={"success": False, "error": str(error)})
+                        self.source_catalog.fail_ingest(ingestion_id, documents[index].source_name, str(error))
+                else:
+                    for index, _, ingestion_id, tokens in pending_documents:
+                        self.source_catalog.commit_ingest(
+                            ingestion_id, documents[index].source_name, results[index].chunks_created, tokens
+                        )
+                pending_chunks.clear()
+                pending_documents.clear()
+
+            def collect(done: Iterable[Future], in_flight: Dict[Future, int]) -> None:
+                for future in done:
+                    index = in_flight.pop(future)
+                    document = documents[index]
+                    try:
+                        chunks, new_chunks, unchanged, removed_ids = future.result()
+                    except IngestionJobCancelledError:
+                        raise
+                    except Exception as error:
+                        console_log(f"Bulk ingestion of {document.path} failed: {str(error)}")
+                        results[index] = BulkDocumentResultType(
+                            path=document.path, source_name=document.source_name, success=False, error=str(error)
+                        )
+                        continue
+
+                    if not chunks:
+                        results[index] = BulkDocumentResultType(
+                            path=document.path,
+                            source_name=document.source_name,
+                            success=False,
+                            error="No content found in document",
+                        )
+                        continue
+
+                    results[index] = BulkDocumentResultType(
+                        path=document.path,
+                        source_name=document.source_name,
+                        success=True,
+                        chunks_created=len(chunks),
+                        chunks_unchanged=unchanged,
+                        chunks_deleted=len(removed_ids),
+                    )
+                    ingestion_id = None
+                    if estimator is None:
+                        ingestion_id = self._begin_catalog_ingest(
+                            document.source_name, document.file_type, document.content_sha256, chunker
+                        )
+                    pending_chunks.extend(new_chunks)
+                    pending_documents.append((index, removed_ids, ingestion_id, self._sum_tokens(chunks)))
+                    if len(pending_chunks) >= self.config.bulk_upsert_batch_chunks:
+                        flush()
+
+            concurrency = max(1, self.config.bulk_ingest_concurrency)
+            # Incremental diffs read stored chunks, which dry runs never touch
+            incremental = request.incremental and not request.dry_run
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="rag-bulk") as executor:
+                in_flight: Dict[Future, int] = {}
+                for index, document in enumerate(documents):
+                    progress.raise_if_cancelled()
+                    future = executor.submit(self._prepare_bulk_document, document, incremental, chunker)
+                    in_flight[future] = index
+                    # Extraction runs at most one round of documents ahead of the embed/upsert stage
+                    while len(in_flight) >= concurrency * 2:
+                        collect(wait(in_flight, return_when=FIRST_COMPLETED).done, in_flight)
+                        progress.report_stage("extracting", documents=len(results), total_documents=len(documents))
+                while in_flight:
+                    collect(wait(in_flight, return_when=FIRST_COMPLETED).done, in_flight)
+                flush()
+
+            document_results = (rejected or []) + [results[index] for index in range(len(documents))]
+            succeeded = sum(1 for result in document_results if result.success)
+            failed = len(document_results) - succeeded
+            chunks_created = sum(result.chunks_created for result in document_results if result.success)
+            console_log(f"Bulk ingestion finished: {succeeded} documents ingested, {failed} failed")
+            message = f"Ingested {succeeded} of {len(document_results)} documents ({chunks_created} chunks)"
+
+            return DefaultReturnType(
+                data=BulkIngestResponseType(
+                    success=failed == 0,
+                    message=f"Dry run: {message}, nothing was stored" if estimator is not None else message,
+                    documents_succeeded=succeeded,
+                    documents_failed=failed,
+                    chunks_created=chunks_created,
+                    results=document_results,
+                    estimate=estimator.estimate() if estimator is not None else None,
+                )
+            )
+
+        except IngestionJobCancelledError:
+            raise
+        except Exception as e:
+            console_log(f"Error in bulk ingestion: {str(e)}")
+            return DefaultReturnType(
+                error=ErrorResponseType(
+                    userMessage="Error in bulk ingestion!",
+                    error=str(e),
+                    errorType="InternalServerErrorException",
+                    errorData={},
+                    trace=["ingestion_service - ingest_bulk - except Exception"],
+                )
+            )
+
     # Ingest a document and store it in Pinecone
-    def ingest_document(self, request: IngestRequestArgs) -> DefaultReturnType[IngestResponseType]:
+    def ingest_document(
+        self, request: IngestRequestArgs, progress: IngestionProgress = NO_PROGRESS
+    ) -> DefaultReturnType[IngestResponseType]:
+        ingestion_id = None
         try:
             console_log(f"Starting ingestion for source: {request.source_name}")
+            progress.report_stage("extracting", source_type=request.source_type)
 
             # Determine include_links and crawl_full_website values for URL processing
             include_links = (
@@ -828,26 +1813,28 @@ class RAGIngestionService:
                 request.crawl_full_website if request.crawl_full_website is not None else self.config.crawl_full_website
             )
 
+            # Chunk with the request's chunking parameters
+            chunker = get_chunker(request.chunk_size, request.chunk_overlap)
+
             # Process data based on source type
             match request.source_type:
                 case "text":
-                    chunks = self._process_text_data(request.data, request.source_name, request.metadata or {})
-                case "pdf":
-                    chunks = self._process_pdf_data(request.data, request.source_name, request.metadata or {})
-                case "docx":
-                    chunks = self._process_docx_data(request.data, request.source_name, request.metadata or {})
-                case "doc":
-                    chunks = self._process_doc_data(request.data, request.source_name, request.metadata or {})
-                case "ppt":
-                    chunks = self._process_ppt_data(request.data, request.source_name, request.metadata or {})
-                case "pptx":
-                    chunks = self._process_pptx_data(request.data, request.source_name, request.metadata or {})
+                    chunks = self._process_text_data(request.data, request.source_name, request.metadata or {}, chunker)
+                case "pdf" | "docx" | "doc" | "ppt" | "pptx":
+                    chunks = self._process_file_data(
+                        request.data, request.source_type, request.source_name, request.metadata or {}, chunker
+                    )
                 case "url":
                     chunks = self._process_url_data(
-                        request.data, request.source_name, request.metadata or {}, include_links, crawl_full_website
+                        request.data,
+                        request.source_name,
+                        request.metadata or {},
+                        include_links,
+                        crawl_full_website,
+                        chunker,
                     )
                 case "json":
-                    chunks = self._process_json_data(request.data, request.source_name, request.metadata or {})
+                    chunks = self._process_json_data(request.data, request.source_name, request.metadata or {}, chunker)
                 case _:
                     return DefaultReturnType(
                         error=ErrorResponseType(
@@ -859,26 +1846,38 @@ class RAGIngestionService:
                         )
                     )
 
-            # Store chunks in Pinecone
-            texts = [chunk.content for chunk in chunks]
-            metadatas = [chunk.metadata for chunk in chunks]
-            ids = [chunk.id for chunk in chunks]
+            if request.dry_run:
+                estimator = self._estimator()
+                estimator.add(chunks)
+                return self._dry_run_response(estimator, request.source_name)
 
-            self.vector_store.add_texts(texts, metadatas, ids)
+            # Store chunks in Pinecone
+            progress.raise_if_cancelled()
+            ingestion_id = self._begin_catalog_ingest(
+                request.source_name, request.source_type, hashlib.sha256(str(request.data).encode("utf-8")).hexdigest()
+            )
+            written, unchanged, deleted = self._write_chunks(chunks, request.source_name, request.incremental, progress)
+            self.source_catalog.commit_ingest(ingestion_id, request.source_name, len(chunks), self._sum_tokens(chunks))
 
             console_log(f"Successfully ingested {len(chunks)} chunks for source: {request.source_name}")
 
             return DefaultReturnType(
                 data=IngestResponseType(
                     success=True,
-                    message=f"Successfully ingested {len(chunks)} chunks",
+                    message=f"Successfully ingested {len(chunks)} chunks ({written} written)",
                     chunks_created=len(chunks),
+                    chunks_unchanged=unchanged,
+                    chunks_deleted=deleted,
                     source_id=request.source_name,
                 )
             )
 
+        except IngestionJobCancelledError:
+            self.source_catalog.fail_ingest(ingestion_id, request.source_name, "Cancelled")
+            raise
         except Exception as e:
             console_log(f"Error ingesting document: {str(e)}")
+            self.source_catalog.fail_ingest(ingestion_id, request.source_name, str(e))
             return DefaultReturnType(
                 error=ErrorResponseType(
                     userMessage="Error ingesting document!",
@@ -890,24 +1889,27 @@ class RAGIngestionService:
             )
 
     def delete_document(self, source_name: str) -> DefaultReturnType[bool]:
-        """Delete all chunks for a specific source"""
+        """Delete all chunks for a specific source, including every page of a crawled site"""
         try:
-            # Query for all chunks with the source name
-            results: Any = self.index.query(
-                vector=[0.0] * 1024,  # Dummy vector
-                filter={"source_name": source_name},
-                top_k=10000,  # Large number to get all chunks
-                include_metadata=True,
-            )
-
-            if results.matches:
-                ids_to_delete = [match.id for match in results.matches]
-                self.index.delete(ids=ids_to_delete)
-                console_log(f"Deleted {len(ids_to_delete)} chunks for source: {source_name}")
-                return DefaultReturnType(data=True)
+            # Without its chunks, the crawl state of the source would make a re-crawl skip every page
+            self.crawl_state.delete_source(source_name)
+            # The catalog entry stays visibly "deleting" if the process dies before every chunk is gone
+            self.source_catalog.begin_delete(source_name)
+
+            # Delete page by page while listing the source's chunk ids, however many there are
+            deleted = 0
+            for chunk_ids in self._iter_chunk_id_pages(source_name):
+                self._delete_chunks(chunk_ids)
+                deleted += len(chunk_ids)
+            self.source_catalog.commit_delete(source_name)
+            # Legacy chunk ids do not name their source, so it is invalidated explicitly
+            self._content_changed([source_name])
+
+            if deleted:
+                console_log(f"Deleted {deleted} chunks for source: {source_name}")
             else:
                 console_log(f"No chunks found for source: {source_name}")
-                return DefaultReturnType(data=True)
+            return DefaultReturnType(data=True)
 
         except Exception as e:
             return DefaultReturnType(
@@ -924,15 +1926,27 @@ class RAGIngestionService:
         """Get statistics about stored documents"""
         try:
             if source_name:
-                # Get stats for specific source
-                results: Any = self.index.query(
-                    vector=[0.0] * 1024, filter={"source_name": source_name}, top_k=10000, include_metadata=True
-                )
+                # Served from the source catalog once the source's last ingestion has finished
+                source = self.source_catalog.get(source_name)
+                if source is not None and source.status == "ready":
+                    return DefaultReturnType(
+                        data={
+                            **source.model_dump(exclude={"ingestion_id"}),
+                            "total_chunks": source.chunk_count,
+                            "total_tokens": source.token_count,
+                        }
+                    )
+
+                # Uncataloged sources, or ones being written, are counted from their stored chunks
+                total_chunks = total_tokens = 0
+                for _, metadata in self._iter_stored_chunks(source_name):
+                    total_chunks += 1
+                    total_tokens += metadata.get("token_count", 0)
                 return DefaultReturnType(
                     data={
                         "source_name": source_name,
-                        "total_chunks": len(results.matches),
-                        "total_tokens": sum(match.metadata.get("token_count", 0) for match in results.matches),
+                        "total_chunks": total_chunks,
+                        "total_tokens": total_tokens,
                     }
                 )
             else:
@@ -943,6 +1957,7 @@ class RAGIngestionService:
                         "total_vectors": stats.total_vector_count,
                         "dimension": stats.dimension,
                         "index_fullness": stats.index_fullness,
+                        "namespaces": len(stats.namespaces or {}),
                     }
                 )
 
@@ -958,20 +1973,38 @@ class RAGIngestionService:
                 )
             )
 
+    def list_sources(
+        self, owner_id: Optional[str] = None, limit: int = 100, skip: int = 0
+    ) -> DefaultReturnType[List[RAGSourceType]]:
+        """List cataloged sources of an owner, most recently updated first"""
+        try:
+            return DefaultReturnType(data=self.source_catalog.list(owner_id, limit, skip))
+
+        except Exception as e:
+            console_log(f"Error listing sources: {str(e)}")
+            return DefaultReturnType(
+                error=ErrorResponseType(
+                    userMessage="Error listing sources!",
+                    error=str(e),
+                    errorType="InternalServerErrorException",
+                    errorData={},
+                    trace=["ingestion_service - list_sources - except Exception"],
+                )
+            )
+
     def re_ingest_document_with_cleaning(self, source_name: str) -> DefaultReturnType[IngestResponseType]:
         """Re-ingest a document with text cleaning applied to existing content"""
+        ingestion_id = None
         try:
             console_log(f"Re-ingesting document with cleaning: {source_name}")
 
-            # Get all existing chunks for the source
-            results: Any = self.index.query(
-                vector=[0.0] * 1024,  # Dummy vector
-                filter={"source_name": source_name},
-                top_k=10000,  # Large number to get all chunks
-                include_metadata=True,
+            # Get all existing chunks for the source, in document order
+            stored_chunks = sorted(
+                self._iter_stored_chunks(source_name),
+                key=lambda stored: (stored[1].get("page_number", 0), stored[1].get("chunk_index", 0)),
             )
 
-            if not results.matches:
+            if not stored_chunks:
                 return DefaultReturnType(
                     error=ErrorResponseType(
                         userMessage=f"No documents found for source: {source_name}",
@@ -985,11 +2018,11 @@ class RAGIngestionService:
             # Collect all content and metadata
             all_content = []
             metadata = {}
-            for match in results.matches:
-                all_content.append(match.metadata.get("content", ""))
-                # Use the first match's metadata as the base
+            for _, stored_metadata in stored_chunks:
+                all_content.append(stored_metadata.get(TEXT_METADATA_KEY, ""))
+                # Use the first chunk's metadata as the base
                 if not metadata:
-                    metadata = match.metadata
+                    metadata = {key: value for key, value in stored_metadata.items() if key != TEXT_METADATA_KEY}
 
             # Combine all content
             combined_content = "\n".join(all_content)
@@ -1002,19 +2035,22 @@ class RAGIngestionService:
             )
 
             # Delete existing chunks
-            ids_to_delete = [match.id for match in results.matches]
-            self.index.delete(ids=ids_to_delete)
+            source = self.source_catalog.get(source_name)
+            ingestion_id = self._begin_catalog_ingest(
+                source_name, source.source_type if source is not None else metadata.get("source_type", "text")
+            )
+            ids_to_delete = [chunk_id for chunk_id, _ in stored_chunks]
+            self._delete_chunks(ids_to_delete)
             console_log(f"Deleted {len(ids_to_delete)} old chunks for source: {source_name}")
+            # Crawled pages' states list the deleted chunk ids, so the next crawl must process every page again
+            self.crawl_state.delete_source(source_name)
 
             # Re-ingest with cleaned content
             chunks = self._create_chunks(cleaned_content, source_name, metadata)
 
             # Store new chunks in Pinecone
-            texts = [chunk.content for chunk in chunks]
-            metadatas = [chunk.metadata for chunk in chunks]
-            ids = [chunk.id for chunk in chunks]
-
-            self.vector_store.add_texts(texts, metadatas, ids)
+            self._store_chunks(chunks)
+            self.source_catalog.commit_ingest(ingestion_id, source_name, len(chunks), self._sum_tokens(chunks))
 
             console_log(f"Successfully re-ingested {len(chunks)} cleaned chunks for source: {source_name}")
 
@@ -1029,6 +2065,7 @@ class RAGIngestionService:
 
         except Exception as e:
             console_log(f"Error re-ingesting document {source_name}: {str(e)}")
+            self.source_catalog.fail_ingest(ingestion_id, source_name, str(e))
             return DefaultReturnType(
                 error=ErrorResponseType(
                     userMessage="Error re-ingesting document!",
@@ -0,0 +1,56 @@
+"""
+Maximal Marginal Relevance selection over stored candidate vectors.
+"""
+
+from typing import List, Sequence
+
+import numpy as np
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Float32 copy of a matrix (or vector) with L2-normalised rows, so cosine similarity is a dot product"""
+    matrix = np.array(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def mmr_select(
+    query_vector: np.ndarray, candidate_vectors: Sequence[Sequence[float]], k: int, lambda_mult: float = 0.5
+) -> List[int]:
+    """
+    Select k candidates by Maximal Marginal Relevance.
+
+    Args:
+        query_vector: Embedding of the query
+        candidate_vectors: Stored vectors of the candidates, one row per candidate
+        k: Number of candidates to select
+        lambda_mult: Balance between relevance and diversity (0=max diversity, 1=max relevance)
+
+    Returns:
+        Indices of the selected candidates, in selection order
+    """
+    if len(candidate_vectors) == 0 or k <= 0:
+        return []
+
+    matrix = normalize_rows(np.asarray(candidate_vectors, dtype=np.float32))
+    relevance = matrix @ normalize_rows(query_vector)
+    count = matrix.shape[0]
+
+    selected: List[int] = []
+    # Highest similarity of each candidate to any selected one
+    max_similarity = np.full(count, -np.inf, dtype=np.float32)
+    available = np.ones(count, dtype=bool)
+    while len(selected) < min(k, count):
+        if selected:
+            scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        else:
+            # The first pick is the most relevant candidate
+            scores = relevance.copy()
+        scores[~available] = -np.inf
+        index = int(np.argmax(scores))
+
+        selected.append(index)
+        available[index] = False
+        np.maximum(max_similarity, matrix @ matrix[index], out=max_similarity)
+    return selected
@@ -0,0 +1,197 @@
+"""
+One embedding per query, cached across requests.
+"""
+
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.rag.embedding_cache import RedisEmbeddingTier
+from app.rag.stats import Counters, percentile, ratio
+from app.shared.config.config import env
+from app.shared.logger.logger import console_log
+
+REDIS_KEY_PREFIX = "rag:qemb:"
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_question(text: str) -> str:
+    """Normalise a question so trivially different phrasings of it share a cache entry"""
+    text = _PUNCTUATION.sub(" ", unicodedata.normalize("NFKC", text).casefold())
+    return " ".join(text.split())
+
+
+class QueryEmbedding:
+    """A question and its float32 embedding"""
+
+    def __init__(self, text: str, vector: np.ndarray, model: str, elapsed_ms: float, cached: bool = False):
+        self.text = text
+        self.vector = vector
+        self.model = model
+        self.elapsed_ms = elapsed_ms  # Time spent embedding the question or looking it up
+        self.cached = cached  # Whether the vector came from the query embedding cache
+        self._values: Optional[List[float]] = None
+
+    @property
+    def values(self) -> List[float]:
+        """The vector as a list of floats, as vector database clients expect it"""
+        if self._values is None:
+            self._values = self.vector.tolist()
+        return self._values
+
+
+class QueryEmbeddingCache:
+    """In-process LRU of question embeddings in front of a shared Redis tier"""
+
+    def __init__(self, max_entries: int, ttl_seconds: int, redis_tier: Optional[RedisEmbeddingTier]):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.redis_tier = redis_tier
+        self.stats = Counters(("memory_hits", "redis_hits", "misses", "errors"))
+        self._entries: "OrderedDict[str, Tuple[np.ndarray, float]]" = OrderedDict()  # key -> (vector, expires at)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model_key: str, question: str) -> str:
+        """Cache key of a question embedded with model_key (model name and output dimension)"""
+        return f"{model_key}:{hashlib.sha256(normalize_question(question).encode('utf-8')).hexdigest()}"
+
+    def _get_memory(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def _put_memory(self, key: str, vector: np.ndarray) -> None:
+        with self._lock:
+            self._entries[key] = (vector, time.time() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Look up a key in memory, then in Redis. Redis hits are kept in memory."""
+        vector = self._get_memory(key)
+        if vector is not None:
+            self.stats.record(memory_hits=1)
+            return vector
+
+        if self.redis_tier is not None:
+            try:
+                vector = self.redis_tier.get_many([key]).get(key)
+            except Exception as error:
+                self.stats.record(errors=1)
+                console_log(f"Query embedding cache Redis lookup failed: {str(error)}")
+        if vector is None:
+            self.stats.record(misses=1)
+            return None
+
+        self._put_memory(key, vector)
+        self.stats.record(redis_hits=1)
+        return vector
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        """Write a freshly computed question embedding to both tiers"""
+        self._put_memory(key, vector)
+        if self.redis_tier is not None:
+            try:
+                self.redis_tier.put_many({key: vector})
+            except Exception as error:
+                self.stats.record(errors=1)
+                console_log(f"Query embedding cache Redis write failed: {str(error)}")
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            entries = len(self._entries)
+        counters = self.stats.counters()
+        hits = counters["memory_hits"] + counters["redis_hits"]
+        return {**counters, "hit_rate": ratio(hits, hits + counters["misses"]), "memory_entries": entries}
+
+
+_query_embedding_cache: Optional[QueryEmbeddingCache] = None
+_query_embedding_cache_lock = threading.Lock()
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    """Get or create the process-wide query embedding cache"""
+    global _query_embedding_cache
+    with _query_embedding_cache_lock:
+        if _query_embedding_cache is None:
+            # Query vectors are few and score every match, so they are kept at full precision
+            redis_tier = RedisEmbeddingTier(
+                ttl_seconds=env.RAG_QUERY_EMBEDDING_CACHE_TTL_SECONDS, dtype="float32", key_prefix=REDIS_KEY_PREFIX
+            )
+            _query_embedding_cache = QueryEmbeddingCache(
+                max_entries=env.RAG_QUERY_EMBEDDING_CACHE_MAX_ENTRIES,
+                ttl_seconds=env.RAG_QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+                redis_tier=redis_tier,
+            )
+        return _query_embedding_cache
+
+
+class QueryEmbedder:
+    """The single entry point through which query services embed questions"""
+
+    def __init__(self, embeddings: Any, model: str, dimension: Optional[int] = None, use_cache: bool = True):
+        self.embeddings = embeddings
+        self.model = model
+        self.stats = Counters(("calls", "errors", "total_ms"), samples=("elapsed_ms",))
+        self._cache: Optional[QueryEmbeddingCache] = get_query_embedding_cache() if use_cache else None
+        # Cached vectors are only interchangeable for the same model and output dimension
+        self._cache_model_key = f"{model}:{dimension or 'native'}"
+
+    def _embed(self, text: str) -> np.ndarray:
+        # DimensionReducedEmbeddings returns float32 directly, plain langchain embeddings return a list
+        if hasattr(self.embeddings, "embed_query_vector"):
+            return self.embeddings.embed_query_vector(text)
+        return np.asarray(self.embeddings.embed_query(text), dtype=np.float32)
+
+    def embed(self, text: str) -> QueryEmbedding:
+        """Embed a question once for the whole request, from the cache when it was asked before"""
+        started = time.perf_counter()
+        key = self._cache.make_key(self._cache_model_key, text) if self._cache is not None else ""
+        if self._cache is not None:
+            vector = self._cache.get(key)
+            if vector is not None:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                console_log(f"Query embedding served from cache in {elapsed_ms:.1f}ms")
+                return QueryEmbedding(text, vector, self.model, elapsed_ms, cached=True)
+
+        try:
+            vector = self._embed(text)
+        except Exception:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.stats.record({"elapsed_ms": elapsed_ms}, calls=1, errors=1, total_ms=elapsed_ms)
+            raise
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stats.record({"elapsed_ms": elapsed_ms}, calls=1, total_ms=elapsed_ms)
+        console_log(f"Embedded query with {self.model} ({len(vector)} dimensions) in {elapsed_ms:.1f}ms")
+        if self._cache is not None:
+            self._cache.put(key, vector)
+        return QueryEmbedding(text, vector, self.model, elapsed_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Embedding call counters and recent latencies, with the hit/miss counters of the cache in front of them"""
+        counters = self.stats.counters()
+        elapsed_ms = self.stats.samples("elapsed_ms")
+        return {
+            "calls": counters["calls"],
+            "errors": counters["errors"],
+            "avg_ms": ratio(counters["total_ms"], counters["calls"]),
+            "p50_ms": percentile(elapsed_ms, 0.5),
+            "p99_ms": percentile(elapsed_ms, 0.99),
+            "max_ms": elapsed_ms[-1] if elapsed_ms else 0.0,
+            "cache": self._cache.snapshot() if self._cache is not None else None,
+        }
@@ -1,8 +1,6 @@
-import re
-import numpy as np
-from typing import List, Dict, Any, Optional, Tuple
+import asyncio
+from typing import List, Dict, Any, Optional
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from langchain_pinecone import PineconeVectorStore
 from langchain.prompts import PromptTemplate
 from pinecone import Pinecone
 from pydantic import SecretStr
@@ -14,7 +12,13 @@ from app.shared.logger.logger import console_log
 from app.rag.rag_types import QueryRequestArgs, QueryResponseType, SearchResultType, QueryModeType, RAGConfigType
 from app.shared.types.return_type import DefaultReturnType, ErrorResponseType
 from app.shared.utils.error_util import is_error, carry_error
-from app.rag.ingestion_service import DimensionReducedEmbeddings
+from app.rag.ingestion_service import TEXT_METADATA_KEY, DimensionReducedEmbeddings
+from app.rag.mmr import mmr_select
+from app.rag.answer_cache import AnswerCache, get_answer_cache
+from app.rag.search_executor import VectorSearchTimeoutError, get_search_executor
+from app.rag.query_embedding import QueryEmbedder, QueryEmbedding
+from app.rag.text_cleaner import clean_search_text
+from app.rag.tenancy import DEFAULT_NAMESPACE, group_by_namespace, tenant_namespace
 
 
 class RAGQueryService:
@@ -25,8 +29,22 @@ class RAGQueryService:
         console_log(f"Initializing RAGQueryService with embedding model: {self.config.embedding_model}")
         # Use custom dimension-reduced embeddings to convert 1536 -> 1024 dimensions
         self.embeddings = DimensionReducedEmbeddings(
-            model=self.config.embedding_model, api_key=SecretStr(env.OPENAI_KEY)
+            model=self.config.embedding_model,
+            api_key=SecretStr(env.OPENAI_KEY),
+            target_dimension=self.config.embedding_dimension,
+            native_dimensions=self.config.native_embedding_dimensions,
+            # Questions are cached by the query embedder. The chunk embedding cache would only be looked up
+            # for them in vain, and one-off questions would evict chunk embeddings from its disk tier
+            use_cache=False,
         )
+        self.query_embedder = QueryEmbedder(
+            self.embeddings,
+            self.config.embedding_model,
+            dimension=self.config.embedding_dimension,
+            use_cache=self.config.use_query_embedding_cache,
+        )
+        self.search_executor = get_search_executor()
+        self.answer_cache: Optional[AnswerCache] = get_answer_cache() if self.config.use_answer_cache else None
         self.llm = ChatOpenAI(
             model=self.config.llm_model, temperature=self.config.temperature, api_key=SecretStr(env.OPENAI_KEY)
         )
@@ -44,55 +62,29 @@ class RAGQueryService:
 
     def _clean_text_content(self, content: str) -> str:
         """Comprehensively clean text content by removing unwanted elements"""
-        if not content:
-            return content
-
-        # Remove HTML comments and tags
-        content = re.sub(r"<!--.*?-->|<[^>]+>", "", content, flags=re.DOTALL)
-
-        # Remove markdown inline links: [text](url-with-(parens))
-        content = re.sub(r"\[([^\]]+)\]\((?:[^)(]+|\([^)(]*\))*\)", r"\1", content)
-
-        # Remove markdown reference links: [text][ref] or [text][]
-        content = re.sub(r"\[([^\]]+)\]\s*\[[^\]]*\]", r"\1", content)
-
-        # Remove various reference indicators patterns:
-        # Pattern 1: [[a]], [[b]], [[16]], [[254]], etc.
-        content = re.sub(r"\[\[[a-zA-Z0-9]+\]\]", "", content)
-
-        # Pattern 2: [\[a\]], [\[b\]], [\[16\]], etc. (escaped brackets)
-        content = re.sub(r"\[\\?\[[a-zA-Z0-9]+\\?\]\]", "", content)
-
-        # Pattern 3: [a], [b], [16], [254], etc. (single brackets)
-        content = re.sub(r"\[[a-zA-Z0-9]+\]", "", content)
-
-        # Pattern 4: Handle any remaining escaped bracket combinations
-        content = re.sub(r"\\\[([a-zA-Z0-9]+)\\\]", "", content)
-        content = re.sub(r"\\\[[a-zA-Z0-9]+\]", "", content)
-        content = re.sub(r"\[[a-zA-Z0-9]+\\\]", "", content)
-
-        # Remove empty brackets []
-        content = re.sub(r"\[\]", "", content)
+        return clean_search_text(content, compat=self.config.text_cleaner_compat)
 
-        # Remove standalone URLs (after link removal)
-        content = re.sub(r"https?://\S+", "", content)
-
-        # Remove underscore symbols used for italics (note: this removes ALL underscores)
-        content = content.replace("_", "")
-
-        # Whitespace cleanup
-        content = re.sub(r"[ \t]+", " ", content)  # collapse spaces/tabs
-        content = re.sub(r"\n[ \t]*\n[ \t]*(?:\n[ \t]*)+", "\n\n", content)  # 3+ newlines -> 2
-        content = content.strip()
-
-        return content
+    def _embed_question(self, question: str) -> DefaultReturnType[QueryEmbedding]:
+        """Embed a question once, for every step of the request that needs its vector"""
+        try:
+            return DefaultReturnType(data=self.query_embedder.embed(question))
+        except Exception as e:
+            console_log(f"Error embedding query: {str(e)}")
+            return DefaultReturnType(
+                error=ErrorResponseType(
+                    userMessage="Error embedding the question!",
+                    error=str(e),
+                    errorType="InternalServerErrorException",
+                    errorData={},
+                    trace=["query_service - _embed_question - except Exception"],
+                )
+            )
 
     def _initialize_pinecone(self):
         """Initialize Pinecone client and vector store"""
         try:
             self.pc = Pinecone(api_key=env.PINECONE_KEY)
             self.default_index = self.pc.Index(env.PINECONE_INDEX_NAME)
-            self.default_vector_store = PineconeVectorStore(index=self.default_index, embedding=self.embeddings)
 
             console_log("Pinecone query service initialized successfully")
             return DefaultReturnType(data=None)
@@ -137,70 +129,108 @@ class RAGQueryService:
 
     async def _search_documents(
         self,
-        query: str,
+        query: QueryEmbedding,
         max_results: int,
         vector_db_name: Optional[str] = None,
         source_name: Optional[List[str]] = None,
+        tenant_id: Optional[str] = None,
     ) -> DefaultReturnType[List[SearchResultType]]:
-        """Search for relevant documents in the vector database"""
+        """Search for relevant documents in the vector database with the query's embedding.
+
+        In the default index, user-scoped sources are searched in their tenant's namespace. Without
+        source names, the namespace of tenant_id (the default namespace without one) is searched.
+        """
         try:
-            # Select vector store based on specified database name
-            if vector_db_name and vector_db_name != env.PINECONE_INDEX_NAME:
-                # Use specified index
-                index = self.pc.Index(vector_db_name)
-                vector_store = PineconeVectorStore(index=index, embedding=self.embeddings)
+            # Select index based on specified database name
+            is_default_index = not vector_db_name or vector_db_name == env.PINECONE_INDEX_NAME
+            if not is_default_index:
+                # Use specified index, resolving its host without blocking the event loop
+                index = await self.search_executor.run(self.pc.Index, vector_db_name)
                 console_log(f"Searching in external vector database: {vector_db_name}")
             else:
-                # Use default vector store
-                vector_store = self.default_vector_store
+                # Use default index
+                index = self.default_index
                 console_log(f"Searching in default vector database: {env.PINECONE_INDEX_NAME}")
 
             # Get more results initially if MMR is enabled to have a better selection pool
-            search_k = max_results * 2 if self.config.use_mmr else max_results
+            use_mmr = self.config.use_mmr
+            search_k = max_results * 2 if use_mmr else max_results
 
-            # Perform similarity search with optional source filtering
+            # Sources of different tenants live in different namespaces, which are searched separately
             if source_name and len(source_name) > 0:
-                # Use Pinecone's filter functionality to search only within the specified sources
-                if len(source_name) == 1:
+                searches = group_by_namespace(source_name) if is_default_index else {DEFAULT_NAMESPACE: source_name}
+            else:
+                searches = {tenant_namespace(tenant_id) if is_default_index else DEFAULT_NAMESPACE: None}
+
+            namespace_searches = []
+            for namespace, source_names in searches.items():
+                # Perform similarity search with optional source filtering
+                if source_names is None:
+                    # Search all sources of the namespace
+                    search_filter = None
+                    console_log(f"Searching all sources in namespace: {namespace or 'default'}")
+                elif len(source_names) == 1:
                     # Single source filter
-                    docs = vector_store.similarity_search_with_score(
-                        query=query, k=search_k, filter={"source_name": source_name[0]}
-                    )
-                    console_log(f"Searching with single source filter: {source_name[0]}")
+                    search_filter = {"source_name": source_names[0]}
+                    console_log(f"Searching with single source filter: {source_names[0]}")
                 else:
                     # Multiple sources filter using $in operator
-                    docs = vector_store.similarity_search_with_score(
-                        query=query, k=search_k, filter={"source_name": {"$in": source_name}}
+                    search_filter = {"source_name": {"$in": source_names}}
+                    console_log(f"Searching with multiple source filters: {source_names}")
+                # MMR needs the candidates' stored vectors, which come back with the matches
+                namespace_searches.append(
+                    self.search_executor.run(
+                        index.query,
+                        vector=query.values,
+                        top_k=search_k,
+                        filter=search_filter,
+                        namespace=namespace,
+                        include_metadata=True,
+                        include_values=use_mmr,
                     )
-                    console_log(f"Searching with multiple source filters: {source_name}")
-            else:
-                # Search all sources
-                docs = vector_store.similarity_search_with_score(query=query, k=search_k)
-                console_log("Searching all sources")
+                )
+
+            # Pinecone queries block, so they run on the search executor, the namespaces concurrently
+            responses: List[Any] = await asyncio.gather(*namespace_searches)
+            matches = [match for response in responses for match in response.matches or []]
+            if len(searches) > 1:
+                matches = sorted(matches, key=lambda match: match.score, reverse=True)[:search_k]
 
             # Apply MMR if enabled
-            if self.config.use_mmr and len(docs) > max_results:
+            if use_mmr and len(matches) > max_results:
                 console_log(f"Applying MMR with lambda={self.config.mmr_lambda}")
-                # Get query embedding
-                query_embedding = self.embeddings.embed_query(query)
-                # Apply MMR to rerank and select diverse results
-                docs = self._apply_mmr(query_embedding, docs, max_results, self.config.mmr_lambda)
+                selected = mmr_select(
+                    query.vector, [match.values for match in matches], max_results, self.config.mmr_lambda
+                )
+                matches = [matches[index] for index in selected]
 
             results = []
-            for doc, score in docs[:max_results]:  # Ensure we only return max_results
+            for match in matches[:max_results]:  # Ensure we only return max_results
+                metadata = dict(match.metadata or {})
                 # Clean the content before adding to results
-                cleaned_content = self._clean_text_content(doc.page_content)
+                cleaned_content = self._clean_text_content(str(metadata.pop(TEXT_METADATA_KEY, "")))
                 results.append(
                     SearchResultType(
                         content=cleaned_content,
-                        score=float(score),
-                        metadata=doc.metadata,
-                        source=doc.metadata.get("source_name", "unknown"),
+                        score=float(match.score),
+                        metadata=metadata,
+                        source=metadata.get("source_name", "unknown"),
                     )
                 )
 
             return DefaultReturnType(data=results)
 
+        except VectorSearchTimeoutError as e:
+            console_log(f"Error searching documents: {str(e)}")
+            return DefaultReturnType(
+                error=ErrorResponseType(
+                    userMessage="Searching documents took too long, please try again!",
+                    error=str(e),
+                    errorType="InternalServerErrorException",
+                    errorData={},
+                    trace=["query_service - _search_documents - except VectorSearchTimeoutError"],
+                )
+            )
         except Exception as e:
             console_log(f"Error searching documents: {str(e)}")
             return DefaultReturnType(
@@ -274,105 +304,45 @@ class RAGQueryService:
             sources.append(source_data)
         return DefaultReturnType(data=sources)
 
-    def _cosine_similarity(self, vec1: np.ndarray, vec2: np.ndarray) -> float:
-        """Calculate cosine similarity between two vectors"""
-        dot_product = np.dot(vec1, vec2)
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
-        return dot_product / (norm1 * norm2)
-
-    def _apply_mmr(
-        self, query_embedding: List[float], docs_with_scores: List[Tuple[Any, float]], k: int, lambda_mult: float = 0.5
-    ) -> List[Tuple[Any, float]]:
-        """
-        Apply Maximum Marginal Relevance (MMR) to rerank documents for diversity.
-
-        Args:
-            query_embedding: The embedding of the query
-            docs_with_scores: List of (document, score) tuples from initial search
-            k: Number of documents to return
-            lambda_mult: Balance between relevance and diversity (0=max diversity, 1=max relevance)
-
-        Returns:
-            Reranked list of (document, score) tuples
-        """
-        if len(docs_with_scores) <= k:
-            return docs_with_scores
-
-        # Extract embeddings from documents
-        doc_embeddings = []
-        for doc, _ in docs_with_scores:
-            # Get embedding from document metadata if available
-            if hasattr(doc, "metadata") and "embedding" in doc.metadata:
-                doc_embeddings.append(doc.metadata["embedding"])
-            else:
-                # If embedding not in metadata, we'll need to generate it
-                # For now, we'll use the content to generate embedding
-                embedding = self.embeddings.embed_query(doc.page_content)
-                doc_embeddings.append(embedding)
-
-        # Convert to numpy arrays
-        query_embedding_np = np.array(query_embedding)
-        doc_embeddings_np = np.array(doc_embeddings)
-
-        # Calculate similarity between query and all documents
-        query_sim = np.array([self._cosine_similarity(query_embedding_np, doc_emb) for doc_emb in doc_embeddings_np])
-
-        # MMR algorithm
-        selected_indices = []
-        selected_docs = []
-
-        # Select first document (highest relevance to query)
-        first_idx = np.argmax(query_sim)
-        selected_indices.append(first_idx)
-        selected_docs.append(docs_with_scores[first_idx])
-
-        # Select remaining documents
-        while len(selected_indices) < k and len(selected_indices) < len(docs_with_scores):
-            remaining_indices = [i for i in range(len(docs_with_scores)) if i not in selected_indices]
-
-            if not remaining_indices:
-                break
-
-            # Calculate MMR score for each remaining document
-            mmr_scores = []
-            for idx in remaining_indices:
-                # Relevance to query
-                relevance = query_sim[idx]
-
-                # Maximum similarity to already selected documents
-                if selected_indices:
-                    selected_embeddings = doc_embeddings_np[selected_indices]
-                    doc_embedding = doc_embeddings_np[idx]
-                    similarities = np.array(
-                        [self._cosine_similarity(doc_embedding, sel_emb) for sel_emb in selected_embeddings]
-                    )
-                    max_similarity = np.max(similarities)
-                else:
-                    max_similarity = 0
-
-                # MMR score
-                mmr_score = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
-                mmr_scores.append(mmr_score)
-
-            # Select document with highest MMR score
-            next_idx = remaining_indices[np.argmax(mmr_scores)]
-            selected_indices.append(next_idx)
-            selected_docs.append(docs_with_scores[next_idx])
-
-        return selected_docs
-
-    async def query(self, request: QueryRequestArgs) -> DefaultReturnType[QueryResponseType]:
-        """Process a RAG query and return response"""
+    async def query(
+        self, request: QueryRequestArgs, tenant_id: Optional[str] = None
+    ) -> DefaultReturnType[QueryResponseType]:
+        """Process a RAG query and return response, searching the namespace of tenant_id when no source is given"""
         try:
             console_log(f"Processing query: {request.question[:100]}...")
             console_log(f"Processing mode: {request.mode}")
 
+            # The question is embedded once and the vector reused by every step below. Embedding and the
+            # answer cache block on Redis, SQLite and the embedding API, so they run off the event loop
+            query_embedding = await asyncio.to_thread(self._embed_question, request.question)
+            if is_error(query_embedding.error):
+                return DefaultReturnType(
+                    error=carry_error(
+                        query_embedding.error,
+                        "query_service - query - if isError(query_embedding.error)",
+                    )
+                )
+
+            assert query_embedding.data is not None
+
+            # Answers of similar questions are reused while the searched sources are unchanged. Only the
+            # default index is cached, as changes to other indexes are not seen by the ingestion service
+            answer_scope = None
+            if self.answer_cache is not None and request.vector_db_name in (None, "", env.PINECONE_INDEX_NAME):
+                answer_scope = self.answer_cache.scope(request, tenant_id)
+                cached_answer = await asyncio.to_thread(
+                    self.answer_cache.lookup,
+                    answer_scope,
+                    query_embedding.data.vector,
+                    self.config.answer_cache_min_similarity,
+                )
+                if cached_answer is not None:
+                    cached_answer.cached = True
+                    return DefaultReturnType(data=cached_answer)
+
             # Search for relevant documents
             search_results = await self._search_documents(
-                request.question, request.max_results, request.vector_db_name, request.source_name
+                query_embedding.data, request.max_results, request.vector_db_name, request.source_name, tenant_id
             )
             print(f"Search results: {search_results}")
 
@@ -385,14 +355,17 @@ class RAGQueryService:
                 )
 
             if not search_results.data:
-                return DefaultReturnType(
-                    data=QueryResponseType(
-                        answer="I couldn't find any relevant documents to answer your question.",
-                        sources=[],
-                        mode_used=request.mode,
-                        confidence_score=0.0,
-                    )
+                no_documents_response = QueryResponseType(
+                    answer="I couldn't find any relevant documents to answer your question.",
+                    sources=[],
+                    mode_used=request.mode,
+                    confidence_score=0.0,
                 )
+                if answer_scope is not None and self.answer_cache is not None:
+                    await asyncio.to_thread(
+                        self.answer_cache.store, answer_scope, query_embedding.data.vector, no_documents_response
+                    )
+                return DefaultReturnType(data=no_documents_response)
 
             assert search_results.data is not None
 
@@ -471,11 +444,14 @@ class RAGQueryService:
             assert sources.data is not None
             console_log(f"Query processed successfully with confidence: {confidence.data:.3f}")
 
-            return DefaultReturnType(
-                data=QueryResponseType(
-                    answer=answer, sources=sources.data, mode_used=request.mode, confidence_score=confidence.data
-                )
+            query_response = QueryResponseType(
+                answer=answer, sources=sources.data, mode_used=request.mode, confidence_score=confidence.data
             )
+            if answer_scope is not None and self.answer_cache is not None:
+                await asyncio.to_thread(
+                    self.answer_cache.store, answer_scope, query_embedding.data.vector, query_response
+                )
+            return DefaultReturnType(data=query_response)
 
         except Exception as e:
             console_log(f"Error processing query: {str(e)}")
@@ -494,9 +470,22 @@ class RAGQueryService:
         max_results: int = 5,
         vector_db_name: Optional[str] = None,
         source_name: Optional[List[str]] = None,
+        tenant_id: Optional[str] = None,
     ) -> DefaultReturnType[List[SearchResultType]]:
         """Get similar documents without generating a response"""
-        search_results = await self._search_documents(query, max_results, vector_db_name, source_name)
+        query_embedding = await asyncio.to_thread(self._embed_question, query)
+        if is_error(query_embedding.error):
+            return DefaultReturnType(
+                error=carry_error(
+                    query_embedding.error,
+                    "query_service - get_similar_documents - if isError(query_embedding.error)",
+                )
+            )
+
+        assert query_embedding.data is not None
+        search_results = await self._search_documents(
+            query_embedding.data, max_results, vector_db_name, source_name, tenant_id
+        )
         if is_error(search_results.error):
             return DefaultReturnType(
                 error=carry_error(
@@ -512,7 +501,8 @@ class RAGQueryService:
         """Check the health of the query service"""
         try:
             # Test vector store connection
-            test_results = await self._search_documents("test", 1)
+            test_embedding = await asyncio.to_thread(self.query_embedder.embed, "test")
+            test_results = await self._search_documents(test_embedding, 1)
             if is_error(test_results.error):
                 return DefaultReturnType(
                     error=carry_error(
@@ -1,5 +1,9 @@
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, UploadFile, File, Form
-from typing import Optional, Dict, Any, List
+import json
+import shutil
+import tempfile
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, UploadFile, File, Form, Query, Request
+from starlette.concurrency import run_in_threadpool
+from typing import Optional, Dict, Any, List, Literal, Tuple
 
 from app.mongodb.user.user_type import GetUserArgs
 from app.shared.logger.logger import console_log
@@ -15,19 +19,39 @@ from app.rag.rag_types import (
     ExternalQueryRequestArgs,
     ExternalQueryResponseType,
     ExternalVectorDBConfigType,
+    IngestionJobType,
+    CrawlOptionsType,
+    BulkIngestRequestArgs,
+    BulkIngestResponseType,
+    RAGSourceType,
 )
+from app.rag.embedding_cache import get_embedding_cache
 from app.rag.ingestion_service import RAGIngestionService
+from app.rag.ingestion_job_service import IngestionJobQueue
 from app.rag.query_service import RAGQueryService
+from app.rag.document_processor import DocumentProcessor
+from app.rag.upload_spool import SpooledUpload, remove_spooled_upload, spool_stream, spool_upload
+from app.rag.bulk_upload import (
+    MANIFEST_FILE_NAME,
+    BulkFileType,
+    normalize_member_name,
+    parse_manifest,
+    resolve_bulk_documents,
+    unpack_archive,
+)
 from app.rag.external_query_service import ExternalVectorDBQueryService
 from app.shared.utils.error_util import ThrowErrorArgs, throw_error, is_error
 from app.mongodb.user.user_service import UserService
 
 router = APIRouter(prefix="/rag")
 
+SUPPORTED_FILE_TYPES = ["pdf", "docx", "doc", "pptx", "ppt", "json"]
+
 # Global service instances (in production, use dependency injection)
 _ingestion_service: Optional[RAGIngestionService] = None
 _query_service: Optional[RAGQueryService] = None
 _external_query_service: Optional[ExternalVectorDBQueryService] = None
+_ingestion_job_queue: Optional[IngestionJobQueue] = None
 
 
 def get_ingestion_service() -> RAGIngestionService:
@@ -54,6 +78,39 @@ def get_external_query_service() -> ExternalVectorDBQueryService:
     return _external_query_service
 
 
+def get_ingestion_job_queue() -> IngestionJobQueue:
+    """Get or create the background ingestion job queue"""
+    global _ingestion_job_queue
+    if _ingestion_job_queue is None:
+        # Resolve the service per job so reinitialized services are picked up
+        _ingestion_job_queue = IngestionJobQueue(service_factory=get_ingestion_service)
+    return _ingestion_job_queue
+
+
+async def _user_id(user_email: Optional[str]) -> Optional[str]:
+    """Id of the user with the email, None when no user email is provided"""
+    if not user_email:
+        return None
+
+    user_data = await UserService().get_user(GetUserArgs(email=user_email))
+    if is_error(user_data.error):
+        return throw_error(ThrowErrorArgs(error="User not found!", errorType=user_data.error.errorType))
+
+    assert user_data.data is not None
+    return user_data.data.id
+
+
+async def _source_scope(user_email: Optional[str]) -> str:
+    """Prefix of the source names of a user ("{user_id}::"), empty when no user email is provided"""
+    user_id = await _user_id(user_email)
+    return f"{user_id}::" if user_id else ""
+
+
+async def _scope_source_name(source_name: str, user_email: Optional[str]) -> str:
+    """Prefix the source name with the user id when a user email is provided"""
+    return f"{await _source_scope(user_email)}{source_name}"
+
+
 @router.post("/ingest", response_model=IngestResponseType)
 async def ingest_document(
     request: IngestRequestArgs,
@@ -80,19 +137,10 @@ async def ingest_document(
         if not request.source_name.strip():
             return throw_error(ThrowErrorArgs(error="Data cannot be empty!", errorType="BadRequestException"))
 
-        if request.user_email:
-            user_data = await UserService().get_user(GetUserArgs(email=request.user_email))
-            if is_error(user_data.error):
-                return throw_error(ThrowErrorArgs(error="User not found!", errorType=user_data.error.errorType))
-
-        assert user_data.data is not None
+        request.source_name = await _scope_source_name(request.source_name, request.user_email)
 
-        request.source_name = (
-            f"{user_data.data.id}::{request.source_name}" if request.user_email else request.source_name
-        )
-
-        # Process ingestion
-        result = ingestion_service.ingest_document(request)
+        # Process ingestion off the event loop
+        result = await run_in_threadpool(ingestion_service.ingest_document, request)
         if is_error(result.error):
             return throw_error(ThrowErrorArgs(error=result.error.error, errorType=result.error.errorType))
 
@@ -115,6 +163,12 @@ async def crawl_url(
     source_name: Optional[str] = None,
     metadata: Optional[Dict[str, Any]] = None,
     include_links: bool = False,
+    incremental: bool = False,
+    dry_run: bool = False,
+    limit: Optional[int] = None,
+    include_paths: Optional[List[str]] = Query(None),
+    exclude_paths: Optional[List[str]] = Query(None),
+    concurrency: Optional[int] = None,
     ingestion_service: RAGIngestionService = Depends(get_ingestion_service),
 ):
     """
@@ -124,6 +178,11 @@ async def crawl_url(
     - **source_name**: Optional name for the source (defaults to URL-based name)
     - **metadata**: Optional additional metadata to store with the document
     - **include_links**: Whether to include links in the scraped content (default: True)
+    - **incremental**: Only write changed chunks and delete removed ones (default: False)
+    - **dry_run**: Only crawl and chunk, and return an estimate of what would be embedded and stored
+    - **limit**: Maximum number of pages to crawl (default: config crawl_page_limit)
+    - **include_paths** / **exclude_paths**: Regex patterns of URL paths to crawl or skip (repeatable)
+    - **concurrency**: Pages crawled and processed in parallel (default: config crawl_concurrency)
     """
     try:
         console_log(f"Received URL crawl request for: {url}")
@@ -132,8 +191,19 @@ async def crawl_url(
         if not url.strip():
             return throw_error(ThrowErrorArgs(error="URL cannot be empty!", errorType="BadRequestException"))
 
-        # Process URL crawling
-        result = ingestion_service.crawl_url(url, source_name, metadata, include_links)
+        crawl_options = _crawl_options(limit, include_paths, exclude_paths, concurrency)
+
+        # Process URL crawling off the event loop
+        result = await run_in_threadpool(
+            ingestion_service.crawl_url,
+            url,
+            source_name,
+            metadata,
+            include_links,
+            incremental=incremental,
+            crawl_options=crawl_options,
+            dry_run=dry_run,
+        )
         if is_error(result.error):
             return throw_error(ThrowErrorArgs(error=result.error.error, errorType=result.error.errorType))
 
@@ -204,6 +274,82 @@ async def debug_base64(
         return {"success": False, "message": f"Debug endpoint error: {str(e)}", "error": str(e)}
 
 
+def _get_supported_file_extension(filename: str) -> str:
+    """Get the lower-cased extension of an uploaded file, rejecting unsupported types"""
+    file_extension = filename.split(".")[-1].lower()
+
+    if file_extension not in SUPPORTED_FILE_TYPES:
+        return throw_error(
+            ThrowErrorArgs(
+                error=f"Unsupported file type: {file_extension}. Supported types: {', '.join(SUPPORTED_FILE_TYPES)}",
+                errorType="BadRequestException",
+            )
+        )
+
+    return file_extension
+
+
+async def _spool_binary_body(
+    http_request: Request,
+    encoding: Literal["binary", "base64"],
+    declared_type: Optional[str],
+    directory: Optional[str] = None,
+) -> Tuple[SpooledUpload, str]:
+    """Stream a raw request body to disk and detect its format from the magic bytes"""
+    try:
+        upload = await spool_stream(http_request.stream(), directory=directory, decode_base64=encoding == "base64")
+    except ValueError as error:
+        return throw_error(ThrowErrorArgs(error=str(error), errorType="BadRequestException"))
+
+    file_type = None
+    if upload.size:
+        file_type = await run_in_threadpool(DocumentProcessor.detect_file_type, upload.path, declared_type)
+    if file_type is None:
+        remove_spooled_upload(upload.path)
+        return throw_error(
+            ThrowErrorArgs(
+                error=f"Unsupported or empty body. Supported types: {', '.join(SUPPORTED_FILE_TYPES)}, text",
+                errorType="BadRequestException",
+            )
+        )
+
+    return upload, file_type
+
+
+def _crawl_options(
+    limit: Optional[int],
+    include_paths: Optional[List[str]],
+    exclude_paths: Optional[List[str]],
+    concurrency: Optional[int],
+) -> CrawlOptionsType:
+    """Validate the crawl query parameters"""
+    try:
+        return CrawlOptionsType(
+            limit=limit, include_paths=include_paths, exclude_paths=exclude_paths, concurrency=concurrency
+        )
+    except ValueError as error:
+        return throw_error(ThrowErrorArgs(error=str(error), errorType="BadRequestException"))
+
+
+def _parse_metadata_json(metadata: Optional[str]) -> Dict[str, Any]:
+    """Parse the metadata form field, which is sent as a JSON string"""
+    if not metadata:
+        return {}
+
+    try:
+        return json.loads(metadata)
+    except json.JSONDecodeError:
+        return throw_error(ThrowErrorArgs(error="Invalid metadata JSON format!", errorType="BadRequestException"))
+
+
+def _file_ingest_request(**fields: Any) -> FileIngestRequestArgs:
+    """Validate the ingestion parameters of an upload before the upload is spooled"""
+    try:
+        return FileIngestRequestArgs(**fields)
+    except ValueError as error:
+        return throw_error(ThrowErrorArgs(error=str(error), errorType="BadRequestException"))
+
+
 @router.post("/ingest-file", response_model=IngestResponseType)
 async def ingest_file(
     file: UploadFile = File(...),
@@ -211,6 +357,8 @@ async def ingest_file(
     metadata: Optional[str] = Form(None),
     chunk_size: int = Form(400),
     chunk_overlap: int = Form(60),
+    incremental: bool = Form(False),
+    dry_run: bool = Form(False),
     user_email: Optional[str] = Form(None),
     ingestion_service: RAGIngestionService = Depends(get_ingestion_service),
 ):
@@ -222,6 +370,8 @@ async def ingest_file(
     - **metadata**: Additional metadata as JSON string (optional)
     - **chunk_size**: Size of text chunks in tokens (default: 400)
     - **chunk_overlap**: Overlap between chunks in tokens (default: 60)
+    - **incremental**: Only write changed chunks and delete removed ones (default: false)
+    - **dry_run**: Only extract and chunk, and return an estimate of what would be embedded and stored
     - **user_email**: User email to get the user id from the DB (optional)
     """
     try:
@@ -232,52 +382,33 @@ async def ingest_file(
             return throw_error(ThrowErrorArgs(error="File name cannot be empty!", errorType="BadRequestException"))
 
         # Determine file type from extension
-        file_extension = file.filename.split(".")[-1].lower()
-        supported_types = ["pdf", "docx", "doc", "pptx", "ppt", "json"]
-
-        if file_extension not in supported_types:
-            return throw_error(
-                ThrowErrorArgs(
-                    error=f"Unsupported file type: {file_extension}. Supported types: {', '.join(supported_types)}",
-                    errorType="BadRequestException",
-                )
-            )
+        file_extension = _get_supported_file_extension(file.filename)
 
         # Parse metadata if provided
-        parsed_metadata = {}
-        if metadata:
-            try:
-                import json
-
-                parsed_metadata = json.loads(metadata)
-            except json.JSONDecodeError:
-                return throw_error(
-                    ThrowErrorArgs(error="Invalid metadata JSON format!", errorType="BadRequestException")
-                )
+        parsed_metadata = _parse_metadata_json(metadata)
 
         # Handle user email if provided
-        if user_email:
-            user_data = await UserService().get_user(GetUserArgs(email=user_email))
-            if is_error(user_data.error):
-                return throw_error(ThrowErrorArgs(error="User not found!", errorType=user_data.error.errorType))
+        source_name = await _scope_source_name(source_name, user_email)
 
-            assert user_data.data is not None
-            source_name = f"{user_data.data.id}::{source_name}"
-
-        # Read file data
-        file_data = await file.read()
-
-        # Create request object
-        request = FileIngestRequestArgs(
+        # Create request object, rejecting invalid chunking parameters before anything is uploaded
+        request = _file_ingest_request(
             source_name=source_name,
             metadata=parsed_metadata,
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
+            incremental=incremental,
+            dry_run=dry_run,
             user_email=user_email,
         )
 
-        # Process file ingestion
-        result = ingestion_service.ingest_file(file_data, file_extension, request)
+        # Stream the upload to disk; extractors open the spooled file in place
+        upload = await spool_upload(file, suffix=f".{file_extension}")
+        try:
+            request.content_sha256 = upload.sha256
+            # Process file ingestion off the event loop
+            result = await run_in_threadpool(ingestion_service.ingest_file, upload.path, file_extension, request)
+        finally:
+            remove_spooled_upload(upload.path)
         if is_error(result.error):
             return throw_error(ThrowErrorArgs(error=result.error.error, errorType=result.error.errorType))
 
@@ -286,6 +417,8 @@ async def ingest_file(
         console_log(f"File ingestion completed successfully: {result.data.chunks_created} chunks created")
         return result.data
 
+    except HTTPException as error:
+        raise error
     except Exception as e:
         console_log(f"Error in file ingestion endpoint: {str(e)}")
         return throw_error(
@@ -293,6 +426,418 @@ async def ingest_file(
         )
 
 
+@router.post("/ingest-binary", response_model=IngestResponseType)
+async def ingest_binary(
+    http_request: Request,
+    source_name: str,
+    file_type: Optional[str] = None,
+    encoding: Literal["binary", "base64"] = "binary",
+    metadata: Optional[str] = None,
+    chunk_size: int = 400,
+    chunk_overlap: int = 60,
+    incremental: bool = False,
+    dry_run: bool = False,
+    user_email: Optional[str] = None,
+    ingestion_service: RAGIngestionService = Depends(get_ingestion_service),
+):
+    """
+    Ingest a file sent as the raw request body (`application/octet-stream`).
+
+    The body is streamed to disk and never held in memory, and the format is detected from its magic bytes.
+
+    - **source_name**: Unique identifier for this document
+    - **file_type**: Declared type (optional). Only used to tell DOC and PPT apart
+    - **encoding**: `binary` (default) or `base64` for a base64 body, decoded while it is received
+    - **metadata**: Additional metadata as JSON string (optional)
+    - **chunk_size**: Size of text chunks in tokens (default: 400)
+    - **chunk_overlap**: Overlap between chunks in tokens (default: 60)
+    - **incremental**: Only write changed chunks and delete removed ones (default: false)
+    - **dry_run**: Only extract and chunk, and return an estimate of what would be embedded and stored
+    - **user_email**: User email to get the user id from the DB (optional)
+    """
+    try:
+        console_log(f"Received binary ingestion request for source: {source_name}")
+
+        parsed_metadata = _parse_metadata_json(metadata)
+        source_name = await _scope_source_name(source_name, user_email)
+
+        request = _file_ingest_request(
+            source_name=source_name,
+            metadata=parsed_metadata,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            incremental=incremental,
+            dry_run=dry_run,
+            user_email=user_email,
+        )
+
+        upload, detected_type = await _spool_binary_body(http_request, encoding, file_type)
+        try:
+            request.content_sha256 = upload.sha256
+            result = await run_in_threadpool(ingestion_service.ingest_file, upload.path, detected_type, request)
+        finally:
+            remove_spooled_upload(upload.path)
+
+        if is_error(result.error):
+            return throw_error(ThrowErrorArgs(error=result.error.error, errorType=result.error.errorType))
+
+        assert result.data is not None
+
+        console_log(f"Binary ingestion completed successfully: {result.data.chunks_created} chunks created")
+        return result.data
+
+    except HTTPException as error:
+        raise error
+    except Exception as e:
+        console_log(f"Error in binary ingestion endpoint: {str(e)}")
+        return throw_error(
+            ThrowErrorArgs(error=f"Internal server error: {str(e)}", errorType="InternalServerErrorException")
+        )
+
+
+@router.post("/ingest-bulk", response_model=BulkIngestResponseType)
+async def ingest_bulk(
+    archive: Optional[UploadFile] = File(None),
+    files: Optional[List[UploadFile]] = File(None),
+    manifest: Optional[str] = Form(None),
+    source_prefix: str = Form(""),
+    metadata: Optional[str] = Form(None),
+    chunk_size: int = Form(400),
+    chunk_overlap: int = Form(60),
+    incremental: bool = Form(False),
+    dry_run: bool = Form(False),
+    user_email: Optional[str] = Form(None),
+    ingestion_service: RAGIngestionService = Depends(get_ingestion_service),
+):
+    """
+    Ingest many documents in one request and return a result per document.
+
+    Documents are extracted concurrently and their chunks are embedded and upserted in shared batches.
+
+    - **archive**: zip or tar(.gz) archive of documents (optional)
+    - **files**: uploaded documents (optional, repeatable)
+    - **manifest**: JSON list of {path, source_name, metadata} selecting the documents to ingest (optional).
+      Defaults to a manifest.json at the root of the archive, or else every file
+    - **source_prefix**: Prefix of the source names derived from file paths (default: none)
+    - **metadata**: Metadata of every document as JSON string (optional)
+    - **chunk_size**: Size of text chunks in tokens (default: 400)
+    - **chunk_overlap**: Overlap between chunks in tokens (default: 60)
+    - **incremental**: Only write changed chunks and delete removed ones, per document (default: false)
+    - **dry_run**: Only extract and chunk, and return an estimate of what would be embedded and stored
+    - **user_email**: User email to get the user id from the DB (optional)
+    """
+    work_dir = None
+    try:
+        if archive is None and not files:
+            return throw_error(
+                ThrowErrorArgs(error="Upload an archive or at least one file!", errorType="BadRequestException")
+            )
+
+        try:
+            request = BulkIngestRequestArgs(
+                source_prefix=source_prefix,
+                metadata=_parse_metadata_json(metadata),
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                incremental=incremental,
+                dry_run=dry_run,
+                user_email=user_email,
+            )
+            manifest_entries = parse_manifest(manifest) if manifest else None
+        except ValueError as error:
+            return throw_error(ThrowErrorArgs(error=str(error), errorType="BadRequestException"))
+
+        # The user is looked up once for the whole batch
+        source_scope = await _source_scope(user_email)
+
+        work_dir = tempfile.mkdtemp(prefix="rag-bulk-")
+        bulk_files: List[BulkFileType] = []
+        if archive is not None:
+            upload = await spool_upload(archive, directory=work_dir)
+            try:
+                bulk_files.extend(await run_in_threadpool(unpack_archive, upload.path, work_dir))
+            except ValueError as error:
+                return throw_error(ThrowErrorArgs(error=str(error), errorType="BadRequestException"))
+            finally:
+                remove_spooled_upload(upload.path)
+        for file in files or []:
+            upload = await spool_upload(file, directory=work_dir)
+            name = normalize_member_name(file.filename or upload.path)
+            bulk_files.append(BulkFileType(name=name, path=upload.path, size=upload.size, sha256=upload.sha256))
+
+        if manifest_entries is None:
+            manifest_file = next((file for file in bulk_files if file.name == MANIFEST_FILE_NAME), None)
+            if manifest_file is not None:
+                try:
+                    with open(manifest_file.path, "rb") as manifest_data:
+                        manifest_entries = parse_manifest(manifest_data.read())
+                except ValueError as error:
+                    return throw_error(ThrowErrorArgs(error=str(error), errorType="BadRequestException"))
+
+        documents, rejected = await run_in_threadpool(
+            resolve_bulk_documents, bulk_files, manifest_entries, request, source_scope
+        )
+        console_log(f"Received bulk ingestion request: {len(documents)} documents, {len(rejected)} rejected")
+
+        result = await run_in_threadpool(ingestion_service.ingest_bulk, documents, request, rejected)
+        if is_error(result.error):
+            return throw_error(ThrowErrorArgs(error=result.error.error, errorType=result.error.errorType))
+
+        assert result.data is not None
+        return result.data
+
+    except HTTPException as error:
+        raise error
+    except Exception as e:
+        console_log(f"Error in bulk ingestion endpoint: {str(e)}")
+        return throw_error(
+            ThrowErrorArgs(error=f"Internal server error: {str(e)}", errorType="InternalServerErrorException")
+        )
+    finally:
+        if work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+# Background Ingestion Job Endpoints
+@router.post("/jobs/ingest", response_model=IngestionJobType)
+async def queue_ingest_document(
+    request: IngestRequestArgs,
+    job_queue: IngestionJobQueue = Depends(get_ingestion_job_queue),
+):
+    """
+    Queue a document for background ingestion and return the job immediately.
+
+    Accepts the same body as **/rag/ingest**. Poll **/rag/jobs/{job_id}** for progress.
+    """
+    try:
+        console_log(f"Received ingestion job request for source: {request.source_name}")
+
+        if not request.data.strip():
+            return throw_error(ThrowErrorArgs(error="Data cannot be empty!", errorType="BadRequestException"))
+
+        if not request.source_name.strip():
+            return throw_error(ThrowErrorArgs(error="Source name cannot be empty!", errorType="BadRequestException"))
+
+        request.source_name = await _scope_source_name(request.source_name, request.user_email)
+
+        job = await run_in_threadpool(job_queue.enqueue_ingest, request)
+        if is_error(job.error):
+            return throw_error(ThrowErrorArgs(error=job.error.error, errorType=job.error.errorType))
+
+        assert job.data is not None
+        return job.data
+
+    except HTTPException as error:
+        raise error
+    except Exception:
+        return throw_error(
+            ThrowErrorArgs(error="Unexpected error queueing ingestion job", errorType="InternalServerErrorException")
+        )
+
+
+@router.post("/jobs/ingest-file", response_model=IngestionJobType)
+async def queue_ingest_file(
+    file: UploadFile = File(...),
+    source_name: str = Form(...),
+    metadata: Optional[str] = Form(None),
+    chunk_size: int = Form(400),
+    chunk_overlap: int = Form(60),
+    incremental: bool = Form(False),
+    dry_run: bool = Form(False),
+    user_email: Optional[str] = Form(None),
+    job_queue: IngestionJobQueue = Depends(get_ingestion_job_queue),
+):
+    """
+    Queue an uploaded file for background ingestion and return the job immediately.
+
+    Accepts the same form fields as **/rag/ingest-file**. Poll **/rag/jobs/{job_id}** for progress.
+    """
+    try:
+        console_log(f"Received file ingestion job request for source: {source_name}")
+
+        if not file.filename:
+            return throw_error(ThrowErrorArgs(error="File name cannot be empty!", errorType="BadRequestException"))
+
+        file_extension = _get_supported_file_extension(file.filename)
+        parsed_metadata = _parse_metadata_json(metadata)
+        source_name = await _scope_source_name(source_name, user_email)
+
+        request = _file_ingest_request(
+            source_name=source_name,
+            metadata=parsed_metadata,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            incremental=incremental,
+            dry_run=dry_run,
+            user_email=user_email,
+        )
+
+        # Spool next to the job files so handing the upload to the job is a rename
+        upload = await spool_upload(file, suffix=f".{file_extension}", directory=job_queue.spool_dir)
+        try:
+            request.content_sha256 = upload.sha256
+            job = await run_in_threadpool(job_queue.enqueue_ingest_file, upload.path, file_extension, request)
+        finally:
+            # Only left behind if the job could not be queued
+            remove_spooled_upload(upload.path)
+        if is_error(job.error):
+            return throw_error(ThrowErrorArgs(error=job.error.error, errorType=job.error.errorType))
+
+        assert job.data is not None
+        return job.data
+
+    except HTTPException as error:
+        raise error
+    except Exception:
+        return throw_error(
+            ThrowErrorArgs(
+                error="Unexpected error queueing file ingestion job", errorType="InternalServerErrorException"
+            )
+        )
+
+
+@router.post("/jobs/ingest-binary", response_model=IngestionJobType)
+async def queue_ingest_binary(
+    http_request: Request,
+    source_name: str,
+    file_type: Optional[str] = None,
+    encoding: Literal["binary", "base64"] = "binary",
+    metadata: Optional[str] = None,
+    chunk_size: int = 400,
+    chunk_overlap: int = 60,
+    incremental: bool = False,
+    dry_run: bool = False,
+    user_email: Optional[str] = None,
+    job_queue: IngestionJobQueue = Depends(get_ingestion_job_queue),
+):
+    """
+    Queue a raw request body for background ingestion and return the job immediately.
+
+    Accepts the same parameters as **/rag/ingest-binary**. Poll **/rag/jobs/{job_id}** for progress.
+    """
+    try:
+        console_log(f"Received binary ingestion job request for source: {source_name}")
+
+        parsed_metadata = _parse_metadata_json(metadata)
+        source_name = await _scope_source_name(source_name, user_email)
+
+        request = _file_ingest_request(
+            source_name=source_name,
+            metadata=parsed_metadata,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            incremental=incremental,
+            dry_run=dry_run,
+            user_email=user_email,
+        )
+
+        upload, detected_type = await _spool_binary_body(
+            http_request, encoding, file_type, directory=job_queue.spool_dir
+        )
+        try:
+            request.content_sha256 = upload.sha256
+            job = await run_in_threadpool(job_queue.enqueue_ingest_file, upload.path, detected_type, request)
+        finally:
+            # Only left behind if the job could not be queued
+            remove_spooled_upload(upload.path)
+
+        if is_error(job.error):
+            return throw_error(ThrowErrorArgs(error=job.error.error, errorType=job.error.errorType))
+
+        assert job.data is not None
+        return job.data
+
+    except HTTPException as error:
+        raise error
+    except Exception:
+        return throw_error(
+            ThrowErrorArgs(
+                error="Unexpected error queueing binary ingestion job", errorType="InternalServerErrorException"
+            )
+        )
+
+
+@router.post("/jobs/crawl-url", response_model=IngestionJobType)
+async def queue_crawl_url(
+    url: str,
+    source_name: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    include_links: bool = False,
+    incremental: bool = False,
+    dry_run: bool = False,
+    limit: Optional[int] = None,
+    include_paths: Optional[List[str]] = Query(None),
+    exclude_paths: Optional[List[str]] = Query(None),
+    concurrency: Optional[int] = None,
+    job_queue: IngestionJobQueue = Depends(get_ingestion_job_queue),
+):
+    """
+    Queue a URL crawl for background ingestion and return the job immediately.
+
+    Accepts the same parameters as **/rag/crawl-url**. Poll **/rag/jobs/{job_id}** for progress.
+    """
+    try:
+        console_log(f"Received URL crawl job request for: {url}")
+
+        if not url.strip():
+            return throw_error(ThrowErrorArgs(error="URL cannot be empty!", errorType="BadRequestException"))
+
+        crawl_options = _crawl_options(limit, include_paths, exclude_paths, concurrency)
+        job = await run_in_threadpool(
+            job_queue.enqueue_crawl_url,
+            url,
+            source_name,
+            metadata,
+            include_links,
+            incremental,
+            crawl_options,
+            dry_run=dry_run,
+        )
+        if is_error(job.error):
+            return throw_error(ThrowErrorArgs(error=job.error.error, errorType=job.error.errorType))
+
+        assert job.data is not None
+        return job.data
+
+    except HTTPException as error:
+        raise error
+    except Exception:
+        return throw_error(
+            ThrowErrorArgs(error="Unexpected error queueing URL crawl job", errorType="InternalServerErrorException")
+        )
+
+
+@router.get("/jobs/{job_id}", response_model=IngestionJobType)
+async def get_ingestion_job(job_id: str, job_queue: IngestionJobQueue = Depends(get_ingestion_job_queue)):
+    """
+    Get the status, current stage and result of a background ingestion job.
+
+    - **job_id**: Id returned when the job was queued
+    """
+    job = await run_in_threadpool(job_queue.get_job, job_id)
+    if is_error(job.error):
+        return throw_error(ThrowErrorArgs(error=job.error.error, errorType=job.error.errorType))
+
+    assert job.data is not None
+    return job.data
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=IngestionJobType)
+async def cancel_ingestion_job(job_id: str, job_queue: IngestionJobQueue = Depends(get_ingestion_job_queue)):
+    """
+    Cancel a background ingestion job. Queued jobs are cancelled immediately,
+    running jobs stop at their next stage boundary.
+
+    - **job_id**: Id returned when the job was queued
+    """
+    job = await run_in_threadpool(job_queue.cancel_job, job_id)
+    if is_error(job.error):
+        return throw_error(ThrowErrorArgs(error=job.error.error, errorType=job.error.errorType))
+
+    assert job.data is not None
+    return job.data
+
+
 @router.post("/query", response_model=QueryResponseType)
 async def query_rag(request: QueryRequestArgs, query_service: RAGQueryService = Depends(get_query_service)):
     """
@@ -314,7 +859,7 @@ async def query_rag(request: QueryRequestArgs, query_service: RAGQueryService =
             return throw_error(ThrowErrorArgs(error="Question cannot be empty!", errorType="BadRequestException"))
 
         # Process query
-        result = await query_service.query(request)
+        result = await query_service.query(request, await _user_id(request.user_email))
         if is_error(result.error):
             return throw_error(ThrowErrorArgs(error=result.error.error, errorType=result.error.errorType))
 
@@ -323,8 +868,8 @@ async def query_rag(request: QueryRequestArgs, query_service: RAGQueryService =
         console_log(f"Query processed successfully with confidence: {result.data.confidence_score}")
         return result.data
 
-    except HTTPException:
-        return throw_error(ThrowErrorArgs(error="Error during query!", errorType="InternalServerErrorException"))
+    except HTTPException as error:
+        raise error
     except Exception as e:
         return throw_error(
             ThrowErrorArgs(error="Unexpected error during query", errorType="InternalServerErrorException")
@@ -337,6 +882,7 @@ async def search_documents(
     max_results: int = 5,
     vector_db_name: Optional[str] = None,
     source_name: Optional[List[str]] = None,
+    user_email: Optional[str] = None,
     query_service: RAGQueryService = Depends(get_query_service),
 ):
     """
@@ -346,6 +892,7 @@ async def search_documents(
     - **max_results**: Maximum number of results to return (default: 5)
     - **vector_db_name**: Optional vector database name to search in
     - **source_name**: Optional list of source names to filter results by
+    - **user_email**: Without source names, searches only the sources of this user
     """
     try:
         if not query.strip():
@@ -356,7 +903,9 @@ async def search_documents(
                 ThrowErrorArgs(error="max_results must be between 1 and 20!", errorType="BadRequestException")
             )
 
-        results = await query_service.get_similar_documents(query, max_results, vector_db_name, source_name)
+        results = await query_service.get_similar_documents(
+            query, max_results, vector_db_name, source_name, await _user_id(user_email)
+        )
         if is_error(results.error):
             return throw_error(ThrowErrorArgs(error=results.error.error, errorType=results.error.errorType))
 
@@ -378,10 +927,8 @@ async def search_documents(
             "total_results": len(results.data),
         }
 
-    except HTTPException:
-        return throw_error(
-            ThrowErrorArgs(error="Error during document search!", errorType="InternalServerErrorException")
-        )
+    except HTTPException as error:
+        raise error
     except Exception:
         return throw_error(
             ThrowErrorArgs(error="Unexpected error during document search", errorType="InternalServerErrorException")
@@ -401,7 +948,7 @@ async def re_ingest_document_with_cleaning(
         if not source_name.strip():
             return throw_error(ThrowErrorArgs(error="Source name cannot be empty!", errorType="BadRequestException"))
 
-        result = ingestion_service.re_ingest_document_with_cleaning(source_name)
+        result = await run_in_threadpool(ingestion_service.re_ingest_document_with_cleaning, source_name)
         if is_error(result.error):
             return throw_error(ThrowErrorArgs(error=result.error.error, errorType=result.error.errorType))
 
@@ -431,7 +978,7 @@ async def delete_document(source_name: str, ingestion_service: RAGIngestionServi
         if not source_name.strip():
             return throw_error(ThrowErrorArgs(error="Source name cannot be empty!", errorType="BadRequestException"))
 
-        success = ingestion_service.delete_document(source_name)
+        success = await run_in_threadpool(ingestion_service.delete_document, source_name)
         if is_error(success.error):
             return throw_error(ThrowErrorArgs(error=success.error.error, errorType=success.error.errorType))
 
@@ -466,7 +1013,7 @@ async def get_stats(
     - **source_name**: Optional specific source name to get stats for
     """
     try:
-        stats = ingestion_service.get_document_stats(source_name)
+        stats = await run_in_threadpool(ingestion_service.get_document_stats, source_name)
         if is_error(stats.error):
             return throw_error(ThrowErrorArgs(error=stats.error.error, errorType=stats.error.errorType))
 
@@ -479,6 +1026,68 @@ async def get_stats(
         )
 
 
+@router.get("/sources", response_model=List[RAGSourceType])
+async def list_sources(
+    user_email: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    skip: int = Query(0, ge=0),
+    ingestion_service: RAGIngestionService = Depends(get_ingestion_service),
+):
+    """
+    List ingested sources with their status, chunk and token counts, most recently updated first.
+
+    - **user_email**: Lists the sources of this user; without it, sources ingested without a user are listed
+    - **limit** / **skip**: Pagination
+    """
+    try:
+        owner_id = await _user_id(user_email)
+        sources = await run_in_threadpool(ingestion_service.list_sources, owner_id, limit, skip)
+        if is_error(sources.error):
+            return throw_error(ThrowErrorArgs(error=sources.error.error, errorType=sources.error.errorType))
+
+        assert sources.data is not None
+        return sources.data
+
+    except HTTPException as error:
+        raise error
+    except Exception:
+        return throw_error(
+            ThrowErrorArgs(error="Unexpected error while listing sources", errorType="InternalServerErrorException")
+        )
+
+
+@router.get("/embedding-cache/stats")
+async def get_embedding_cache_stats():
+    """Get hit/miss counters of this worker's embedding cache"""
+    return get_embedding_cache().snapshot()
+
+
+@router.get("/query-embedding/stats")
+async def get_query_embedding_stats(query_service: RAGQueryService = Depends(get_query_service)):
+    """Get call count and latency of this worker's query embeddings, and hit/miss counters of their cache"""
+    return query_service.query_embedder.snapshot()
+
+
+@router.get("/answer-cache/stats")
+async def get_answer_cache_stats(query_service: RAGQueryService = Depends(get_query_service)):
+    """Get hit/miss and invalidation counters of this worker's answer cache"""
+    if query_service.answer_cache is None:
+        return {"enabled": False}
+    return query_service.answer_cache.snapshot()
+
+
+@router.get("/search-executor/stats")
+async def get_search_executor_stats(query_service: RAGQueryService = Depends(get_query_service)):
+    """Get queued and in-flight vector searches, timeouts and wait/run time percentiles of this worker"""
+    return query_service.search_executor.snapshot()
+
+
+@router.get("/upsert-writer/stats")
+async def get_upsert_writer_stats(ingestion_service: RAGIngestionService = Depends(get_ingestion_service)):
+    """Get queue depth, throughput and flush latency of this worker's upsert writer"""
+    return ingestion_service.upsert_writer.snapshot()
+
+
 @router.get("/health")
 async def health_check(query_service: RAGQueryService = Depends(get_query_service)):
     """Check the health of the RAG system"""
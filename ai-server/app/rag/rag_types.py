@@ -1,5 +1,5 @@
 from typing import List, Literal, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from fastapi import UploadFile
 
 
@@ -28,9 +28,42 @@ class RAGConfigType(BaseModel):
     crawl_full_website: bool = True  # Whether to crawl entire website by default
     use_mmr: bool = True  # Enable Maximum Marginal Relevance for diversity
     mmr_lambda: float = 0.5  # Balance between relevance and diversity (0=max diversity, 1=max relevance)
+    embedding_dimension: int = 1024  # Pinecone index dimension
+    native_embedding_dimensions: bool = True  # Ask text-embedding-3 models for embedding_dimension directly
+    embedding_batch_tokens: int = 50_000  # Token budget of a single embedding request
+    embedding_batch_items: int = 1024  # Maximum number of chunks in a single embedding request
+    embedding_max_in_flight: int = 4  # Maximum number of concurrent embedding requests
+    embedding_max_retries: int = 5  # Retries per failed embedding batch
+    use_embedding_cache: bool = True  # Reuse embeddings of unchanged text from the disk/Redis cache
+    use_query_embedding_cache: bool = True  # Reuse embeddings of repeated questions from the memory/Redis cache
+    use_answer_cache: bool = True  # Answer questions like recent ones from the cache while their sources are unchanged
+    answer_cache_min_similarity: float = 0.97  # Cosine similarity a question needs to a cached one to reuse its answer
+    text_cleaner_compat: bool = False  # Run every text cleaning pass, without skipping passes that cannot match
+    stream_batch_chunks: int = 256  # Chunks embedded and upserted together when a file is ingested page by page
+    streaming_crawl: bool = True  # Ingest crawled pages as they arrive instead of after the whole crawl
+    crawl_page_limit: int = 50  # Maximum number of pages of a full website crawl
+    crawl_include_paths: List[str] = []  # Regex patterns of URL paths to crawl (all when empty)
+    crawl_exclude_paths: List[str] = []  # Regex patterns of URL paths to skip
+    crawl_concurrency: int = 4  # Pages scraped by Firecrawl and cleaned/chunked by us in parallel
+    crawl_poll_interval_seconds: float = 2.0  # How often a streaming crawl asks Firecrawl for new pages
+    crawl_dedup: bool = True  # Strip cross-page boilerplate and drop near-duplicate chunks of full website crawls
+    boilerplate_min_pages: int = 5  # Pages a crawl must have seen before lines are recognised as boilerplate
+    boilerplate_page_share: float = 0.5  # Share of a crawl's pages a line must occur on to be boilerplate
+    near_duplicate_max_distance: int = 3  # SimHash bits (at most 3) two chunks may differ in to be near-duplicates
+    bulk_ingest_concurrency: int = 4  # Documents of a bulk ingestion extracted and chunked in parallel
+    bulk_upsert_batch_chunks: int = 1000  # Chunks of several bulk documents embedded and upserted together
 
 
 # Ingestion Types
+class CrawlOptionsType(BaseModel):
+    """Per-request overrides of the crawl settings in RAGConfigType"""
+
+    limit: Optional[int] = Field(default=None, ge=1, le=10_000, description="Maximum number of pages to crawl")
+    include_paths: Optional[List[str]] = Field(default=None, description="Regex patterns of URL paths to crawl")
+    exclude_paths: Optional[List[str]] = Field(default=None, description="Regex patterns of URL paths to skip")
+    concurrency: Optional[int] = Field(default=None, ge=1, le=32, description="Pages processed in parallel")
+
+
 DataSourceType = Literal["text", "pdf", "docx", "doc", "pptx", "ppt", "url", "json"]
 
 
@@ -49,8 +82,21 @@ class IngestRequestArgs(BaseModel):
     crawl_full_website: Optional[bool] = Field(
         default=True, description="Whether to crawl the entire website (only applies to URL source type)"
     )
+    incremental: bool = Field(
+        default=False,
+        description="Only write chunks that changed since the last ingestion of this source and delete removed ones",
+    )
+    dry_run: bool = Field(
+        default=False, description="Only extract and chunk, and return an estimate without embedding or storing"
+    )
     user_email: Optional[str] = Field(default=None, description="User email to get the user id from the DB")
 
+    @model_validator(mode="after")
+    def _check_chunk_overlap(self):
+        if self.chunk_overlap >= self.chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+        return self
+
 
 class FileIngestRequestArgs(BaseModel):
     """Request model for file ingestion (for file uploads)"""
@@ -59,7 +105,36 @@ class FileIngestRequestArgs(BaseModel):
     metadata: Optional[Dict[str, Any]] = Field(default_factory=dict)
     chunk_size: int = Field(default=400, ge=50, le=2000, description="Chunk size in tokens")
     chunk_overlap: int = Field(default=60, ge=0, le=500, description="Chunk overlap in tokens")
+    incremental: bool = Field(
+        default=False,
+        description="Only write chunks that changed since the last ingestion of this source and delete removed ones",
+    )
+    dry_run: bool = Field(
+        default=False, description="Only extract and chunk, and return an estimate without embedding or storing"
+    )
     user_email: Optional[str] = Field(default=None, description="User email to get the user id from the DB")
+    content_sha256: Optional[str] = Field(default=None, description="sha256 of the uploaded file, computed on upload")
+
+    @model_validator(mode="after")
+    def _check_chunk_overlap(self):
+        if self.chunk_overlap >= self.chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+        return self
+
+
+class IngestionEstimateType(BaseModel):
+    """What an ingestion would embed and store, computed by a dry run"""
+
+    chunks: int
+    tokens: int
+    embedding_model: str
+    embedding_batches: int  # Embedding API requests, before embedding cache hits
+    vectors: int
+    vector_bytes: int  # float32 values of the projected vectors
+    metadata_bytes: int  # Serialised metadata, including the chunk text
+    max_metadata_bytes: int
+    chunks_over_metadata_limit: int  # Chunks Pinecone would reject for more than 40 KB of metadata
+    upsert_requests: int
 
 
 class IngestResponseType(BaseModel):
@@ -68,7 +143,129 @@ class IngestResponseType(BaseModel):
     success: bool
     message: str
     chunks_created: int
+    chunks_unchanged: int = 0  # Incremental ingestion: chunks already stored as-is
+    chunks_deleted: int = 0  # Incremental ingestion: stored chunks no longer in the source
+    boilerplate_lines_removed: int = 0  # Crawls: lines repeated across pages stripped before chunking
+    near_duplicate_chunks_dropped: int = 0  # Crawls: chunks not embedded as near-duplicates of earlier chunks
     source_id: str
+    estimate: Optional[IngestionEstimateType] = None  # Dry runs: nothing was embedded or stored
+
+
+# Bulk Ingestion Types
+class BulkManifestEntryType(BaseModel):
+    """One document of a bulk ingestion manifest"""
+
+    path: str = Field(description="Path of the file in the archive, or file name of an uploaded file")
+    source_name: Optional[str] = Field(default=None, description="Defaults to the source prefix followed by the path")
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+
+
+class BulkIngestRequestArgs(BaseModel):
+    """Settings shared by every document of a bulk ingestion"""
+
+    source_prefix: str = ""
+    metadata: Optional[Dict[str, Any]] = Field(default_factory=dict)
+    chunk_size: int = Field(default=400, ge=50, le=2000, description="Chunk size in tokens")
+    chunk_overlap: int = Field(default=60, ge=0, le=500, description="Chunk overlap in tokens")
+    incremental: bool = Field(
+        default=False,
+        description="Only write chunks that changed since the last ingestion of each document and delete removed ones",
+    )
+    dry_run: bool = Field(
+        default=False, description="Only extract and chunk, and return an estimate without embedding or storing"
+    )
+    user_email: Optional[str] = Field(default=None, description="User email to get the user id from the DB")
+
+    @model_validator(mode="after")
+    def _check_chunk_overlap(self):
+        if self.chunk_overlap >= self.chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+        return self
+
+
+class BulkDocumentType(BaseModel):
+    """A bulk ingestion document spooled to disk"""
+
+    path: str  # Path in the archive or uploaded file name, reported back in the results
+    file_path: str
+    file_type: str
+    source_name: str
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+    content_sha256: Optional[str] = None
+
+
+class BulkDocumentResultType(BaseModel):
+    """Outcome of one document of a bulk ingestion"""
+
+    path: str
+    source_name: Optional[str] = None
+    success: bool
+    chunks_created: int = 0
+    chunks_unchanged: int = 0
+    chunks_deleted: int = 0
+    error: Optional[str] = None
+
+
+class BulkIngestResponseType(BaseModel):
+    """Response model for bulk ingestion"""
+
+    success: bool  # True when every document was ingested
+    message: str
+    documents_succeeded: int
+    documents_failed: int
+    chunks_created: int
+    results: List[BulkDocumentResultType] = Field(default_factory=list)
+    estimate: Optional[IngestionEstimateType] = None  # Dry runs: nothing was embedded or stored
+
+
+# Source Catalog Types
+RAGSourceStatusType = Literal["ingesting", "ready", "failed", "deleting"]
+
+
+class RAGSourceType(BaseModel):
+    """Catalog entry of an ingested source"""
+
+    source_name: str
+    owner_id: Optional[str] = None  # User id of user-scoped sources
+    source_type: str
+    status: RAGSourceStatusType
+    content_hash: Optional[str] = None  # sha256 of the ingested file or text
+    id_prefix: str  # Every chunk id of the source starts with it
+    namespace: str = ""  # Pinecone namespace holding the source's vectors
+    chunk_count: int = 0
+    token_count: int = 0
+    embedding_model: str
+    embedding_dimension: int
+    chunk_size: Optional[int] = None
+    chunk_overlap: Optional[int] = None
+    ingestion_version: int
+    ingestion_id: Optional[str] = None
+    error: Optional[str] = None
+    created_at: int
+    updated_at: int
+
+
+# Ingestion Job Types
+IngestionJobKindType = Literal["ingest", "ingest_file", "crawl_url"]
+
+IngestionJobStatusType = Literal["queued", "running", "completed", "failed", "cancelled"]
+
+
+class IngestionJobType(BaseModel):
+    """State of a background ingestion job"""
+
+    job_id: str
+    kind: IngestionJobKindType
+    status: IngestionJobStatusType
+    stage: str = "queued"
+    progress: Dict[str, Any] = Field(default_factory=dict)
+    source_name: str
+    cancel_requested: bool = False
+    created_at: int
+    started_at: Optional[int] = None
+    finished_at: Optional[int] = None
+    result: Optional[IngestResponseType] = None
+    error: Optional[str] = None
 
 
 class DocumentChunkType(BaseModel):
@@ -101,6 +298,9 @@ class QueryRequestArgs(BaseModel):
         default=None,
         description="Filter results to only include documents from these source names. If not specified, searches all sources.",
     )
+    user_email: Optional[str] = Field(
+        default=None, description="Without source names, searches only the sources of this user (by user id)"
+    )
 
 
 class QueryResponseType(BaseModel):
@@ -110,6 +310,7 @@ class QueryResponseType(BaseModel):
     sources: List[Dict[str, Any]] = Field(default_factory=list)
     mode_used: QueryModeType
     confidence_score: Optional[float] = None
+    cached: bool = False  # Whether the answer was served from the answer cache
 
 
 # External Vector Database Types
@@ -0,0 +1,92 @@
+"""
+Bounded executor for vector searches issued from async request handlers.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.rag.stats import Counters, percentile
+from app.shared.config.config import env
+
+T = TypeVar("T")
+SEARCH_EXECUTOR_COUNTERS = (
+    "queued",  # Submitted calls that have not started yet
+    "in_flight",  # Calls running on a worker thread
+    "completed",
+    "errors",
+    "timeouts",
+)
+
+
+class VectorSearchTimeoutError(TimeoutError):
+    """A vector search did not finish within its timeout"""
+
+
+class SearchExecutor:
+    """Runs blocking vector searches on a bounded thread pool, awaitable with a timeout"""
+
+    def __init__(self, max_workers: int, timeout_seconds: float):
+        self.max_workers = max_workers
+        self.timeout_seconds = timeout_seconds
+        self.stats = Counters(SEARCH_EXECUTOR_COUNTERS, samples=("wait_ms", "run_ms"))
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rag-search")
+
+    def _timed(self, function: Callable[..., T], enqueued_at: float, args: Any, kwargs: Any) -> T:
+        started = time.perf_counter()
+        self.stats.record({"wait_ms": (started - enqueued_at) * 1000}, queued=-1, in_flight=1)
+        error = False
+        try:
+            return function(*args, **kwargs)
+        except BaseException:
+            error = True
+            raise
+        finally:
+            run_ms = (time.perf_counter() - started) * 1000
+            self.stats.record({"run_ms": run_ms}, in_flight=-1, completed=1, errors=int(error))
+
+    def snapshot(self) -> Dict[str, float]:
+        wait_ms = self.stats.samples("wait_ms")
+        run_ms = self.stats.samples("run_ms")
+        return {
+            **self.stats.counters(),
+            "wait_ms_p50": percentile(wait_ms, 0.5),
+            "wait_ms_p99": percentile(wait_ms, 0.99),
+            "run_ms_p50": percentile(run_ms, 0.5),
+            "run_ms_p99": percentile(run_ms, 0.99),
+        }
+
+    async def run(self, function: Callable[..., T], *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> T:
+        """Run function(*args, **kwargs) on the pool and await its result.
+
+        Raises:
+            VectorSearchTimeoutError: If the call did not finish within timeout (or the default timeout)
+        """
+        timeout = self.timeout_seconds if timeout is None else timeout
+        self.stats.record(queued=1)
+        future = self._executor.submit(self._timed, function, time.perf_counter(), args, kwargs)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            if future.cancel():
+                # Never started, so it is no longer queued either
+                self.stats.record(queued=-1)
+            self.stats.record(timeouts=1)
+            raise VectorSearchTimeoutError(f"Vector search timed out after {timeout:.1f}s")
+
+
+_search_executor: Optional[SearchExecutor] = None
+_search_executor_lock = threading.Lock()
+
+
+def get_search_executor() -> SearchExecutor:
+    """Get or create the process-wide search executor"""
+    global _search_executor
+    with _search_executor_lock:
+        if _search_executor is None:
+            _search_executor = SearchExecutor(
+                max_workers=env.RAG_SEARCH_WORKERS, timeout_seconds=env.RAG_SEARCH_TIMEOUT_SECONDS
+            )
+        return _search_executor
@@ -0,0 +1,168 @@
+"""
+Catalog of ingested RAG sources in MongoDB (`rag_sources`).
+
+Every source has one document recording its owner, type, content hash, chunk id prefix, chunk
+and token counts, the embedding model and chunking settings, and the ingestion version. Stats,
+listings, deletes and re-ingests are served from it with indexed lookups instead of scanning the
+vector index.
+
+Pinecone and MongoDB cannot share a transaction, so writes are two-phase: a source is marked
+`ingesting` (or `deleting`) with a fresh ingestion id before the vectors are written, and only
+the ingestion holding the current id may mark it `ready` or `failed` afterwards. A crash between
+the two phases leaves the source visibly unfinished instead of with stale counts. Catalog
+failures are logged and never fail an ingestion, so a source written while MongoDB was unavailable
+keeps its previous entry (or none) until its next ingestion.
+"""
+
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from pymongo import ASCENDING, DESCENDING
+
+from app.rag.rag_types import RAGSourceType
+from app.rag.tenancy import source_owner_id
+from app.shared.dependencies.instance import instance
+from app.shared.logger.logger import console_log
+
+COLLECTION_NAME = "rag_sources"
+# Bumped whenever chunk ids, chunking or cleaning change in a way that makes stored chunks incompatible
+INGESTION_VERSION = 2
+
+
+def _now() -> int:
+    return int(time.time() * 1000)
+
+
+class SourceCatalog:
+    """Reads and two-phase writes of the rag_sources collection"""
+
+    def __init__(self):
+        self._indexes_ready = False
+        self._indexes_lock = threading.Lock()
+
+    def _collection(self):
+        if instance.mongo_db is None:
+            return None
+
+        collection = instance.mongo_db[COLLECTION_NAME]
+        with self._indexes_lock:
+            if not self._indexes_ready:
+                collection.create_index([("source_name", ASCENDING)], unique=True)
+                collection.create_index([("owner_id", ASCENDING), ("updated_at", DESCENDING)])
+                self._indexes_ready = True
+        return collection
+
+    def begin_ingest(self, source_name: str, source_type: str, **fields: Any) -> Optional[str]:
+        """Mark a source as being ingested. Returns the ingestion id to commit or fail it with"""
+        ingestion_id = uuid.uuid4().hex
+        try:
+            collection = self._collection()
+            if collection is None:
+                return None
+
+            now = _now()
+            collection.update_one(
+                {"source_name": source_name},
+                {
+                    "$set": {
+                        **fields,
+                        "source_type": source_type,
+                        "owner_id": source_owner_id(source_name),
+                        "status": "ingesting",
+                        "ingestion_id": ingestion_id,
+                        "ingestion_version": INGESTION_VERSION,
+                        "error": None,
+                        "updated_at": now,
+                    },
+                    "$setOnInsert": {"created_at": now},
+                },
+                upsert=True,
+            )
+            return ingestion_id
+        except Exception as error:
+            console_log(f"Source catalog update for {source_name} failed: {str(error)}")
+            return None
+
+    def commit_ingest(
+        self,
+        ingestion_id: Optional[str],
+        source_name: str,
+        chunk_count: int,
+        token_count: int,
+        **fields: Any,
+    ) -> None:
+        """Record the counts of a finished ingestion, unless a newer ingestion of the source started since"""
+        self._finish(
+            ingestion_id,
+            source_name,
+            {**fields, "status": "ready", "chunk_count": chunk_count, "token_count": token_count},
+        )
+
+    def fail_ingest(self, ingestion_id: Optional[str], source_name: str, error: str) -> None:
+        self._finish(ingestion_id, source_name, {"status": "failed", "error": error})
+
+    def _finish(self, ingestion_id: Optional[str], source_name: str, fields: Dict[str, Any]) -> None:
+        if ingestion_id is None:
+            return
+        try:
+            collection = self._collection()
+            if collection is not None:
+                collection.update_one(
+                    {"source_name": source_name, "ingestion_id": ingestion_id},
+                    {"$set": {**fields, "updated_at": _now()}},
+                )
+        except Exception as error:
+            console_log(f"Source catalog update for {source_name} failed: {str(error)}")
+
+    def begin_delete(self, source_name: str) -> None:
+        try:
+            collection = self._collection()
+            if collection is not None:
+                collection.update_one(
+                    {"source_name": source_name},
+                    {"$set": {"status": "deleting", "ingestion_id": None, "updated_at": _now()}},
+                )
+        except Exception as error:
+            console_log(f"Source catalog update for {source_name} failed: {str(error)}")
+
+    def commit_delete(self, source_name: str) -> None:
+        try:
+            collection = self._collection()
+            if collection is not None:
+                collection.delete_one({"source_name": source_name, "status": "deleting"})
+        except Exception as error:
+            console_log(f"Source catalog deletion for {source_name} failed: {str(error)}")
+
+    def get(self, source_name: str) -> Optional[RAGSourceType]:
+        """Catalog entry of a source, None if it is not cataloged or the catalog is unavailable"""
+        try:
+            collection = self._collection()
+            document = collection.find_one({"source_name": source_name}) if collection is not None else None
+            return RAGSourceType(**document) if document else None
+        except Exception as error:
+            console_log(f"Source catalog lookup for {source_name} failed: {str(error)}")
+            return None
+
+    def list(self, owner_id: Optional[str], limit: int = 100, skip: int = 0) -> List[RAGSourceType]:
+        """Sources of an owner (unscoped sources when owner_id is None), most recently updated first"""
+        collection = self._collection()
+        if collection is None:
+            raise RuntimeError("MongoDB is not connected")
+
+        cursor = collection.find({"owner_id": owner_id}).sort("updated_at", DESCENDING).skip(skip).limit(limit)
+        return [RAGSourceType(**document) for document in cursor]
+
+
+_source_catalog: Optional[SourceCatalog] = None
+_source_catalog_lock = threading.Lock()
+
+
+def get_source_catalog() -> SourceCatalog:
+    """Get or create the process-wide source catalog"""
+    global _source_catalog
+    with _source_catalog_lock:
+        if _source_catalog is None:
+            _source_catalog = SourceCatalog()
+        return _source_catalog
@@ -0,0 +1,51 @@
+"""
+Thread-safe counters and latency samples behind the RAG stats endpoints.
+"""
+
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional
+
+# Number of recent values the percentiles of a sample series are computed over
+MAX_SAMPLES = 1024
+
+
+def ratio(part: float, whole: float) -> float:
+    return part / whole if whole else 0.0
+
+
+def percentile(ordered: List[float], share: float) -> float:
+    """Value at share (0-1) of ascending samples, 0 without samples"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+class Counters:
+    """Named counters and bounded series of recent samples, updated under one lock"""
+
+    def __init__(self, counters: Iterable[str], samples: Iterable[str] = (), max_samples: int = MAX_SAMPLES):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = dict.fromkeys(counters, 0)
+        self._samples: Dict[str, Deque[float]] = {name: deque(maxlen=max_samples) for name in samples}
+
+    def record(self, samples: Optional[Dict[str, float]] = None, **deltas: float) -> None:
+        """Add deltas to counters and append samples to their series, atomically"""
+        with self._lock:
+            for name, delta in deltas.items():
+                self._counters[name] += delta
+            for name, value in (samples or {}).items():
+                self._samples[name].append(value)
+
+    def __getitem__(self, name: str) -> float:
+        with self._lock:
+            return self._counters[name]
+
+    def counters(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._counters)
+
+    def samples(self, name: str) -> List[float]:
+        """Recent samples of a series in ascending order"""
+        with self._lock:
+            return sorted(self._samples[name])
@@ -0,0 +1,45 @@
+"""
+Routing of user-scoped sources to per-tenant Pinecone namespaces.
+
+Sources ingested for a user are named "{user_id}::{name}", and every chunk id of a source starts
+with its name. With RAG_TENANT_NAMESPACES enabled, the vectors of a user's sources live in the
+namespace "tenant-{user_id}" of the index, so a tenant's searches only scan the tenant's own vectors
+instead of filtering the whole index. Unscoped sources stay in the default namespace.
+
+Because the namespace is derived from the source name (or a chunk id), writes, reads and deletes
+route consistently without storing the namespace anywhere. Vectors written before namespaces were
+enabled are moved with scripts/migrate_tenant_namespaces.py.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+from app.shared.config.config import env
+
+DEFAULT_NAMESPACE = ""
+TENANT_NAMESPACE_PREFIX = "tenant-"
+
+
+def source_owner_id(source_name: str) -> Optional[str]:
+    """User id of a user-scoped "{user_id}::{name}" source (or chunk id of one)"""
+    owner_id, separator, _ = source_name.partition("::")
+    return owner_id if separator else None
+
+
+def tenant_namespace(user_id: Optional[str]) -> str:
+    """Namespace holding the vectors of a user, the default namespace without a user"""
+    if not user_id or not env.RAG_TENANT_NAMESPACES:
+        return DEFAULT_NAMESPACE
+    return f"{TENANT_NAMESPACE_PREFIX}{user_id}"
+
+
+def source_namespace(source_name: str) -> str:
+    """Namespace holding the vectors of a source, given its name or the id of one of its chunks"""
+    return tenant_namespace(source_owner_id(source_name))
+
+
+def group_by_namespace(names: Iterable[str]) -> Dict[str, List[str]]:
+    """Group source names or chunk ids by the namespace they are routed to"""
+    groups: Dict[str, List[str]] = {}
+    for name in names:
+        groups.setdefault(source_namespace(name), []).append(name)
+    return groups
@@ -0,0 +1,112 @@
+"""
+Precompiled text cleaning shared by the ingestion and query paths.
+
+clean_ingested_text cleans extracted documents and crawled pages before chunking, clean_search_text
+cleans search hits before they are returned or put into a prompt. By default, a pass is skipped when
+the literal its pattern needs ("<", "](", ...) is absent from the text. compat=True runs every pass
+unconditionally. Both modes give the output of the original cleaners, which tests/test_text_cleaner.py
+checks. The search-side inline link pattern is a linear-time rewrite of the original one.
+"""
+
+import re
+from typing import List, Pattern, Tuple
+
+# (required literal, pattern, replacement). The pattern cannot match text without the literal.
+StepType = Tuple[str, Pattern[str], str]
+
+_UNDERSCORE = "_"
+
+_INGEST_STEPS: List[StepType] = [
+    ("<", re.compile(r"<[^>]+>"), ""),
+    (_UNDERSCORE, re.compile(r"_"), ""),
+    ("](", re.compile(r"\[([^\]]+)\]\([^)]+\)"), r"\1"),
+    ("][", re.compile(r"\[([^\]]+)\]\[[^\]]*\]"), r"\1"),
+    ("http", re.compile(r"https?://[^\s]+"), ""),
+    ("[[", re.compile(r"\[\[[a-zA-Z0-9]+\]\]"), ""),
+    ("[", re.compile(r"\[\\?\[[a-zA-Z0-9]+\\?\]\]"), ""),
+    ("[", re.compile(r"\[[a-zA-Z0-9]+\]"), ""),
+    ("\\[", re.compile(r"\\\[([a-zA-Z0-9]+)\\\]"), ""),
+    ("\\[", re.compile(r"\\\[[a-zA-Z0-9]+\]"), ""),
+    ("\\]", re.compile(r"\[[a-zA-Z0-9]+\\\]"), ""),
+    ("[]", re.compile(r"\[\]"), ""),
+]
+
+_SEARCH_STEPS: List[StepType] = [
+    ("<", re.compile(r"<!--.*?-->|<[^>]+>", re.DOTALL), ""),
+    # Same matches as [^)(]+ inside the repetition, without the exponential backtracking
+    ("](", re.compile(r"\[([^\]]+)\]\((?:[^)(]|\([^)(]*\))*\)"), r"\1"),
+    ("]", re.compile(r"\[([^\]]+)\]\s*\[[^\]]*\]"), r"\1"),
+    ("[[", re.compile(r"\[\[[a-zA-Z0-9]+\]\]"), ""),
+    ("[", re.compile(r"\[\\?\[[a-zA-Z0-9]+\\?\]\]"), ""),
+    ("[", re.compile(r"\[[a-zA-Z0-9]+\]"), ""),
+    ("\\[", re.compile(r"\\\[([a-zA-Z0-9]+)\\\]"), ""),
+    ("\\[", re.compile(r"\\\[[a-zA-Z0-9]+\]"), ""),
+    ("\\]", re.compile(r"\[[a-zA-Z0-9]+\\\]"), ""),
+    ("[]", re.compile(r"\[\]"), ""),
+    ("http", re.compile(r"https?://\S+"), ""),
+    (_UNDERSCORE, re.compile(r"_"), ""),
+]
+
+_LINK_REMOVAL_STEPS: List[StepType] = [
+    ("](", re.compile(r"\[([^\]]+)\]\([^)]+\)"), r"\1"),
+    ("http", re.compile(r"https?://[^\s]+"), ""),
+    ("][", re.compile(r"\[([^\]]+)\]\[[^\]]*\]"), r"\1"),
+]
+
+# The original collapse pattern rewrote every single space; the fast one only touches
+# runs that actually change and gives the same result
+_SPACES = re.compile(r"[ \t]+")
+_SPACE_RUNS = re.compile(r" [ \t]+|\t[ \t]*")
+_INGEST_BLANK_LINES = re.compile(r"\n\s*\n\s*\n+")
+_SEARCH_BLANK_LINES = re.compile(r"\n[ \t]*\n[ \t]*(?:\n[ \t]*)+")
+_LINK_REMOVAL_BLANK_LINES = re.compile(r"\n\s*\n")
+
+
+def _run_steps(content: str, steps: List[StepType], compat: bool) -> str:
+    for literal, pattern, replacement in steps:
+        if literal == _UNDERSCORE:
+            content = content.replace(_UNDERSCORE, "")
+        elif compat or literal in content:
+            content = pattern.sub(replacement, content)
+    return content
+
+
+def _collapse_spaces(content: str, compat: bool) -> str:
+    if compat:
+        return _SPACES.sub(" ", content)
+    if "\t" not in content and "  " not in content:
+        return content
+    return _SPACE_RUNS.sub(" ", content)
+
+
+def clean_ingested_text(content: str, compat: bool = False) -> str:
+    """Remove markup, links, URLs and reference markers from extracted text and normalise whitespace"""
+    if not content:
+        return content
+
+    content = _run_steps(content, _INGEST_STEPS, compat)
+    content = _collapse_spaces(content, compat)
+    # Three or more newlines become a single paragraph break
+    if compat or "\n" in content:
+        content = _INGEST_BLANK_LINES.sub("\n\n", content)
+    return content.strip()
+
+
+def clean_search_text(content: str, compat: bool = False) -> str:
+    """Clean a search hit before it is returned or used as context"""
+    if not content:
+        return content
+
+    content = _run_steps(content, _SEARCH_STEPS, compat)
+    content = _collapse_spaces(content, compat)
+    if compat or "\n" in content:
+        content = _SEARCH_BLANK_LINES.sub("\n\n", content)
+    return content.strip()
+
+
+def remove_markdown_links(content: str, compat: bool = False) -> str:
+    """Remove markdown links and bare URLs while keeping the link text"""
+    content = _run_steps(content, _LINK_REMOVAL_STEPS, compat)
+    if compat or "\n" in content:
+        content = _LINK_REMOVAL_BLANK_LINES.sub("\n\n", content)
+    return content.strip()
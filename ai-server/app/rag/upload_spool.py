@@ -0,0 +1,113 @@
+"""
+Streaming spool for uploaded files.
+
+Uploads are copied to a temporary file in fixed-size chunks while their sha256 is computed, so a
+request never holds more than one chunk of the file in memory. Extractors and ingestion jobs are
+handed the path and open the file in place.
+
+Raw request bodies can be spooled the same way, optionally base64-decoded chunk by chunk.
+"""
+
+import base64
+import binascii
+import hashlib
+import os
+import tempfile
+from typing import AsyncIterator, NamedTuple, Optional
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+class SpooledUpload(NamedTuple):
+    """An upload written to disk"""
+
+    path: str
+    size: int
+    sha256: str
+
+
+class Base64StreamDecoder:
+    """Decodes base64 arriving in arbitrary pieces. Whitespace and line breaks are ignored."""
+
+    def __init__(self):
+        self._pending = b""
+
+    def decode(self, chunk: bytes) -> bytes:
+        data = self._pending + b"".join(chunk.split())
+        # Only whole 4-character groups can be decoded; the rest waits for the next piece
+        usable = len(data) - len(data) % 4
+        self._pending = data[usable:]
+        return self._decode(data[:usable])
+
+    def finish(self) -> None:
+        """Raise if the stream ended inside a 4-character group"""
+        if self._pending:
+            raise ValueError("Invalid base64 data: truncated input")
+
+    @staticmethod
+    def _decode(data: bytes) -> bytes:
+        try:
+            return base64.b64decode(data, validate=True)
+        except binascii.Error as error:
+            raise ValueError(f"Invalid base64 data: {error}")
+
+
+async def spool_upload(file: UploadFile, suffix: str = "", directory: Optional[str] = None) -> SpooledUpload:
+    """Copy an upload to a temporary file chunk by chunk, hashing it on the way.
+
+    The caller owns the file and must remove it (see remove_spooled_upload).
+    """
+
+    async def read_chunks() -> AsyncIterator[bytes]:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                return
+            yield chunk
+
+    return await spool_stream(read_chunks(), suffix=suffix, directory=directory)
+
+
+async def spool_stream(
+    chunks: AsyncIterator[bytes],
+    suffix: str = "",
+    directory: Optional[str] = None,
+    decode_base64: bool = False,
+) -> SpooledUpload:
+    """Write a stream of byte chunks (e.g. a raw request body) to a temporary file, hashing the written bytes.
+
+    With decode_base64 the stream is base64 text that is decoded incrementally. Raises ValueError on invalid base64.
+    """
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    spool_file = tempfile.NamedTemporaryFile(suffix=suffix, dir=directory or None, delete=False)
+    decoder = Base64StreamDecoder() if decode_base64 else None
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        with spool_file:
+            async for chunk in chunks:
+                if decoder is not None:
+                    chunk = decoder.decode(chunk)
+                if not chunk:
+                    continue
+                digest.update(chunk)
+                size += len(chunk)
+                await run_in_threadpool(spool_file.write, chunk)
+            if decoder is not None:
+                decoder.finish()
+    except BaseException:
+        remove_spooled_upload(spool_file.name)
+        raise
+
+    return SpooledUpload(path=spool_file.name, size=size, sha256=digest.hexdigest())
+
+
+def remove_spooled_upload(path: Optional[str]) -> None:
+    """Delete a spooled upload if it still exists"""
+    if path and os.path.exists(path):
+        os.unlink(path)
@@ -0,0 +1,292 @@
+"""
+Write-coalescing upsert buffer for the Pinecone index.
+"""
+
+import json
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from app.rag.stats import Counters, percentile, ratio
+from app.shared.config.config import env
+from app.shared.logger.logger import console_log
+
+# Serialised size of one vector value in the upsert request body
+BYTES_PER_VALUE = 20
+
+UPSERT_WRITER_COUNTERS = (
+    "queue_depth",
+    "in_flight",
+    "vectors_written",
+    "batches_written",
+    "retries",
+    "failed_vectors",
+)
+
+
+def _latency_summary(samples: List[float]) -> Dict[str, float]:
+    """Average, median, p95 and maximum in milliseconds of ascending samples in seconds"""
+    return {
+        "avg_ms": 1000 * ratio(sum(samples), len(samples)),
+        "p50_ms": 1000 * percentile(samples, 0.5),
+        "p95_ms": 1000 * percentile(samples, 0.95),
+        "max_ms": 1000 * samples[-1] if samples else 0.0,
+    }
+
+
+class _UpsertTicket:
+    """Completion of one caller's upsert, which may be spread over several batches"""
+
+    def __init__(self, vectors: int):
+        self._lock = threading.Lock()
+        self.remaining = vectors
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+
+    def complete(self, vectors: int, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self.remaining -= vectors
+            if error is not None and self.error is None:
+                self.error = error
+            if self.remaining <= 0:
+                self.done.set()
+
+
+class _QueuedVector(NamedTuple):
+    vector: Dict[str, Any]
+    namespace: str
+    ticket: _UpsertTicket
+    size: int
+    enqueued_at: float
+
+
+def _estimate_size(vector: Dict[str, Any]) -> int:
+    metadata = json.dumps(vector.get("metadata") or {}, default=str)
+    return BYTES_PER_VALUE * len(vector.get("values") or ()) + len(metadata) + len(vector.get("id", ""))
+
+
+def _is_rejection(error: BaseException) -> bool:
+    """True for errors caused by the request itself (4xx except 429), which retrying cannot fix"""
+    status = getattr(error, "status", None) or getattr(error, "status_code", None)
+    return isinstance(status, int) and 400 <= status < 500 and status != 429
+
+
+class UpsertWriter:
+    """Coalesces upserts of concurrent callers into size- and age-bounded batches written in parallel"""
+
+    def __init__(
+        self,
+        index: Any,
+        batch_size: int = 100,
+        max_batch_bytes: int = 2_000_000,
+        max_delay_seconds: float = 0.05,
+        max_in_flight: int = 8,
+        max_retries: int = 3,
+        max_queue_vectors: int = 10_000,
+        base_retry_delay: float = 0.5,
+        max_retry_delay: float = 10.0,
+    ):
+        """
+        Args:
+            index: Pinecone index the batches are upserted into
+            batch_size: Maximum number of vectors per upsert request
+            max_batch_bytes: Approximate maximum request size
+            max_delay_seconds: Longest time a queued vector waits for its batch to fill up
+            max_in_flight: Maximum number of concurrent upsert requests
+            max_retries: Retries of a batch after a transient failure
+            max_queue_vectors: Queue size above which callers block until batches are written
+        """
+        self.index = index
+        self.batch_size = max(1, batch_size)
+        self.max_batch_bytes = max_batch_bytes
+        self.max_delay_seconds = max_delay_seconds
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_retries = max_retries
+        self.max_queue_vectors = max(self.batch_size, max_queue_vectors)
+        self.base_retry_delay = base_retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.stats = Counters(UPSERT_WRITER_COUNTERS, samples=("flush_latency", "queue_wait"))
+
+        self._queue: Deque[_QueuedVector] = deque()
+        self._queued_bytes = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._slots = threading.Semaphore(self.max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="rag-upsert")
+        self._dispatcher = threading.Thread(target=self._dispatch, name="rag-upsert-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: str = "") -> None:
+        """Queue vectors for a namespace and block until all of them are written.
+
+        Raises:
+            The error of the first batch holding one of the vectors that could not be written
+        """
+        if not vectors:
+            return
+
+        ticket = _UpsertTicket(len(vectors))
+        with self._condition:
+            for vector in vectors:
+                # Backpressure: callers wait while the queue is full
+                while len(self._queue) >= self.max_queue_vectors and not self._closed:
+                    self._condition.notify_all()
+                    self._condition.wait()
+                if self._closed:
+                    raise RuntimeError("Upsert writer is closed")
+                size = _estimate_size(vector)
+                self._queue.append(_QueuedVector(vector, namespace, ticket, size, time.monotonic()))
+                self._queued_bytes += size
+            self.stats.record(queue_depth=len(vectors))
+            self._condition.notify_all()
+
+        ticket.done.wait()
+        if ticket.error is not None:
+            raise ticket.error
+
+    def snapshot(self) -> Dict[str, Any]:
+        counters = self.stats.counters()
+        return {
+            **counters,
+            "avg_batch_size": ratio(counters["vectors_written"], counters["batches_written"]),
+            "flush_latency": _latency_summary(self.stats.samples("flush_latency")),
+            "queue_wait": _latency_summary(self.stats.samples("queue_wait")),
+        }
+
+    def close(self) -> None:
+        """Write everything still queued, then stop the dispatcher"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True)
+
+    def _batch_is_full(self) -> bool:
+        return len(self._queue) >= self.batch_size or self._queued_bytes >= self.max_batch_bytes
+
+    def _take_batch(self) -> List[_QueuedVector]:
+        batch: List[_QueuedVector] = []
+        batch_bytes = 0
+        while self._queue and len(batch) < self.batch_size:
+            if batch and batch_bytes + self._queue[0].size > self.max_batch_bytes:
+                break
+            if batch and self._queue[0].namespace != batch[0].namespace:
+                break
+            item = self._queue.popleft()
+            batch.append(item)
+            batch_bytes += item.size
+        self._queued_bytes -= batch_bytes
+        return batch
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+
+                # Give other callers until the oldest vector is due to fill the batch up
+                while not self._closed and not self._batch_is_full():
+                    remaining = self._queue[0].enqueued_at + self.max_delay_seconds - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                batch = self._take_batch()
+                # Wakes callers waiting for queue space
+                self._condition.notify_all()
+
+            # While every slot is busy the queue keeps filling, so batches grow with load
+            self._slots.acquire()
+            self.stats.record(queue_depth=-len(batch), in_flight=1)
+            self._executor.submit(self._write_batch, batch)
+
+    def _write_batch(self, batch: List[_QueuedVector]) -> None:
+        try:
+            started = time.monotonic()
+            failures = self._upsert_isolating(batch)
+            finished = time.monotonic()
+            self.stats.record(
+                {"flush_latency": finished - started, "queue_wait": started - batch[0].enqueued_at},
+                vectors_written=len(batch) - len(failures),
+                batches_written=1,
+            )
+
+            errors: Dict[int, BaseException] = {id(item): error for item, error in failures}
+            counts: Dict[int, Tuple[_UpsertTicket, int, Optional[BaseException]]] = {}
+            for item in batch:
+                ticket, count, error = counts.get(id(item.ticket), (item.ticket, 0, None))
+                counts[id(item.ticket)] = (ticket, count + 1, error or errors.get(id(item)))
+            for ticket, count, error in counts.values():
+                ticket.complete(count, error)
+            if failures:
+                self.stats.record(failed_vectors=len(failures))
+        except BaseException as error:
+            # Never leave a caller waiting
+            for item in batch:
+                item.ticket.complete(1, error)
+        finally:
+            self.stats.record(in_flight=-1)
+            self._slots.release()
+
+    def _upsert_isolating(self, items: List[_QueuedVector]) -> List[Tuple[_QueuedVector, BaseException]]:
+        """Upsert items, splitting rejected batches in halves. Returns the items that failed with their error"""
+        try:
+            self._upsert_with_retry([item.vector for item in items], items[0].namespace)
+            return []
+        except Exception as error:
+            if len(items) == 1 or not _is_rejection(error):
+                return [(item, error) for item in items]
+            middle = len(items) // 2
+            return self._upsert_isolating(items[:middle]) + self._upsert_isolating(items[middle:])
+
+    def _upsert_with_retry(self, vectors: List[Dict[str, Any]], namespace: str) -> None:
+        attempt = 0
+        while True:
+            try:
+                self.index.upsert(vectors=vectors, namespace=namespace)
+                return
+            except Exception as error:
+                if attempt >= self.max_retries or _is_rejection(error):
+                    raise
+                # Full jitter keeps concurrent retries from hitting the index in lockstep
+                delay = random.uniform(0, min(self.max_retry_delay, self.base_retry_delay * 2**attempt))
+                attempt += 1
+                self.stats.record(retries=1)
+                console_log(
+                    f"Upsert of {len(vectors)} vectors failed ({error}), retry {attempt}/{self.max_retries} "
+                    f"in {delay:.2f}s"
+                )
+                time.sleep(delay)
+
+
+_upsert_writers: Dict[str, UpsertWriter] = {}
+_upsert_writers_lock = threading.Lock()
+
+
+def get_upsert_writer(index_name: str, index: Any) -> UpsertWriter:
+    """Get or create the process-wide upsert writer of an index"""
+    with _upsert_writers_lock:
+        if index_name not in _upsert_writers:
+            _upsert_writers[index_name] = UpsertWriter(
+                index,
+                batch_size=env.RAG_UPSERT_BATCH_SIZE,
+                max_batch_bytes=env.RAG_UPSERT_MAX_BATCH_BYTES,
+                max_delay_seconds=env.RAG_UPSERT_MAX_DELAY_MS / 1000,
+                max_in_flight=env.RAG_UPSERT_MAX_IN_FLIGHT,
+                max_retries=env.RAG_UPSERT_MAX_RETRIES,
+                max_queue_vectors=env.RAG_UPSERT_MAX_QUEUE_VECTORS,
+            )
+        return _upsert_writers[index_name]
+
+
+def close_upsert_writers() -> None:
+    """Write out queued vectors on application shutdown"""
+    with _upsert_writers_lock:
+        for writer in _upsert_writers.values():
+            writer.close()
+        _upsert_writers.clear()
@@ -18,6 +18,36 @@ class Env(BaseSettings):
     PINECONE_REGION: str = ""
     PINECONE_INDEX_NAME: str = "rag-index"
 
+    RAG_ANSWER_CACHE_MAX_ENTRIES: int = 5000  # Cached /rag/query answers per worker
+    RAG_ANSWER_CACHE_TTL_SECONDS: int = 60 * 60
+    RAG_BULK_MAX_FILES: int = 5000
+    RAG_BULK_MAX_UNPACKED_MB: int = 4096
+    RAG_CRAWL_STATE_TTL_SECONDS: int = 90 * 24 * 60 * 60
+    RAG_EMBEDDING_CACHE_DIR: str = ""
+    RAG_EMBEDDING_CACHE_MAX_ENTRIES: int = 500_000
+    RAG_EMBEDDING_CACHE_TTL_SECONDS: int = 30 * 24 * 60 * 60
+    RAG_EMBEDDING_CACHE_REDIS_TTL_SECONDS: int = 7 * 24 * 60 * 60
+    RAG_EMBEDDING_CACHE_REDIS_DTYPE: str = "float16"
+    RAG_EXTRACTION_POOL_ENABLED: bool = True
+    RAG_EXTRACTION_WORKERS: int = 0  # 0 uses one worker process per CPU core
+    RAG_EXTRACTION_TIMEOUT_SECONDS: int = 300
+    RAG_EXTRACTION_MEMORY_LIMIT_MB: int = 2048
+    RAG_EXTRACTION_PAGES_PER_SHARD: int = 50
+    RAG_INGEST_WORKERS: int = 2
+    RAG_JOB_SPOOL_DIR: str = ""
+    RAG_JOB_TTL_SECONDS: int = 7 * 24 * 60 * 60
+    RAG_QUERY_EMBEDDING_CACHE_MAX_ENTRIES: int = 10_000  # In-process LRU entries per worker
+    RAG_QUERY_EMBEDDING_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+    RAG_SEARCH_WORKERS: int = 16  # Threads running blocking vector searches per worker
+    RAG_SEARCH_TIMEOUT_SECONDS: float = 10.0  # Per vector search, including the time queued for a thread
+    RAG_TENANT_NAMESPACES: bool = True  # Route user-scoped sources to per-user Pinecone namespaces
+    RAG_UPSERT_BATCH_SIZE: int = 100
+    RAG_UPSERT_MAX_BATCH_BYTES: int = 2_000_000  # Pinecone rejects upsert requests over 2 MB
+    RAG_UPSERT_MAX_DELAY_MS: int = 50
+    RAG_UPSERT_MAX_IN_FLIGHT: int = 8
+    RAG_UPSERT_MAX_RETRIES: int = 3
+    RAG_UPSERT_MAX_QUEUE_VECTORS: int = 10_000
+
     REDIS_PORT: int = 0
     REDIS_HOST: str = ""
     REDIS_URI: str = ""
@@ -29,6 +29,13 @@ async def connect_to_redis_with_retry():
 
             console_log("Redis connected!")
             instance.redis_client = redisInstance
+            instance.redis_binary_client = redis.Redis(
+                host=env.REDIS_HOST,
+                port=env.REDIS_PORT,
+                password=env.REDIS_PASSWORD,
+                socket_connect_timeout=5,
+                decode_responses=False,
+            )
             return True
         except ConnectionError as error:
             console_log("Failed to connect to Redis!", error=error)
@@ -57,6 +64,8 @@ async def close_redis_client():
     if instance.redis_client is not None:
         try:
             instance.redis_client.close()
+            if instance.redis_binary_client is not None:
+                instance.redis_binary_client.close()
         except Exception as error:
             log(
                 "system",
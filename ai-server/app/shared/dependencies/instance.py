@@ -10,6 +10,8 @@ from app.shared.utils.error_util import throw_error, ThrowErrorArgs
 
 class InstanceRegistry:
     redis_client: Optional[redis.Redis] = None
+    # Shares redis_client's connection settings but returns raw bytes, for binary payloads
+    redis_binary_client: Optional[redis.Redis] = None
     mongo_client: Optional[MongoClient] = None
     mongo_db: Optional[Database] = None
 
@@ -0,0 +1,82 @@
+import random
+import sys
+import time
+from pathlib import Path
+
+# Allow running as `python scripts/benchmark_text_cleaner.py` from the ai-server folder
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.rag.text_cleaner import clean_ingested_text, clean_search_text, remove_markdown_links  # noqa: E402
+
+# Fragments resembling extracted PDF text
+PLAIN_FRAGMENTS = [
+    "The quick brown fox jumps over the lazy dog.",
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit.",
+    "Page 12 of 48",
+    "\n",
+    "\n\n\n",
+]
+
+# Fragments resembling Firecrawl markdown
+MARKDOWN_FRAGMENTS = [
+    "The quick brown fox jumps over the lazy dog.",
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit.",
+    "See the [documentation](https://example.com/docs/getting_started) for details.",
+    "As shown in the [reference][ref1] and [\\[12\\]](https://en.wikipedia.org/wiki/Fox#cite_note-12).",
+    "Citation needed[3] and another one[[14]].",
+    "<div class='note'><b>Note:</b> tags are stripped</div>",
+    "<!-- tracking comment -->",
+    "Visit https://example.com/path_with_underscores?q=1 now.",
+    "Some _italic_ text and snake_case_names.",
+    "  \t  ",
+    "\n",
+    "\n\n\n",
+    "Page 12 of 48",
+]
+
+
+def build_text(fragments, target_bytes: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    parts = []
+    size = 0
+    while size < target_bytes:
+        fragment = rng.choice(fragments)
+        parts.append(fragment)
+        size += len(fragment) + 1
+    return " ".join(parts)
+
+
+def time_call(function, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+# Compares the default cleaner with the compatibility mode (the original pass-by-pass cleaning).
+# Usage: python scripts/benchmark_text_cleaner.py [size_in_mb]
+def main():
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 4.0
+
+    for corpus, fragments in [("plain text", PLAIN_FRAGMENTS), ("markdown", MARKDOWN_FRAGMENTS)]:
+        text = build_text(fragments, int(size_mb * 1024 * 1024))
+        print(f"\nCleaning {len(text) / 1024 / 1024:.1f} MB of synthetic {corpus}")
+
+        for name, clean in [
+            ("clean_ingested_text", clean_ingested_text),
+            ("clean_search_text", clean_search_text),
+            ("remove_markdown_links", remove_markdown_links),
+        ]:
+            compat_seconds = time_call(lambda value: clean(value, compat=True), text, repeat=3)
+            fast_seconds = time_call(clean, text, repeat=3)
+            identical = clean(text) == clean(text, compat=True)
+            print(
+                f"{name:<22} compat {compat_seconds * 1000:8.1f} ms   default {fast_seconds * 1000:8.1f} ms   "
+                f"speedup {compat_seconds / fast_seconds:4.1f}x   identical output: {identical}"
+            )
+
+
+if __name__ == "__main__":
+    main()
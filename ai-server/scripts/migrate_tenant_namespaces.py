@@ -0,0 +1,69 @@
+import argparse
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Allow running as `python scripts/migrate_tenant_namespaces.py` from the ai-server folder
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pinecone import Pinecone  # noqa: E402
+
+from app.rag.tenancy import DEFAULT_NAMESPACE, group_by_namespace  # noqa: E402
+from app.shared.config.config import env  # noqa: E402
+
+LIST_PAGE_SIZE = 100
+
+
+def migrate_page(index: Any, chunk_ids: List[str], dry_run: bool) -> Dict[str, int]:
+    """Copy the user-scoped vectors of one listing page to their tenant namespaces, then delete the originals"""
+    moved: Dict[str, int] = {}
+    for namespace, namespace_ids in group_by_namespace(chunk_ids).items():
+        if namespace == DEFAULT_NAMESPACE:
+            continue
+        moved[namespace] = len(namespace_ids)
+        if dry_run:
+            continue
+
+        stored: Any = index.fetch(ids=namespace_ids, namespace=DEFAULT_NAMESPACE)
+        vectors = [
+            {"id": chunk_id, "values": vector.values, "metadata": vector.metadata or {}}
+            for chunk_id, vector in stored.vectors.items()
+        ]
+        if vectors:
+            index.upsert(vectors=vectors, namespace=namespace)
+        # Originals are only deleted once their copies are written, so an interrupted run can simply be restarted
+        index.delete(ids=[vector["id"] for vector in vectors], namespace=DEFAULT_NAMESPACE)
+    return moved
+
+
+# Moves vectors of user-scoped sources ("{user_id}::{name}") from the default namespace of the RAG index into
+# their tenant namespaces ("tenant-{user_id}"). Run once after enabling RAG_TENANT_NAMESPACES; it is safe to re-run.
+# Usage: python scripts/migrate_tenant_namespaces.py [--dry-run]
+def main():
+    parser = argparse.ArgumentParser(description="Move user-scoped vectors into per-tenant Pinecone namespaces")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the vectors that would be moved")
+    args = parser.parse_args()
+
+    if not env.RAG_TENANT_NAMESPACES:
+        print("RAG_TENANT_NAMESPACES is disabled, nothing to migrate")
+        return
+
+    index = Pinecone(api_key=env.PINECONE_KEY).Index(env.PINECONE_INDEX_NAME)
+    scanned = 0
+    moved: Dict[str, int] = {}
+    for chunk_ids in index.list(limit=LIST_PAGE_SIZE, namespace=DEFAULT_NAMESPACE):
+        chunk_ids = list(chunk_ids)
+        scanned += len(chunk_ids)
+        for namespace, count in migrate_page(index, chunk_ids, args.dry_run).items():
+            moved[namespace] = moved.get(namespace, 0) + count
+        print(f"Scanned {scanned} vectors, {sum(moved.values())} user-scoped", end="\r")
+
+    print()
+    action = "Would move" if args.dry_run else "Moved"
+    for namespace, count in sorted(moved.items()):
+        print(f"{action} {count} vectors to {namespace}")
+    print(f"{action} {sum(moved.values())} vectors to {len(moved)} tenant namespaces")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+
+# Settings are read when app modules are imported; tests never connect to these services
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MONGODB_NAME", "agentstop-test")
@@ -0,0 +1,172 @@
+"""In-memory stand-ins for Pinecone, OpenAI embeddings, Redis-backed stores and the source catalog"""
+
+import hashlib
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+from unittest import mock
+
+import numpy as np
+import tiktoken
+
+from app.rag import chunking
+from app.rag.answer_cache import ContentVersions
+from app.rag.crawl_state import CrawlPageStateType
+from app.rag.ingestion_service import RAGIngestionService
+from app.rag.rag_types import RAGConfigType
+
+DIMENSION = 8
+
+# One token per byte, so token offsets are character offsets of ASCII text. Chunk windowing does not
+# depend on the tokenizer, and this one needs no download.
+BYTE_ENCODING = tiktoken.Encoding(
+    "bytes", pat_str=r"\S+|\s+", mergeable_ranks={bytes([i]): i for i in range(256)}, special_tokens={}
+)
+
+
+def patch_encoding() -> Any:
+    """Patch the chunkers' tokenizer with BYTE_ENCODING. Returns the started patcher."""
+    chunking.get_chunker.cache_clear()
+    patcher = mock.patch.object(chunking.tiktoken, "get_encoding", return_value=BYTE_ENCODING)
+    patcher.start()
+    return patcher
+
+
+def unpatch_encoding(patcher: Any) -> None:
+    patcher.stop()
+    chunking.get_chunker.cache_clear()
+
+
+def text_vector(text: str) -> List[float]:
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return [byte / 255 for byte in digest[:DIMENSION]]
+
+
+class FakeIndex:
+    """Pinecone index kept in dicts, one per namespace, recording the calls made to it"""
+
+    def __init__(self):
+        self.namespaces: Dict[str, Dict[str, SimpleNamespace]] = {}
+        self.hidden_from_fetch: Set[str] = set()  # Ids fetch does not return yet, as after a fresh upsert
+        self.fetched: List[str] = []
+        self.upserted: List[str] = []
+        self.deleted: List[str] = []
+
+    def vectors(self, namespace: str = "") -> Dict[str, SimpleNamespace]:
+        return self.namespaces.get(namespace, {})
+
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: str = "") -> None:
+        stored = self.namespaces.setdefault(namespace, {})
+        for vector in vectors:
+            stored[vector["id"]] = SimpleNamespace(
+                id=vector["id"], values=list(vector["values"]), metadata=dict(vector.get("metadata") or {})
+            )
+            self.upserted.append(vector["id"])
+
+    def fetch(self, ids: List[str], namespace: str = "") -> SimpleNamespace:
+        self.fetched.extend(ids)
+        stored = self.vectors(namespace)
+        return SimpleNamespace(
+            vectors={
+                chunk_id: stored[chunk_id]
+                for chunk_id in ids
+                if chunk_id in stored and chunk_id not in self.hidden_from_fetch
+            }
+        )
+
+    def list(self, prefix: str = "", limit: int = 100, namespace: str = "") -> Iterator[List[str]]:
+        ids = sorted(chunk_id for chunk_id in self.vectors(namespace) if chunk_id.startswith(prefix))
+        for start in range(0, len(ids), limit):
+            yield ids[start : start + limit]
+
+    def delete(self, ids: Optional[List[str]] = None, namespace: str = "", **kwargs: Any) -> None:
+        stored = self.vectors(namespace)
+        for chunk_id in ids or []:
+            stored.pop(chunk_id, None)
+            self.deleted.append(chunk_id)
+
+
+class FakeUpsertWriter:
+    def __init__(self, index: FakeIndex):
+        self.index = index
+
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: str = "") -> None:
+        self.index.upsert(vectors, namespace)
+
+
+class FakeEmbeddings:
+    """Deterministic embeddings derived from the text, recording every embedded text"""
+
+    encoding_name = chunking.DEFAULT_ENCODING
+
+    def __init__(self):
+        self.embedded: List[str] = []
+
+    def embed_documents_matrix(self, texts: List[str], token_counts: Optional[List[int]] = None) -> np.ndarray:
+        self.embedded.extend(texts)
+        return np.asarray([text_vector(text) for text in texts], dtype=np.float32)
+
+    def embed_query(self, text: str) -> List[float]:
+        return text_vector(text)
+
+
+class FakeCrawlState:
+    def __init__(self):
+        self.sources: Dict[str, Dict[str, CrawlPageStateType]] = {}
+
+    def get_many(self, source_name: str, urls: Iterable[str]) -> Dict[str, CrawlPageStateType]:
+        states = self.sources.get(source_name, {})
+        return {url: states[url].model_copy(deep=True) for url in urls if url in states}
+
+    def get(self, source_name: str, url: str) -> Optional[CrawlPageStateType]:
+        return self.get_many(source_name, [url]).get(url)
+
+    def put_many(self, source_name: str, states: Dict[str, CrawlPageStateType]) -> None:
+        self.sources.setdefault(source_name, {}).update(
+            {url: state.model_copy(deep=True) for url, state in states.items()}
+        )
+
+    def delete_source(self, source_name: str) -> None:
+        self.sources.pop(source_name, None)
+
+
+class FakeSourceCatalog:
+    """Source catalog without MongoDB: every source is uncataloged"""
+
+    def __init__(self):
+        self.committed: Dict[str, Dict[str, Any]] = {}
+        self.failed: Dict[str, str] = {}
+
+    def begin_ingest(self, source_name: str, source_type: str, **fields: Any) -> Optional[str]:
+        return f"ingestion-{source_name}"
+
+    def commit_ingest(self, ingestion_id, source_name, chunk_count, token_count, **fields) -> None:
+        self.committed[source_name] = {"chunk_count": chunk_count, "token_count": token_count, **fields}
+
+    def fail_ingest(self, ingestion_id, source_name, error) -> None:
+        self.failed[source_name] = error
+
+    def begin_delete(self, source_name: str) -> None:
+        pass
+
+    def commit_delete(self, source_name: str) -> None:
+        self.committed.pop(source_name, None)
+
+    def get(self, source_name: str) -> None:
+        return None
+
+
+def make_ingestion_service(**config: Any) -> RAGIngestionService:
+    """Ingestion service writing to a FakeIndex, without calling OpenAI, Pinecone, Redis or MongoDB.
+
+    Needs patch_encoding() to be active.
+    """
+    service = RAGIngestionService.__new__(RAGIngestionService)
+    service.config = RAGConfigType(**config)
+    service.embeddings = FakeEmbeddings()
+    service.index = FakeIndex()
+    service.upsert_writer = FakeUpsertWriter(service.index)
+    service.crawl_state = FakeCrawlState()
+    service.source_catalog = FakeSourceCatalog()
+    service.content_versions = ContentVersions()
+    service.chunker = chunking.get_chunker(service.config.chunk_size, service.config.chunk_overlap)
+    return service
@@ -0,0 +1,66 @@
+import unittest
+from typing import List, Optional
+
+import numpy as np
+
+from app.rag.answer_cache import AnswerCache
+from app.rag.rag_types import QueryRequestArgs, QueryResponseType
+from tests.test_ingestion_service import IngestionServiceTestCase, make_pages
+
+QUESTION = "What is in the manual?"
+QUESTION_VECTOR = np.array([1.0, 0.0, 0.5], dtype=np.float32)
+
+
+class AnswerInvalidationTest(IngestionServiceTestCase):
+    """Every write path of the ingestion service invalidates the answers cached for what it changed"""
+
+    def setUp(self):
+        super().setUp()
+        self.cache = AnswerCache(max_entries=100, ttl_seconds=3600, versions=self.service.content_versions)
+
+    def lookup(self, source_name: Optional[List[str]]) -> Optional[QueryResponseType]:
+        scope = self.cache.scope(QueryRequestArgs(question=QUESTION, source_name=source_name))
+        return self.cache.lookup(scope, QUESTION_VECTOR, 0.97)
+
+    def cache_answer(self, source_name: Optional[List[str]]) -> None:
+        scope = self.cache.scope(QueryRequestArgs(question=QUESTION, source_name=source_name))
+        self.assertIsNone(self.cache.lookup(scope, QUESTION_VECTOR, 0.97))
+        self.cache.store(scope, QUESTION_VECTOR, QueryResponseType(answer="Cached", mode_used="docs_only"))
+        self.assertIsNotNone(self.lookup(source_name))
+
+    def assert_invalidated(self, change) -> None:
+        # Answers filtered by the source depend on its version, unfiltered ones on its namespace's
+        for source_name in (["manual"], None):
+            with self.subTest(source_name=source_name):
+                self.ingest_file(make_pages(3))
+                self.cache_answer(source_name)
+                change()
+                self.assertIsNone(self.lookup(source_name))
+
+    def test_ingest(self):
+        self.assert_invalidated(lambda: self.ingest_file(make_pages(3, seed=9), incremental=True))
+
+    def test_delete(self):
+        self.assert_invalidated(lambda: self.assertIsNone(self.service.delete_document("manual").error))
+
+    def test_reingest(self):
+        def reingest():
+            self.assertIsNone(self.service.re_ingest_document_with_cleaning("manual").error)
+
+        self.assert_invalidated(reingest)
+
+    def test_other_sources_keep_their_answers(self):
+        self.ingest_file(make_pages(3))
+        self.cache_answer(["manual"])
+        self.ingest_file(make_pages(3, seed=9), source_name="other")
+        self.assertIsNotNone(self.lookup(["manual"]))
+
+    def test_unchanged_incremental_ingest_keeps_answers(self):
+        self.ingest_file(make_pages(3))
+        self.cache_answer(["manual"])
+        self.ingest_file(make_pages(3), incremental=True)
+        self.assertIsNotNone(self.lookup(["manual"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+from typing import List
+from unittest import mock
+
+from app.rag import chunking
+from app.rag.chunking import TextChunk, TokenChunker
+from tests.fakes import BYTE_ENCODING
+
+
+def make_chunker(chunk_size: int, chunk_overlap: int) -> TokenChunker:
+    with mock.patch.object(chunking.tiktoken, "get_encoding", return_value=BYTE_ENCODING):
+        return TokenChunker(chunk_size, chunk_overlap)
+
+
+def reference_windows(tokens: List[int], chunk_size: int, chunk_overlap: int) -> List[TextChunk]:
+    """Overlapping windows of tokens, computed the obvious way"""
+    chunks = []
+    start = 0
+    while start < len(tokens):
+        window = tokens[start : start + chunk_size]
+        chunks.append(TextChunk(BYTE_ENCODING.decode(window), len(window), start))
+        if start + chunk_size >= len(tokens):
+            break
+        start += chunk_size - chunk_overlap
+    return chunks
+
+
+def text_of(length: int) -> str:
+    return "".join(chr(ord("a") + i % 26) for i in range(length))
+
+
+class TokenChunkerTest(unittest.TestCase):
+    chunk_size = 10
+    chunk_overlap = 3
+
+    def setUp(self):
+        self.chunker = make_chunker(self.chunk_size, self.chunk_overlap)
+        self.step = self.chunk_size - self.chunk_overlap
+
+    def lengths(self) -> List[int]:
+        # Empty, shorter than one window, one window, exact multiples of the stride past it and their neighbours
+        lengths = [0, 1, self.chunk_size - 1, self.chunk_size, self.chunk_size + 1]
+        for strides in range(1, 5):
+            exact = self.chunk_size + strides * self.step
+            lengths.extend([exact - 1, exact, exact + 1])
+        return lengths
+
+    def test_split_matches_reference_windows(self):
+        for length in self.lengths():
+            text = text_of(length)
+            with self.subTest(length=length):
+                self.assertEqual(
+                    self.chunker.split(text),
+                    reference_windows(BYTE_ENCODING.encode(text), self.chunk_size, self.chunk_overlap),
+                )
+
+    def test_split_stream_matches_split(self):
+        for length in self.lengths():
+            text = text_of(length)
+            expected = self.chunker.split(text)
+            for piece_size in (1, 3, self.step, self.chunk_size, self.chunk_size + 1, max(length, 1)):
+                pieces = [text[i : i + piece_size] for i in range(0, length, piece_size)]
+                with self.subTest(length=length, piece_size=piece_size):
+                    self.assertEqual(list(self.chunker.split_stream(pieces)), expected)
+
+    def test_split_stream_skips_empty_pieces(self):
+        text = text_of(3 * self.chunk_size)
+        pieces = ["", text[:5], "", "", text[5:], ""]
+        self.assertEqual(list(self.chunker.split_stream(pieces)), self.chunker.split(text))
+        self.assertEqual(list(self.chunker.split_stream(["", ""])), [])
+
+    def test_chunks_overlap_by_chunk_overlap_tokens(self):
+        text = text_of(5 * self.chunk_size)
+        chunks = list(self.chunker.split_stream([text[:17], text[17:]]))
+        self.assertGreater(len(chunks), 2)
+        for previous, chunk in zip(chunks, chunks[1:]):
+            self.assertEqual(chunk.start_token - previous.start_token, self.step)
+            self.assertEqual(previous.text[self.step :], chunk.text[: self.chunk_overlap])
+        self.assertTrue(all(chunk.token_count == self.chunk_size for chunk in chunks[:-1]))
+        self.assertEqual(chunks[-1].start_token + chunks[-1].token_count, len(text))
+
+    def test_split_stream_yields_chunks_before_the_stream_ends(self):
+        text = text_of(4 * self.chunk_size)
+
+        def pieces():
+            yield text[: 2 * self.chunk_size]
+            raise AssertionError("read past the first piece")
+
+        first = next(self.chunker.split_stream(pieces()))
+        self.assertEqual(first, self.chunker.split(text)[0])
+
+
+class ZeroOverlapTokenChunkerTest(TokenChunkerTest):
+    chunk_overlap = 0
+
+
+class LargeOverlapTokenChunkerTest(TokenChunkerTest):
+    chunk_overlap = 9
+
+
+class TokenChunkerValidationTest(unittest.TestCase):
+    def test_rejects_invalid_parameters(self):
+        for chunk_size, chunk_overlap in ((0, 0), (-1, 0), (10, 10), (10, 11), (10, -1)):
+            with self.subTest(chunk_size=chunk_size, chunk_overlap=chunk_overlap):
+                with self.assertRaises(ValueError):
+                    make_chunker(chunk_size, chunk_overlap)
+
+
+if __name__ == "__main__":
+    unittest.main()
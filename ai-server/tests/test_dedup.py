@@ -0,0 +1,135 @@
+import random
+import unittest
+from typing import List
+
+from app.rag.dedup import CrawlDeduplicator, SimHashIndex, simhash
+from app.rag.rag_types import DocumentChunkType
+
+
+def flip(signature: int, *bits: int) -> int:
+    for bit in bits:
+        signature ^= 1 << bit
+    return signature
+
+
+def make_chunk(content: str, index: int = 0) -> DocumentChunkType:
+    return DocumentChunkType(id=f"site#{index}", content=content, source="site", chunk_index=index, total_chunks=0)
+
+
+def make_text(seed: int, words: int = 1000) -> str:
+    rng = random.Random(seed)
+    return " ".join(f"word{rng.randrange(500)}" for _ in range(words))
+
+
+ARTICLE = make_text(1)
+OTHER_ARTICLE = make_text(2)
+# One word of the article replaced, which changes 3 of its ~1000 shingles
+EDITED_ARTICLE = " ".join("edited" if i == 500 else word for i, word in enumerate(ARTICLE.split(" ")))
+
+
+class SimHashIndexTest(unittest.TestCase):
+    signature = 0x0123_4567_89AB_CDEF
+
+    def test_exact_duplicate(self):
+        index = SimHashIndex()
+        self.assertTrue(index.add_if_new(self.signature))
+        self.assertFalse(index.add_if_new(self.signature))
+
+    def test_near_duplicates_within_the_threshold(self):
+        # Differing bits spread over several bands, so the match is only found through the one band left intact
+        for bits in ((0,), (0, 17), (0, 17, 34), (63, 47, 31), (1, 2, 3)):
+            with self.subTest(bits=bits):
+                index = SimHashIndex(max_distance=3)
+                index.add_if_new(self.signature)
+                self.assertFalse(index.add_if_new(flip(self.signature, *bits)))
+
+    def test_beyond_the_threshold(self):
+        index = SimHashIndex(max_distance=3)
+        index.add_if_new(self.signature)
+        self.assertTrue(index.add_if_new(flip(self.signature, 0, 1, 2, 3)))
+
+        index = SimHashIndex(max_distance=1)
+        index.add_if_new(self.signature)
+        self.assertTrue(index.add_if_new(flip(self.signature, 0, 20)))
+
+    def test_distinct_signatures_sharing_a_band(self):
+        index = SimHashIndex(max_distance=3)
+        index.add_if_new(self.signature)
+        # Same lowest band, every other band differs in 16 bits
+        other = self.signature ^ 0xFFFF_FFFF_FFFF_0000
+        self.assertTrue(index.add_if_new(other))
+        self.assertFalse(index.add_if_new(flip(other, 5)))
+
+    def test_matches_a_pairwise_scan(self):
+        rng = random.Random(3)
+        seeds = [rng.getrandbits(64) for _ in range(50)]
+        signatures = [flip(rng.choice(seeds), *rng.sample(range(64), rng.randint(0, 5))) for _ in range(500)]
+
+        index = SimHashIndex(max_distance=3)
+        added: List[int] = []
+        for signature in signatures:
+            expected = all((signature ^ other).bit_count() > 3 for other in added)
+            self.assertEqual(index.add_if_new(signature), expected)
+            if expected:
+                added.append(signature)
+
+    def test_max_distance_is_limited_by_the_band_count(self):
+        self.assertEqual(SimHashIndex(max_distance=10).max_distance, 3)
+
+
+class SimHashTest(unittest.TestCase):
+    def test_same_text_same_signature(self):
+        self.assertEqual(simhash(ARTICLE), simhash(ARTICLE))
+        # Case and punctuation do not change the words
+        self.assertEqual(simhash(ARTICLE), simhash(ARTICLE.upper().replace(" ", ", ")))
+
+    def test_small_edit_is_close(self):
+        self.assertNotEqual(EDITED_ARTICLE, ARTICLE)
+        self.assertLessEqual((simhash(ARTICLE) ^ simhash(EDITED_ARTICLE)).bit_count(), 3)
+
+    def test_different_texts_are_far(self):
+        self.assertGreater((simhash(ARTICLE) ^ simhash(OTHER_ARTICLE)).bit_count(), 3)
+
+    def test_short_texts(self):
+        self.assertEqual(simhash("hello"), simhash("Hello!"))
+        self.assertIsInstance(simhash(""), int)
+
+
+class CrawlDeduplicatorTest(unittest.TestCase):
+    def test_drops_exact_and_near_duplicate_chunks(self):
+        deduplicator = CrawlDeduplicator()
+        texts = [ARTICLE, ARTICLE, EDITED_ARTICLE, OTHER_ARTICLE]
+        chunks = [make_chunk(text, i) for i, text in enumerate(texts)]
+
+        kept = deduplicator.drop_near_duplicates(chunks)
+
+        self.assertEqual([chunk.content for chunk in kept], [ARTICLE, OTHER_ARTICLE])
+        self.assertEqual(deduplicator.stats["chunks_checked"], 4)
+        self.assertEqual(deduplicator.stats["near_duplicate_chunks_dropped"], 2)
+
+    def test_disabled(self):
+        chunks = [make_chunk(ARTICLE, 0), make_chunk(ARTICLE, 1)]
+        self.assertEqual(CrawlDeduplicator(enabled=False).drop_near_duplicates(chunks), chunks)
+
+    def test_strips_lines_repeated_across_pages(self):
+        deduplicator = CrawlDeduplicator(boilerplate_min_pages=3)
+        menu = "[Home](/) | [Pricing](/pricing) | [Docs](/docs)"
+        pages = [f"{menu}\nPage {i} has its own content about topic {i}.\nAccept cookies to continue" for i in range(4)]
+        for page in pages:
+            deduplicator.observe(page)
+
+        self.assertTrue(deduplicator.ready)
+        self.assertEqual(deduplicator.strip_boilerplate(pages[2]), "Page 2 has its own content about topic 2.")
+        self.assertEqual(deduplicator.summary()["boilerplate_lines"], 2)
+
+    def test_keeps_pages_until_enough_were_observed(self):
+        deduplicator = CrawlDeduplicator(boilerplate_min_pages=5)
+        page = "Shared footer line\nContent"
+        for _ in range(4):
+            deduplicator.observe(page)
+        self.assertFalse(deduplicator.ready)
+        self.assertEqual(deduplicator.strip_boilerplate(page), page)
+
+
+if __name__ == "__main__":
+    unittest.main()
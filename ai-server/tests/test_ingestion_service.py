@@ -0,0 +1,224 @@
+import random
+import unittest
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+from unittest import mock
+
+from app.rag.ingestion_service import RAGIngestionService
+from app.rag.rag_types import FileIngestRequestArgs
+from tests.fakes import make_ingestion_service, patch_encoding, unpatch_encoding
+
+
+def make_pages(count: int, seed: int = 1) -> List[str]:
+    rng = random.Random(seed)
+    words = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta"]
+    return [" ".join(rng.choice(words) for _ in range(120)) + "\n\n" for _ in range(count)]
+
+
+class IngestionServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        encoding_patcher = patch_encoding()
+        self.addCleanup(unpatch_encoding, encoding_patcher)
+        self.service = make_ingestion_service(stream_batch_chunks=4)
+        self.index = self.service.index
+
+    def ingest_file(self, pages: List[str], source_name: str = "manual", incremental: bool = False):
+        request = FileIngestRequestArgs(
+            source_name=source_name, chunk_size=100, chunk_overlap=20, incremental=incremental
+        )
+        with mock.patch.object(RAGIngestionService, "_iter_file_text", return_value=iter(pages)):
+            result = self.service.ingest_file(b"", "pdf", request)
+        self.assertIsNone(result.error)
+        return result.data
+
+    def reset_calls(self):
+        self.index.fetched.clear()
+        self.index.upserted.clear()
+        self.service.embeddings.embedded.clear()
+
+
+class StreamedFileIngestionTest(IngestionServiceTestCase):
+    def test_chunks_are_written_once_without_total_chunks(self):
+        response = self.ingest_file(make_pages(6))
+
+        stored = self.index.vectors()
+        self.assertEqual(len(stored), response.chunks_created)
+        self.assertEqual(sorted(self.index.upserted), sorted(stored))
+        self.assertEqual(self.index.fetched, [])
+        self.assertTrue(all("total_chunks" not in vector.metadata for vector in stored.values()))
+        self.assertEqual(self.service.source_catalog.committed["manual"]["chunk_count"], response.chunks_created)
+
+    def test_unchanged_incremental_reingest_writes_nothing(self):
+        pages = make_pages(6)
+        self.ingest_file(pages)
+        self.reset_calls()
+
+        response = self.ingest_file(pages, incremental=True)
+
+        self.assertEqual(response.chunks_unchanged, response.chunks_created)
+        self.assertEqual(self.index.upserted, [])
+        self.assertEqual(self.service.embeddings.embedded, [])
+        # Only the diff's own fetch of the stored chunks, no fix-up pass over the document
+        self.assertEqual(sorted(self.index.fetched), sorted(self.index.vectors()))
+
+    def test_chunks_stored_with_total_chunks_count_as_unchanged(self):
+        pages = make_pages(6)
+        self.ingest_file(pages)
+        for vector in self.index.vectors().values():
+            vector.metadata["total_chunks"] = 99
+        self.reset_calls()
+
+        response = self.ingest_file(pages, incremental=True)
+
+        self.assertEqual(response.chunks_unchanged, response.chunks_created)
+        self.assertEqual(self.index.upserted, [])
+
+    def test_moved_chunks_missing_from_fetch_are_embedded_again(self):
+        pages = make_pages(6)
+        self.ingest_file(pages)
+        moved = sorted(self.index.vectors())[:3]
+        for chunk_id in moved:
+            self.index.vectors()[chunk_id].metadata["chunk_index"] = -1
+        # Listed, but not returned by the fetch of the metadata update
+        original_fetch = self.index.fetch
+
+        def fetch(ids, namespace=""):
+            if set(ids) <= set(moved):
+                self.index.hidden_from_fetch.update(moved)
+            try:
+                return original_fetch(ids, namespace)
+            finally:
+                self.index.hidden_from_fetch.clear()
+
+        self.reset_calls()
+        with mock.patch.object(self.index, "fetch", side_effect=fetch):
+            response = self.ingest_file(pages, incremental=True)
+
+        self.assertEqual(response.chunks_created - response.chunks_unchanged, len(moved))
+        self.assertEqual(sorted(self.index.upserted), moved)
+        self.assertEqual(len(self.service.embeddings.embedded), len(moved))
+        for chunk_id in moved:
+            self.assertGreaterEqual(self.index.vectors()[chunk_id].metadata["chunk_index"], 0)
+
+
+class FakeFirecrawl:
+    """Crawl that finishes pages_per_poll more pages on every status call, returning page_size results per page"""
+
+    def __init__(self, urls: List[str], pages_per_poll: int, page_size: int, contents: Optional[Dict[str, str]] = None):
+        self.urls = urls
+        self.contents = contents or {}
+        self.pages_per_poll = pages_per_poll
+        self.page_size = page_size
+        self.finished = 0
+        self.returned = 0  # Page documents returned over all status calls
+        self.cancelled = False
+
+    def start_crawl(self, url: str, **params: Any) -> SimpleNamespace:
+        return SimpleNamespace(id="crawl-1")
+
+    def _page(self, skip: int) -> SimpleNamespace:
+        self.finished = min(len(self.urls), self.finished + self.pages_per_poll)
+        data = [
+            {"metadata": {"sourceURL": url, "title": url}, "markdown": self.contents.get(url, f"Content of {url}")}
+            for url in self.urls[skip : min(skip + self.page_size, self.finished)]
+        ]
+        self.returned += len(data)
+        done = self.finished == len(self.urls)
+        end = skip + len(data)
+        next_url: Optional[str] = f"https://api.firecrawl.dev/v2/crawl/crawl-1?skip={end}"
+        if done and end == len(self.urls):
+            next_url = None
+        return SimpleNamespace(status="completed" if done else "scraping", data=data, next=next_url)
+
+    def get_crawl_status(self, job_id: str, pagination_config: Any = None) -> SimpleNamespace:
+        assert pagination_config is not None and not pagination_config.auto_paginate
+        return self._page(0)
+
+    def get_crawl_status_page(self, next_url: str) -> SimpleNamespace:
+        return self._page(int(next_url.rsplit("skip=", 1)[1]))
+
+    def cancel_crawl(self, job_id: str) -> None:
+        self.cancelled = True
+
+
+class CrawledPagesTest(IngestionServiceTestCase):
+    def crawl(self, firecrawl: FakeFirecrawl) -> List[str]:
+        self.service.firecrawl = firecrawl
+        self.service.config.crawl_poll_interval_seconds = 0
+        return [url for pages in self.service._iter_crawled_pages("https://example.com", {}) for url, _, _ in pages]
+
+    def test_every_page_is_read_once(self):
+        urls = [f"https://example.com/{i}" for i in range(50)]
+        for pages_per_poll, page_size in ((1, 10), (3, 10), (7, 2), (50, 5), (50, 100)):
+            with self.subTest(pages_per_poll=pages_per_poll, page_size=page_size):
+                firecrawl = FakeFirecrawl(urls, pages_per_poll, page_size)
+                self.assertEqual(self.crawl(firecrawl), urls)
+                self.assertEqual(firecrawl.returned, len(urls))
+                self.assertFalse(firecrawl.cancelled)
+
+    def test_crawl_is_cancelled_when_the_consumer_stops(self):
+        firecrawl = FakeFirecrawl([f"https://example.com/{i}" for i in range(10)], 2, 10)
+        self.service.firecrawl = firecrawl
+        self.service.config.crawl_poll_interval_seconds = 0
+        pages = self.service._iter_crawled_pages("https://example.com", {})
+        next(pages)
+        pages.close()
+        self.assertTrue(firecrawl.cancelled)
+
+
+class CrawlTestCase(IngestionServiceTestCase):
+    def crawl(self, contents: Dict[str, str]):
+        self.service.firecrawl = FakeFirecrawl(list(contents), len(contents), len(contents), contents)
+        self.service.config.crawl_poll_interval_seconds = 0
+        result = self.service.crawl_url("https://example.com", source_name="site", incremental=True)
+        self.assertIsNone(result.error)
+        return result.data
+
+
+class SourceCatalogTest(CrawlTestCase):
+    def test_empty_crawl_fails_its_ingestion(self):
+        self.service.firecrawl = FakeFirecrawl(["https://example.com/"], 1, 1, {"https://example.com/": ""})
+        self.service.config.crawl_poll_interval_seconds = 0
+
+        result = self.service.crawl_url("https://example.com", source_name="site")
+
+        self.assertEqual(result.error.errorType, "BadRequestException")
+        self.assertNotIn("site", self.service.source_catalog.committed)
+        self.assertIn("site", self.service.source_catalog.failed)
+
+    def test_stats_of_uncataloged_sources_are_counted_from_their_chunks(self):
+        self.ingest_file(make_pages(4))
+        self.service.source_catalog.committed.clear()
+
+        stats = self.service.get_document_stats("manual").data
+
+        stored = self.index.vectors().values()
+        self.assertEqual(stats["total_chunks"], len(stored))
+        self.assertEqual(stats["total_tokens"], sum(vector.metadata["token_count"] for vector in stored))
+
+
+class ReIngestTest(CrawlTestCase):
+    def stored_texts(self) -> List[str]:
+        return sorted(vector.metadata["text"] for vector in self.index.vectors().values())
+
+    def test_incremental_crawl_after_reingest_keeps_the_source(self):
+        contents = {f"https://example.com/{i}": page for i, page in enumerate(make_pages(3, seed=2))}
+        self.crawl(contents)
+
+        result = self.service.re_ingest_document_with_cleaning("site")
+        self.assertIsNone(result.error)
+        reingested = self.stored_texts()
+        self.assertTrue(reingested)
+
+        response = self.crawl(contents)
+
+        # Every page is processed again instead of being skipped as unchanged with the deleted chunk ids
+        self.assertEqual(response.chunks_unchanged, 0)
+        self.assertEqual(len(self.index.vectors()), response.chunks_created)
+        self.assertTrue(self.stored_texts())
+        page_states = self.service.crawl_state.sources["site"].values()
+        self.assertTrue(all(chunk_id in self.index.vectors() for state in page_states for chunk_id in state.chunk_ids))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import math
+import random
+import unittest
+from typing import List, Sequence
+
+import numpy as np
+
+from app.rag.mmr import mmr_select, normalize_rows
+
+
+def cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    norm_a = math.sqrt(sum(x * x for x in a))
+    norm_b = math.sqrt(sum(x * x for x in b))
+    if norm_a == 0 or norm_b == 0:
+        return 0.0
+    return sum(x * y for x, y in zip(a, b)) / (norm_a * norm_b)
+
+
+def reference_scores(
+    query: Sequence[float], candidates: List[Sequence[float]], selected: List[int], lambda_mult: float
+) -> List[float]:
+    """MMR score of every candidate given the selection so far, -inf for selected candidates"""
+    scores = []
+    for i, candidate in enumerate(candidates):
+        relevance = cosine(query, candidate)
+        if i in selected:
+            scores.append(-math.inf)
+        elif not selected:
+            scores.append(relevance)
+        else:
+            redundancy = max(cosine(candidate, candidates[j]) for j in selected)
+            scores.append(lambda_mult * relevance - (1 - lambda_mult) * redundancy)
+    return scores
+
+
+def reference_mmr(query: Sequence[float], candidates: List[Sequence[float]], k: int, lambda_mult: float) -> List[int]:
+    """MMR as a plain loop, ties going to the lowest index"""
+    selected: List[int] = []
+    while len(selected) < min(k, len(candidates)):
+        scores = reference_scores(query, candidates, selected, lambda_mult)
+        selected.append(scores.index(max(scores)))
+    return selected
+
+
+class MMRSelectTest(unittest.TestCase):
+    def assert_matches_reference(self, query, candidates, k, lambda_mult):
+        selected = mmr_select(np.asarray(query), candidates, k, lambda_mult)
+        self.assertEqual(len(selected), min(k, len(candidates)))
+        self.assertEqual(len(set(selected)), len(selected))
+        # Every pick has the best reference score given the picks before it, up to float32 rounding
+        for step, index in enumerate(selected):
+            scores = reference_scores(query, candidates, selected[:step], lambda_mult)
+            self.assertAlmostEqual(scores[index], max(scores), places=5)
+
+    def test_random_candidates(self):
+        rng = random.Random(5)
+        for trial in range(40):
+            dimension = rng.choice([2, 3, 8, 32])
+            count = rng.randint(1, 25)
+            query = [rng.gauss(0, 1) for _ in range(dimension)]
+            candidates = [[rng.gauss(0, 1) for _ in range(dimension)] for _ in range(count)]
+            for lambda_mult in (0.0, 0.25, 0.5, 0.9, 1.0):
+                for k in (1, 3, count, count + 5):
+                    with self.subTest(trial=trial, lambda_mult=lambda_mult, k=k):
+                        self.assert_matches_reference(query, candidates, k, lambda_mult)
+
+    def test_ties_go_to_the_lowest_index(self):
+        query = [1.0, 0.0]
+        candidates = [[0.0, 1.0], [1.0, 1.0], [2.0, 2.0], [1.0, 1.0], [1.0, -1.0]]
+        for lambda_mult in (0.0, 0.5, 1.0):
+            with self.subTest(lambda_mult=lambda_mult):
+                self.assertEqual(
+                    mmr_select(np.asarray(query), candidates, 5, lambda_mult),
+                    reference_mmr(query, candidates, 5, lambda_mult),
+                )
+
+    def test_k_at_least_the_candidate_count(self):
+        query = [1.0, 0.2, 0.0]
+        candidates = [[1.0, 0.0, 0.0], [0.9, 0.1, 0.0], [0.0, 1.0, 0.0]]
+        for k in (3, 4, 100):
+            with self.subTest(k=k):
+                selected = mmr_select(np.asarray(query), candidates, k)
+                self.assertEqual(sorted(selected), [0, 1, 2])
+                self.assertEqual(selected, reference_mmr(query, candidates, k, 0.5))
+
+    def test_lambda_one_is_relevance_order(self):
+        query = [1.0, 0.0]
+        candidates = [[0.0, 1.0], [1.0, 0.1], [1.0, 0.5], [1.0, 0.0]]
+        self.assertEqual(mmr_select(np.asarray(query), candidates, 4, lambda_mult=1.0), [3, 1, 2, 0])
+
+    def test_lambda_zero_maximises_diversity(self):
+        query = [1.0, 0.0]
+        # Two near copies of the most relevant vector and one orthogonal vector
+        candidates = [[1.0, 0.0], [0.99, 0.01], [0.0, 1.0]]
+        self.assertEqual(mmr_select(np.asarray(query), candidates, 2, lambda_mult=0.0), [0, 2])
+        self.assertEqual(mmr_select(np.asarray(query), candidates, 2, lambda_mult=1.0), [0, 1])
+
+    def test_zero_vectors(self):
+        candidates = [[0.0, 0.0], [1.0, 0.0], [0.0, 0.0], [0.0, 1.0]]
+        for query in ([1.0, 0.0], [0.0, 0.0]):
+            for lambda_mult in (0.0, 0.5, 1.0):
+                with self.subTest(query=query, lambda_mult=lambda_mult):
+                    selected = mmr_select(np.asarray(query), candidates, 4, lambda_mult)
+                    self.assertEqual(selected, reference_mmr(query, candidates, 4, lambda_mult))
+
+    def test_empty_input(self):
+        self.assertEqual(mmr_select(np.ones(3), [], 5), [])
+        self.assertEqual(mmr_select(np.ones(3), [[1.0, 0.0, 0.0]], 0), [])
+
+
+class NormalizeRowsTest(unittest.TestCase):
+    def test_rows_have_unit_length_and_zero_rows_stay_zero(self):
+        matrix = normalize_rows([[3.0, 4.0], [0.0, 0.0]])
+        self.assertEqual(matrix.dtype, np.float32)
+        np.testing.assert_allclose(matrix, [[0.6, 0.8], [0.0, 0.0]], rtol=1e-6)
+
+    def test_input_is_not_modified(self):
+        vector = np.array([3.0, 4.0], dtype=np.float32)
+        normalize_rows(vector)
+        np.testing.assert_array_equal(vector, [3.0, 4.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from unittest import mock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.rag import rag_controller
+from app.shared.types.return_type import DefaultReturnType, ErrorResponseType
+
+
+class UploadValidationTest(unittest.TestCase):
+    """Invalid chunking parameters are rejected with a 400 before the upload is spooled"""
+
+    def setUp(self):
+        app = FastAPI()
+        app.include_router(rag_controller.router)
+        self.ingestion_service = mock.Mock()
+        self.job_queue = mock.Mock(spool_dir="/nonexistent")
+        app.dependency_overrides[rag_controller.get_ingestion_service] = lambda: self.ingestion_service
+        app.dependency_overrides[rag_controller.get_ingestion_job_queue] = lambda: self.job_queue
+        self.client = TestClient(app)
+
+        patchers = [
+            mock.patch.object(rag_controller, "spool_upload", side_effect=AssertionError("upload spooled")),
+            mock.patch.object(rag_controller, "spool_stream", side_effect=AssertionError("body spooled")),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def assert_rejected(self, response):
+        self.assertEqual(response.status_code, 400, response.text)
+        self.assertIn("chunk_overlap", response.text)
+        self.ingestion_service.ingest_file.assert_not_called()
+        self.job_queue.enqueue_ingest.assert_not_called()
+
+    def test_file_uploads(self):
+        for path in ("/rag/ingest-file", "/rag/jobs/ingest-file"):
+            with self.subTest(path=path):
+                response = self.client.post(
+                    path,
+                    files={"file": ("doc.pdf", b"%PDF-1.4", "application/pdf")},
+                    data={"source_name": "doc", "chunk_size": "100", "chunk_overlap": "100"},
+                )
+                self.assert_rejected(response)
+
+    def test_binary_uploads(self):
+        for path in ("/rag/ingest-binary", "/rag/jobs/ingest-binary"):
+            with self.subTest(path=path):
+                response = self.client.post(
+                    path,
+                    params={"source_name": "doc", "chunk_size": 100, "chunk_overlap": 150},
+                    content=b"%PDF-1.4",
+                    headers={"Content-Type": "application/octet-stream"},
+                )
+                self.assert_rejected(response)
+
+    def test_valid_parameters_reach_the_spool(self):
+        response = self.client.post(
+            "/rag/ingest-file",
+            files={"file": ("doc.pdf", b"%PDF-1.4", "application/pdf")},
+            data={"source_name": "doc", "chunk_size": "100", "chunk_overlap": "20"},
+        )
+        self.assertEqual(response.status_code, 500)
+        self.assertIn("upload spooled", response.text)
+
+
+class UnknownUserTest(unittest.TestCase):
+    """Searches for an unknown user email answer 404 instead of 500"""
+
+    def setUp(self):
+        app = FastAPI()
+        app.include_router(rag_controller.router)
+        self.query_service = mock.Mock()
+        app.dependency_overrides[rag_controller.get_query_service] = lambda: self.query_service
+        self.client = TestClient(app)
+
+        error = ErrorResponseType(
+            userMessage="No user found!", error="No user found!", errorType="NotFoundException", errorData={}, trace=[]
+        )
+        patcher = mock.patch.object(rag_controller, "UserService")
+        user_service = patcher.start()
+        self.addCleanup(patcher.stop)
+        user_service.return_value.get_user = mock.AsyncMock(return_value=DefaultReturnType(error=error))
+
+    def test_query(self):
+        response = self.client.post("/rag/query", json={"question": "What is RAG?", "user_email": "nobody@example.com"})
+        self.assertEqual(response.status_code, 404, response.text)
+        self.query_service.query.assert_not_called()
+
+    def test_search(self):
+        response = self.client.get("/rag/search", params={"query": "RAG", "user_email": "nobody@example.com"})
+        self.assertEqual(response.status_code, 404, response.text)
+        self.query_service.get_similar_documents.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
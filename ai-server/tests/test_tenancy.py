@@ -0,0 +1,102 @@
+import unittest
+from unittest import mock
+
+from app.rag import tenancy
+from app.rag.ingestion_service import chunk_id_prefix
+from app.rag.tenancy import DEFAULT_NAMESPACE, group_by_namespace, source_namespace, source_owner_id
+from scripts.migrate_tenant_namespaces import migrate_page
+from tests.fakes import FakeIndex
+
+USER_SOURCE = "u1::handbook"
+# Ids of the chunks of USER_SOURCE under the current and both legacy id schemes
+USER_CHUNK_IDS = [
+    f"{chunk_id_prefix(USER_SOURCE)}0123456789abcdef",
+    f"{chunk_id_prefix(USER_SOURCE)}0123456789abcdef#1",
+    f"{USER_SOURCE}_3",
+    f"{USER_SOURCE}_page_2_1a2b3c4d_0",
+]
+
+
+class TenancyTestCase(unittest.TestCase):
+    enabled = True
+
+    def setUp(self):
+        patcher = mock.patch.object(tenancy.env, "RAG_TENANT_NAMESPACES", self.enabled)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class NamespaceRoutingTest(TenancyTestCase):
+    def test_source_owner_id(self):
+        self.assertEqual(source_owner_id(USER_SOURCE), "u1")
+        self.assertEqual(source_owner_id("handbook"), None)
+        self.assertEqual(source_owner_id("u1::a::b"), "u1")
+
+    def test_sources_and_their_chunks_share_a_namespace(self):
+        for chunk_id in USER_CHUNK_IDS:
+            with self.subTest(chunk_id=chunk_id):
+                self.assertEqual(source_namespace(chunk_id), source_namespace(USER_SOURCE))
+        self.assertEqual(source_namespace(USER_SOURCE), "tenant-u1")
+
+    def test_escaped_source_names(self):
+        source = "u2::a#b%c"
+        chunk_id = f"{chunk_id_prefix(source)}0123456789abcdef"
+        self.assertEqual(source_namespace(chunk_id), "tenant-u2")
+
+    def test_group_by_namespace(self):
+        names = ["handbook", "handbook_page_1_1a2b3c4d_0", *USER_CHUNK_IDS, "u2::faq", "u1::faq"]
+        self.assertEqual(
+            group_by_namespace(names),
+            {
+                DEFAULT_NAMESPACE: ["handbook", "handbook_page_1_1a2b3c4d_0"],
+                "tenant-u1": [*USER_CHUNK_IDS, "u1::faq"],
+                "tenant-u2": ["u2::faq"],
+            },
+        )
+
+
+class DisabledNamespaceRoutingTest(TenancyTestCase):
+    enabled = False
+
+    def test_everything_stays_in_the_default_namespace(self):
+        names = ["handbook", *USER_CHUNK_IDS]
+        self.assertEqual(group_by_namespace(names), {DEFAULT_NAMESPACE: names})
+
+
+class MigrationTest(TenancyTestCase):
+    def setUp(self):
+        super().setUp()
+        self.index = FakeIndex()
+        self.unscoped_ids = ["handbook_page_1_1a2b3c4d_0", f"{chunk_id_prefix('handbook')}0123456789abcdef"]
+        self.index.upsert(
+            [
+                {"id": chunk_id, "values": [float(i)], "metadata": {"source_name": chunk_id}}
+                for i, chunk_id in enumerate(self.unscoped_ids + USER_CHUNK_IDS + ["u2::faq_0"])
+            ]
+        )
+
+    def test_moves_user_scoped_vectors_to_their_tenant_namespace(self):
+        moved = migrate_page(self.index, sorted(self.index.vectors()), dry_run=False)
+
+        self.assertEqual(moved, {"tenant-u1": len(USER_CHUNK_IDS), "tenant-u2": 1})
+        self.assertEqual(sorted(self.index.vectors(DEFAULT_NAMESPACE)), sorted(self.unscoped_ids))
+        self.assertEqual(sorted(self.index.vectors("tenant-u1")), sorted(USER_CHUNK_IDS))
+        self.assertEqual(self.index.vectors("tenant-u1")[USER_CHUNK_IDS[3]].metadata["source_name"], USER_CHUNK_IDS[3])
+        self.assertEqual(list(self.index.vectors("tenant-u2")), ["u2::faq_0"])
+
+    def test_rerun_moves_nothing(self):
+        migrate_page(self.index, sorted(self.index.vectors()), dry_run=False)
+        self.assertEqual(migrate_page(self.index, sorted(self.index.vectors()), dry_run=False), {})
+
+    def test_dry_run_only_counts(self):
+        before = sorted(self.index.vectors())
+        moved = migrate_page(self.index, before, dry_run=True)
+
+        self.assertEqual(moved, {"tenant-u1": len(USER_CHUNK_IDS), "tenant-u2": 1})
+        self.assertEqual(sorted(self.index.vectors()), before)
+        self.assertEqual(sorted(self.index.upserted), before)
+        self.assertEqual(self.index.fetched, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
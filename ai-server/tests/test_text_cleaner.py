@@ -0,0 +1,118 @@
+import random
+import re
+import unittest
+
+from app.rag.text_cleaner import clean_ingested_text, clean_search_text, remove_markdown_links
+
+
+# The cleaners as they were before text_cleaner.py, kept verbatim as the reference
+def original_clean_ingested_text(content: str) -> str:
+    if not content:
+        return content
+    content = re.sub(r"<[^>]+>", "", content)
+    content = content.replace("_", "")
+    content = re.sub(r"\[([^\]]+)\]\([^)]+\)", r"\1", content)
+    content = re.sub(r"\[([^\]]+)\]\[[^\]]*\]", r"\1", content)
+    content = re.sub(r"https?://[^\s]+", "", content)
+    content = re.sub(r"\[\[[a-zA-Z0-9]+\]\]", "", content)
+    content = re.sub(r"\[\\?\[[a-zA-Z0-9]+\\?\]\]", "", content)
+    content = re.sub(r"\[[a-zA-Z0-9]+\]", "", content)
+    content = re.sub(r"\\\[([a-zA-Z0-9]+)\\\]", "", content)
+    content = re.sub(r"\\\[[a-zA-Z0-9]+\]", "", content)
+    content = re.sub(r"\[[a-zA-Z0-9]+\\\]", "", content)
+    content = re.sub(r"\[\]", "", content)
+    content = re.sub(r"[ \t]+", " ", content)
+    content = re.sub(r"\n\s*\n\s*\n+", "\n\n", content)
+    return content.strip()
+
+
+def original_clean_search_text(content: str) -> str:
+    if not content:
+        return content
+    content = re.sub(r"<!--.*?-->|<[^>]+>", "", content, flags=re.DOTALL)
+    content = re.sub(r"\[([^\]]+)\]\((?:[^)(]+|\([^)(]*\))*\)", r"\1", content)
+    content = re.sub(r"\[([^\]]+)\]\s*\[[^\]]*\]", r"\1", content)
+    content = re.sub(r"\[\[[a-zA-Z0-9]+\]\]", "", content)
+    content = re.sub(r"\[\\?\[[a-zA-Z0-9]+\\?\]\]", "", content)
+    content = re.sub(r"\[[a-zA-Z0-9]+\]", "", content)
+    content = re.sub(r"\\\[([a-zA-Z0-9]+)\\\]", "", content)
+    content = re.sub(r"\\\[[a-zA-Z0-9]+\]", "", content)
+    content = re.sub(r"\[[a-zA-Z0-9]+\\\]", "", content)
+    content = re.sub(r"\[\]", "", content)
+    content = re.sub(r"https?://\S+", "", content)
+    content = content.replace("_", "")
+    content = re.sub(r"[ \t]+", " ", content)
+    content = re.sub(r"\n[ \t]*\n[ \t]*(?:\n[ \t]*)+", "\n\n", content)
+    return content.strip()
+
+
+def original_remove_markdown_links(content: str) -> str:
+    content = re.sub(r"\[([^\]]+)\]\([^)]+\)", r"\1", content)
+    content = re.sub(r"https?://[^\s]+", "", content)
+    content = re.sub(r"\[([^\]]+)\]\[[^\]]*\]", r"\1", content)
+    content = re.sub(r"\n\s*\n", "\n\n", content)
+    return content.strip()
+
+
+FRAGMENTS = [
+    "The quick brown fox jumps over the lazy dog.",
+    "Page 12 of 48",
+    "See the [documentation](https://example.com/docs/getting_started) for details.",
+    "A [link](https://en.wikipedia.org/wiki/Fox_(animal)) with parentheses in its URL.",
+    "An [unterminated](link and a stray ( paren",
+    "As shown in the [reference][ref1] and [\\[12\\]](https://en.wikipedia.org/wiki/Fox#cite_note-12).",
+    "Spaced [reference] [ref2] and empty [reference][].",
+    "Citation needed[3], another one[[14]], [\\[a\\]] and \\[b\\] and \\[c] and [d\\].",
+    "Empty [] brackets and [not a ref!].",
+    "<div class='note'><b>Note:</b> tags are stripped</div>",
+    "<!-- tracking\ncomment -->",
+    "a < b and c > d",
+    "Visit https://example.com/path_with_underscores?q=1 now, or http://example.org.",
+    "Some _italic_ text and snake_case_names.",
+    "  \t  ",
+    "\t",
+    " ",
+    "\n",
+    "\n \n",
+    "\n\n\n",
+    "\n \t\n\t \n \n",
+]
+
+EDGE_CASES = ["", " ", "\n", "plain", "  padded  ", "single space only", "[x](", "[x](y", "<", "]("]
+
+
+def corpus():
+    rng = random.Random(7)
+    texts = list(EDGE_CASES) + list(FRAGMENTS)
+    for _ in range(300):
+        texts.append(rng.choice(["", " ", "\n"]).join(rng.choices(FRAGMENTS, k=rng.randint(1, 12))))
+    return texts
+
+
+class TextCleanerRegressionTest(unittest.TestCase):
+    """Both modes of every cleaner give the output of the original cleaner"""
+
+    def assert_same_output(self, cleaner, original):
+        for text in corpus():
+            expected = original(text)
+            with self.subTest(text=text):
+                self.assertEqual(cleaner(text), expected)
+                self.assertEqual(cleaner(text, compat=True), expected)
+
+    def test_clean_ingested_text(self):
+        self.assert_same_output(clean_ingested_text, original_clean_ingested_text)
+
+    def test_clean_search_text(self):
+        self.assert_same_output(clean_search_text, original_clean_search_text)
+
+    def test_remove_markdown_links(self):
+        self.assert_same_output(remove_markdown_links, original_remove_markdown_links)
+
+    def test_unterminated_inline_link_does_not_backtrack(self):
+        # The original search-side link pattern took exponential time on this input
+        text = "[link text](" + "a" * 50_000
+        self.assertEqual(clean_search_text(text), text)
+
+
+if __name__ == "__main__":
+    unittest.main()